@@ -17,6 +17,11 @@ Optional environment variables:
   ENSURE_PUBLIC_INVOKER=1
   FIRESTORE_PROJECT=<defaults to PROJECT_ID>
   ALLOW_DEV_USER_HEADER=0
+  REVENUECAT_WEBHOOK_ASYNC=0
+  SERVING_MODE=sync
+  SUBSCRIPTION_CACHE=0
+  USER_SNAPSHOT=0
+  METRICS_AUTH=<shared secret; /metrics rejects every request when unset>
 EOF
 }
 
@@ -33,6 +38,11 @@ ALLOW_UNAUTHENTICATED="${ALLOW_UNAUTHENTICATED:-0}"
 ENSURE_PUBLIC_INVOKER="${ENSURE_PUBLIC_INVOKER:-1}"
 FIRESTORE_PROJECT="${FIRESTORE_PROJECT:-$PROJECT_ID}"
 ALLOW_DEV_USER_HEADER="${ALLOW_DEV_USER_HEADER:-0}"
+REVENUECAT_WEBHOOK_ASYNC="${REVENUECAT_WEBHOOK_ASYNC:-0}"
+SERVING_MODE="${SERVING_MODE:-sync}"
+SUBSCRIPTION_CACHE="${SUBSCRIPTION_CACHE:-0}"
+USER_SNAPSHOT="${USER_SNAPSHOT:-0}"
+METRICS_AUTH="${METRICS_AUTH:-}"
 
 if ! command -v gcloud >/dev/null 2>&1; then
   echo "gcloud CLI is required." >&2
@@ -47,10 +57,22 @@ deploy_cmd=(
   --region "$REGION"
   --source "$SCRIPT_DIR"
   --platform managed
+  --cpu-boost
   --set-env-vars
-  "GOOGLE_CLOUD_PROJECT=$FIRESTORE_PROJECT,ALLOW_DEV_USER_HEADER=$ALLOW_DEV_USER_HEADER"
+  "GOOGLE_CLOUD_PROJECT=$FIRESTORE_PROJECT,ALLOW_DEV_USER_HEADER=$ALLOW_DEV_USER_HEADER,REVENUECAT_WEBHOOK_ASYNC=$REVENUECAT_WEBHOOK_ASYNC,SERVING_MODE=$SERVING_MODE,SUBSCRIPTION_CACHE=$SUBSCRIPTION_CACHE,USER_SNAPSHOT=$USER_SNAPSHOT"
 )
 
+if [[ -n "$METRICS_AUTH" ]]; then
+  deploy_cmd[-1]+=",METRICS_AUTH=$METRICS_AUTH"
+else
+  echo "METRICS_AUTH is not set; /metrics will reject every scrape." >&2
+fi
+
+if [[ "$REVENUECAT_WEBHOOK_ASYNC" == "1" || "$SUBSCRIPTION_CACHE" == "1" ]]; then
+  # Background webhook workers and the subscription cache listener need CPU outside of request handling.
+  deploy_cmd+=(--no-cpu-throttling)
+fi
+
 if [[ "$ALLOW_UNAUTHENTICATED" == "1" ]]; then
   deploy_cmd+=(--allow-unauthenticated)
 else
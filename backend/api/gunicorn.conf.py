@@ -0,0 +1,40 @@
+"""Gunicorn settings for the Cloud Run image.
+
+Each worker imports the app itself (no preload), so background threads and gRPC
+channels are created after fork. `post_worker_init` warms the worker before gunicorn
+hands it any connections.
+
+`SERVING_MODE=async` serves `src/async_app.py` on uvicorn workers instead of the
+threaded Flask app.
+"""
+
+import os
+import sys
+import time
+
+bind = f":{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = 0
+
+if os.getenv("SERVING_MODE", "sync") == "async":
+    wsgi_app = "src.async_app:app"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "src.app:app"
+
+
+def post_worker_init(worker):
+    if os.getenv("WARM_UP_ON_START", "1") != "1":
+        return
+    app_module = sys.modules.get("src.app")
+    if app_module is None:
+        return
+    started = time.perf_counter()
+    try:
+        timings = app_module.warm_up()
+    except Exception as exc:  # Never keep a worker from serving because warm-up failed.
+        worker.log.warning("Warm-up failed after %.3fs: %s", time.perf_counter() - started, exc)
+        return
+    steps = " ".join(f"{name}={seconds:.3f}s" for name, seconds in timings.items())
+    worker.log.info("Warm-up finished in %.3fs (%s)", time.perf_counter() - started, steps)
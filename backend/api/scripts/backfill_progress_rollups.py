@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Build the monthly progress rollups from existing daily progress docs.
+
+The API merges every progress write into users/{uid}/progressMonths/{yyyy-mm}, which
+GET /v1/progress/history reads instead of one users/{uid}/progress/{yyyy-mm-dd} doc per day.
+Days written before rollups existed are missing from them until this script merges every
+daily doc into its month, using the same code the API uses on write. Merging never drops a
+day the API wrote concurrently, so the script is safe to rerun.
+
+Usage examples:
+  python scripts/backfill_progress_rollups.py --uid firebase-uid
+  python scripts/backfill_progress_rollups.py --all
+  python scripts/backfill_progress_rollups.py --all --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def _import_app() -> Any:
+    # Keep the app from starting its background certificate fetch on import.
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
+def _resolve_uid(db: Any, *, email: str | None, uid: str | None) -> str:
+    if uid:
+        resolved = uid.strip()
+        if not resolved:
+            raise ValueError("--uid cannot be empty.")
+        return resolved
+
+    normalized_email = (email or "").strip().lower()
+    alias_doc = db.collection("user_email_aliases").document(normalized_email).get()
+    if not alias_doc.exists:
+        raise ValueError(f"No email alias found for {normalized_email}.")
+    canonical_uid = (alias_doc.to_dict() or {}).get("canonicalUserId")
+    if not isinstance(canonical_uid, str) or not canonical_uid.strip():
+        raise ValueError(f"Alias exists but canonicalUserId is missing for {normalized_email}.")
+    return canonical_uid.strip()
+
+
+def _iter_target_uids(db: Any, *, email: str | None, uid: str | None, all_users: bool) -> Iterable[str]:
+    if all_users:
+        # List references: users/{uid} docs only exist once a snapshot has been written.
+        for user_ref in db.collection("users").list_documents(page_size=500):
+            raw_uid = str(user_ref.id).strip()
+            if raw_uid:
+                yield raw_uid
+        return
+
+    yield _resolve_uid(db, email=email, uid=uid)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build users/{uid}/progressMonths rollups from daily progress docs.")
+    identity = parser.add_mutually_exclusive_group(required=True)
+    identity.add_argument("--email", help="User email (resolved through user_email_aliases).")
+    identity.add_argument("--uid", help="Canonical Firebase UID.")
+    identity.add_argument("--all", action="store_true", help="Process all users in users/*.")
+    parser.add_argument(
+        "--project-id",
+        default=os.getenv("GOOGLE_CLOUD_PROJECT", "").strip() or None,
+        help="GCP project id (defaults to GOOGLE_CLOUD_PROJECT env var).",
+    )
+    parser.add_argument("--apply", action="store_true", help="Apply writes. Default is dry-run.")
+    args = parser.parse_args()
+
+    if args.project_id:
+        os.environ["GOOGLE_CLOUD_PROJECT"] = args.project_id
+    app = _import_app()
+    db = app._get_db()
+    dry_run = not args.apply
+
+    scanned = 0
+    days = 0
+    months = 0
+    errors = 0
+    action = "Would write" if dry_run else "Wrote"
+    print(f"Mode: {'DRY-RUN' if dry_run else 'APPLY'}")
+
+    for uid in _iter_target_uids(db, email=args.email, uid=args.uid, all_users=args.all):
+        scanned += 1
+        user_ref = db.collection("users").document(uid)
+        try:
+            progress = [
+                (snapshot.reference, snapshot.to_dict() or {})
+                for snapshot in user_ref.collection("progress").stream()
+            ]
+            rollups = app._progress_rollup_writes(progress)
+            if not dry_run:
+                for start in range(0, len(rollups), app.FIRESTORE_BATCH_MAX_WRITES):
+                    batch = db.batch()
+                    for ref, data in rollups[start : start + app.FIRESTORE_BATCH_MAX_WRITES]:
+                        batch.set(ref, data, merge=True)
+                    batch.commit()
+        except Exception as exc:  # pragma: no cover - defensive path
+            errors += 1
+            print(f"[ERROR] users/{uid}: {exc}")
+            continue
+        if not rollups:
+            continue
+        days += len(progress)
+        months += len(rollups)
+        print(
+            f"[{'DRY-RUN' if dry_run else 'OK'}] {action} {len(rollups)} month(s) "
+            f"from {len(progress)} day(s) for users/{uid}"
+        )
+
+    print("\nSummary")
+    print(f"- scanned: {scanned}")
+    print(f"- days: {days}")
+    print(f"- months: {months}")
+    print(f"- errors: {errors}")
+
+    return 0 if errors == 0 else 1
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
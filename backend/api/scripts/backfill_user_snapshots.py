@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Build the users/{uid} snapshot document for existing users.
+
+With USER_SNAPSHOT=1 the API mirrors every write into users/{uid} and bootstrap reads only
+that document. Users whose snapshot is missing or stale are rebuilt by their next bootstrap;
+this script builds them ahead of time so the switch doesn't cost a rebuild per user. Each
+snapshot is rebuilt in a transaction by the same code the API uses.
+
+Usage examples:
+  python scripts/backfill_user_snapshots.py --uid firebase-uid
+  python scripts/backfill_user_snapshots.py --all
+  python scripts/backfill_user_snapshots.py --all --apply
+  python scripts/backfill_user_snapshots.py --all --apply --force
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def _import_app() -> Any:
+    # Keep the app from starting its background certificate fetch on import.
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
+def _resolve_uid(db: Any, *, email: str | None, uid: str | None) -> str:
+    if uid:
+        resolved = uid.strip()
+        if not resolved:
+            raise ValueError("--uid cannot be empty.")
+        return resolved
+
+    normalized_email = (email or "").strip().lower()
+    alias_doc = db.collection("user_email_aliases").document(normalized_email).get()
+    if not alias_doc.exists:
+        raise ValueError(f"No email alias found for {normalized_email}.")
+    canonical_uid = (alias_doc.to_dict() or {}).get("canonicalUserId")
+    if not isinstance(canonical_uid, str) or not canonical_uid.strip():
+        raise ValueError(f"Alias exists but canonicalUserId is missing for {normalized_email}.")
+    return canonical_uid.strip()
+
+
+def _iter_target_uids(db: Any, *, email: str | None, uid: str | None, all_users: bool) -> Iterable[str]:
+    if all_users:
+        # users/{uid} docs don't exist until a snapshot is written, so list references
+        # (which include missing docs with subcollections) rather than streaming docs.
+        for user_ref in db.collection("users").list_documents(page_size=500):
+            raw_uid = str(user_ref.id).strip()
+            if raw_uid:
+                yield raw_uid
+        return
+
+    yield _resolve_uid(db, email=email, uid=uid)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build users/{uid} snapshot documents from their sections.")
+    identity = parser.add_mutually_exclusive_group(required=True)
+    identity.add_argument("--email", help="User email (resolved through user_email_aliases).")
+    identity.add_argument("--uid", help="Canonical Firebase UID.")
+    identity.add_argument("--all", action="store_true", help="Process all users in users/*.")
+    parser.add_argument(
+        "--project-id",
+        default=os.getenv("GOOGLE_CLOUD_PROJECT", "").strip() or None,
+        help="GCP project id (defaults to GOOGLE_CLOUD_PROJECT env var).",
+    )
+    parser.add_argument("--apply", action="store_true", help="Apply writes. Default is dry-run.")
+    parser.add_argument("--force", action="store_true", help="Rebuild snapshots that are already current.")
+    args = parser.parse_args()
+
+    if args.project_id:
+        os.environ["GOOGLE_CLOUD_PROJECT"] = args.project_id
+    app = _import_app()
+    db = app._get_db()
+    dry_run = not args.apply
+
+    scanned = 0
+    built = 0
+    skipped_current = 0
+    errors = 0
+    action = "Would build" if dry_run else "Built"
+    print(f"Mode: {'DRY-RUN' if dry_run else 'APPLY'}")
+
+    for uid in _iter_target_uids(db, email=args.email, uid=args.uid, all_users=args.all):
+        scanned += 1
+        user_ref = db.collection("users").document(uid)
+        try:
+            if not args.force:
+                snapshot = user_ref.get(field_paths=["snapshotVersion", "progressDays"])
+                if app._user_snapshot_sections(snapshot, app._today_yyyy_mm_dd()) is not None:
+                    skipped_current += 1
+                    continue
+            if not dry_run:
+                app._rebuild_user_snapshot(db.transaction(), db, uid)
+        except Exception as exc:  # pragma: no cover - defensive path
+            errors += 1
+            print(f"[ERROR] users/{uid}: {exc}")
+            continue
+        built += 1
+        print(f"[{'DRY-RUN' if dry_run else 'OK'}] {action} users/{uid}")
+
+    print("\nSummary")
+    print(f"- scanned: {scanned}")
+    print(f"- built: {built}")
+    print(f"- skipped_current: {skipped_current}")
+    print(f"- errors: {errors}")
+
+    return 0 if errors == 0 else 1
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
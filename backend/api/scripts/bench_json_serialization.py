@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark bootstrap-shaped response serialization: legacy `_json_safe` copy vs one-pass provider.
+
+The legacy path rebuilds every dict/list to convert datetimes and then lets Flask's
+default provider encode the copy. The current path hands Firestore data straight to
+the app's JSON provider. The script checks both produce identical bytes before timing.
+
+Usage examples:
+  python scripts/bench_json_serialization.py
+  python scripts/bench_json_serialization.py --tasks 2000 --iterations 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+
+def _import_app() -> Any:
+    # Keep the app from starting its background certificate fetch on import.
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
+def _legacy_json_safe(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _legacy_json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_legacy_json_safe(v) for v in value]
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    return value
+
+
+def _bootstrap_response(task_count: int) -> dict[str, Any]:
+    from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+    updated_at = DatetimeWithNanoseconds(2026, 2, 22, 12, 30, 45, 123456, tzinfo=dt.timezone.utc)
+    tasks = [
+        {
+            "id": f"task-{index}",
+            "title": f"Task {index}",
+            "durationMinutes": index % 30,
+            "completed": index % 2 == 0,
+            "tags": ["morning", "focus"],
+            "createdAt": updated_at,
+        }
+        for index in range(task_count)
+    ]
+    return {
+        "userId": "bench-user",
+        "profile": {"nickname": "bench", "ageGroup": "25-34", "updatedAt": updated_at},
+        "isProfileComplete": True,
+        "profileCompletion": {"isComplete": True, "missingRequiredFields": []},
+        "routine": {"routineTime": "07:00", "tasks": tasks, "updatedAt": updated_at},
+        "streak": {"currentStreak": 12, "longestStreak": 30, "lastQualifiedDate": "2026-02-21"},
+        "progress": {"today": {"date": dt.date(2026, 2, 22), "completed": 3, "total": 5}},
+        "subscription": {
+            "paymentOption": "monthly",
+            "isActive": True,
+            "expirationAt": dt.datetime(2026, 3, 22, tzinfo=dt.timezone.utc),
+            "updatedAt": updated_at,
+        },
+    }
+
+
+def _time(serialize: Callable[[], bytes], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serialize()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare legacy and one-pass JSON response serialization.")
+    parser.add_argument("--tasks", type=int, default=500, help="Routine tasks in the payload (default: 500).")
+    parser.add_argument("--iterations", type=int, default=200, help="Serializations per path (default: 200).")
+    args = parser.parse_args()
+
+    if args.tasks < 0 or args.iterations <= 0:
+        raise ValueError("--tasks must be non-negative and --iterations positive.")
+
+    app = _import_app()
+    from flask.json.provider import DefaultJSONProvider
+
+    legacy_provider = DefaultJSONProvider(app.app)
+    payload = _bootstrap_response(args.tasks)
+
+    def legacy() -> bytes:
+        return legacy_provider.response(_legacy_json_safe(payload)).get_data()
+
+    def current() -> bytes:
+        return app.app.json.response(payload).get_data()
+
+    if legacy() != current():
+        raise RuntimeError("Legacy and current serialization produced different output.")
+
+    legacy_seconds = _time(legacy, args.iterations)
+    current_seconds = _time(current, args.iterations)
+
+    print(f"Tasks: {args.tasks} | response bytes: {len(current()):,}")
+    print(f"Iterations: {args.iterations}")
+    print(f"Legacy (_json_safe + default provider): {legacy_seconds * 1_000_000:,.1f} us")
+    print(f"Current (one-pass provider): {current_seconds * 1_000_000:,.1f} us")
+    print(f"Speedup: {legacy_seconds / current_seconds:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
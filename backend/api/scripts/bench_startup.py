@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark API cold start: module import time and time to first successful request.
+
+Each run uses a fresh interpreter. Import time is measured by importing `src/app.py` in a
+child process; time to first request starts gunicorn with `gunicorn.conf.py` (so the
+per-worker warm-up runs) and polls until the endpoint answers 200.
+
+Point it at the Firestore emulator (or real credentials) for requests that touch Firestore.
+
+Usage examples:
+  python scripts/bench_startup.py
+  FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 GOOGLE_CLOUD_PROJECT=demo-unstoppable \\
+    python scripts/bench_startup.py --path /v1/bootstrap --user-id bench-user --runs 5
+  WARM_UP_ON_START=0 python scripts/bench_startup.py --path /v1/bootstrap --user-id bench-user
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, "src")
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+"""
+
+
+def _measure_import(env: dict[str, str]) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=API_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _measure_first_request(env: dict[str, str], path: str, user_id: str | None, timeout: float) -> float:
+    port = _free_port()
+    env = {**env, "PORT": str(port)}
+    headers = {}
+    if user_id:
+        env["ALLOW_DEV_USER_HEADER"] = "1"
+        headers["X-User-Id"] = user_id
+    url = f"http://127.0.0.1:{port}{path}"
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+        cwd=API_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {server.returncode}.")
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"No successful response from {url} within {timeout:.0f}s.")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _summary(values: list[float]) -> str:
+    return f"median {statistics.median(values) * 1000:,.0f} ms | min {min(values) * 1000:,.0f} ms | max {max(values) * 1000:,.0f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure API import time and time to first successful request.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-process runs per measurement (default: 3).")
+    parser.add_argument("--path", default="/healthz", help="Endpoint polled for the first request (default: /healthz).")
+    parser.add_argument("--user-id", help="Send X-User-Id (enables ALLOW_DEV_USER_HEADER) for authenticated paths.")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for the first request (default: 60).")
+    parser.add_argument("--workers", type=int, default=1, help="Gunicorn workers (default: 1).")
+    args = parser.parse_args()
+
+    if args.runs <= 0 or args.workers <= 0 or args.timeout <= 0:
+        raise ValueError("--runs, --workers and --timeout must be positive.")
+
+    env = {**os.environ, "GUNICORN_WORKERS": str(args.workers)}
+    import_times = [_measure_import(env) for _ in range(args.runs)]
+    first_request_times = [
+        _measure_first_request(env, args.path, args.user_id, args.timeout) for _ in range(args.runs)
+    ]
+
+    print(f"Runs: {args.runs} | warm-up: {'on' if env.get('WARM_UP_ON_START', '1') == '1' else 'off'}")
+    print(f"Import time: {_summary(import_times)}")
+    print(f"Time to first 200 on {args.path}: {_summary(first_request_times)}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
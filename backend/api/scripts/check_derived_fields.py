@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Check the derived fields the API stores on write against the data they are derived from.
+
+Derived fields:
+  - users/{uid}/profile/self.completionRequirements.{field}: whether each profile completion
+    requirement is met (paymentOption from users/{uid}/payments/subscription)
+  - users/{uid}/payments/subscription.activeUntil and .isActive: entitlement end and state
+
+Flags that disagree with their source fields, and activeUntil values that are missing or disagree
+with the expiry fields, are reported as drift. A stored isActive that outlives activeUntil is not:
+the API evaluates isActive against activeUntil on read, so every lapsed subscription looks like that. Users whose requirement flags are incomplete are
+counted as unflagged (the API evaluates their completion on read). `--apply` rewrites every
+derived field of drifted and unflagged users, and mirrors the fix into the users/{uid} snapshot.
+
+Usage examples:
+  python scripts/check_derived_fields.py --uid firebase-uid
+  python scripts/check_derived_fields.py --all
+  python scripts/check_derived_fields.py --all --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def _import_app() -> Any:
+    # Keep the app from starting its background certificate fetch on import.
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
+def _resolve_uid(db: Any, *, email: str | None, uid: str | None) -> str:
+    if uid:
+        resolved = uid.strip()
+        if not resolved:
+            raise ValueError("--uid cannot be empty.")
+        return resolved
+
+    normalized_email = (email or "").strip().lower()
+    alias_doc = db.collection("user_email_aliases").document(normalized_email).get()
+    if not alias_doc.exists:
+        raise ValueError(f"No email alias found for {normalized_email}.")
+    canonical_uid = (alias_doc.to_dict() or {}).get("canonicalUserId")
+    if not isinstance(canonical_uid, str) or not canonical_uid.strip():
+        raise ValueError(f"Alias exists but canonicalUserId is missing for {normalized_email}.")
+    return canonical_uid.strip()
+
+
+def _iter_target_uids(db: Any, *, email: str | None, uid: str | None, all_users: bool) -> Iterable[str]:
+    if all_users:
+        # List references: users/{uid} docs only exist once a snapshot has been written.
+        for user_ref in db.collection("users").list_documents(page_size=500):
+            raw_uid = str(user_ref.id).strip()
+            if raw_uid:
+                yield raw_uid
+        return
+
+    yield _resolve_uid(db, email=email, uid=uid)
+
+
+def _drift(app: Any, profile: dict[str, Any], subscription: dict[str, Any]) -> tuple[list[str], bool]:
+    """(drift messages, whether the requirement flags are complete) for one user's docs."""
+    messages: list[str] = []
+    expected_requirements = app._completion_requirements(profile, subscription)
+    stored_requirements = profile.get(app.PROFILE_REQUIREMENTS_FIELD)
+    if not isinstance(stored_requirements, dict):
+        stored_requirements = {}
+    for field, stored in stored_requirements.items():
+        if field in expected_requirements and stored != expected_requirements[field]:
+            messages.append(
+                f"profile.{app.PROFILE_REQUIREMENTS_FIELD}.{field}={stored} expected {expected_requirements[field]}"
+            )
+
+    expected_entitlement = app._subscription_entitlement(subscription)
+    if "activeUntil" in expected_entitlement and "activeUntil" not in subscription:
+        messages.append("subscription.activeUntil missing")
+    # isActive is only evaluated at write time and re-evaluated on read, so a lapse is not drift.
+    expected_entitlement.pop("isActive", None)
+    for field, expected in expected_entitlement.items():
+        stored = subscription.get(field)
+        if field == "activeUntil":
+            stored = app._coerce_firestore_datetime(stored)
+        if field in subscription and stored != expected:
+            messages.append(f"subscription.{field}={stored} expected {expected}")
+    return messages, all(field in stored_requirements for field in expected_requirements)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report (and with --apply repair) drift in stored derived fields.")
+    identity = parser.add_mutually_exclusive_group(required=True)
+    identity.add_argument("--email", help="User email (resolved through user_email_aliases).")
+    identity.add_argument("--uid", help="Canonical Firebase UID.")
+    identity.add_argument("--all", action="store_true", help="Process all users in users/*.")
+    parser.add_argument(
+        "--project-id",
+        default=os.getenv("GOOGLE_CLOUD_PROJECT", "").strip() or None,
+        help="GCP project id (defaults to GOOGLE_CLOUD_PROJECT env var).",
+    )
+    parser.add_argument("--apply", action="store_true", help="Rewrite derived fields of drifted and unflagged users.")
+    args = parser.parse_args()
+
+    if args.project_id:
+        os.environ["GOOGLE_CLOUD_PROJECT"] = args.project_id
+    app = _import_app()
+    db = app._get_db()
+
+    scanned = 0
+    drifted = 0
+    unflagged = 0
+    repaired = 0
+    errors = 0
+    print(f"Mode: {'APPLY' if args.apply else 'CHECK'}")
+
+    for uid in _iter_target_uids(db, email=args.email, uid=args.uid, all_users=args.all):
+        scanned += 1
+        user_ref = db.collection("users").document(uid)
+        profile_ref = user_ref.collection("profile").document("self")
+        subscription_ref = user_ref.collection("payments").document("subscription")
+        try:
+            snapshots = {snapshot.reference.path: snapshot for snapshot in db.get_all([profile_ref, subscription_ref])}
+        except Exception as exc:  # pragma: no cover - defensive path
+            errors += 1
+            print(f"[ERROR] users/{uid}: failed to read docs: {exc}")
+            continue
+        if not any(snapshot.exists for snapshot in snapshots.values()):
+            continue
+        profile = app._snapshot_data(snapshots, profile_ref)
+        subscription = app._snapshot_data(snapshots, subscription_ref)
+
+        messages, flagged = _drift(app, profile, subscription)
+        for message in messages:
+            print(f"[DRIFT] users/{uid}: {message}")
+        drifted += bool(messages)
+        unflagged += not flagged
+        if not args.apply or (flagged and not messages):
+            continue
+
+        writes = [(profile_ref, {app.PROFILE_REQUIREMENTS_FIELD: app._completion_requirements(profile, subscription)})]
+        entitlement = app._subscription_entitlement(subscription)
+        if snapshots[subscription_ref.path].exists and entitlement:
+            writes.append((subscription_ref, entitlement))
+        try:
+            batch = db.batch()
+            for ref, data in writes:
+                batch.set(ref, data, merge=True)
+            # Harmless without a snapshot: a users/{uid} doc lacking snapshotVersion is rebuilt on read.
+            batch.set(user_ref, app._user_snapshot_update(writes), merge=True)
+            batch.commit()
+            repaired += 1
+            print(f"[OK] Repaired users/{uid}")
+        except Exception as exc:  # pragma: no cover - defensive path
+            errors += 1
+            print(f"[ERROR] users/{uid}: failed to write derived fields: {exc}")
+
+    print("\nSummary")
+    print(f"- scanned: {scanned}")
+    print(f"- drifted: {drifted}")
+    print(f"- unflagged: {unflagged}")
+    print(f"- repaired: {repaired}")
+    print(f"- errors: {errors}")
+
+    if errors:
+        return 1
+    return 1 if drifted and not args.apply else 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
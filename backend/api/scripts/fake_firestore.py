@@ -0,0 +1,517 @@
+"""In-memory stand-in for the Firestore client surface used by `src/app.py`.
+
+Covers collection/document references, get/set(merge)/create/update, batched `get_all`,
+write batches, `@firestore.transactional` transactions, simple
+`where(...).order_by(...).start_after(...).limit(...)` queries and query listeners
+(`on_snapshot`, delivered synchronously on commit), with Firestore's AlreadyExists/NotFound semantics, SERVER_TIMESTAMP
+resolution and DELETE_FIELD in merge writes. `read_time` is accepted and ignored: reads always see the latest state.
+Every call that would be an RPC against real Firestore sleeps for the
+configured latency and is counted, so benchmarks can report RPCs per request.
+
+Plug it into the app with `app._db = FakeFirestoreClient(...)`.
+"""
+
+from __future__ import annotations
+
+import copy
+import datetime as dt
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Iterator
+
+from google.api_core import exceptions as google_exceptions
+from google.cloud import firestore
+
+
+class FakeFirestoreClient:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int | None = None) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._docs: dict[str, dict[str, Any]] = {}
+        # Bumped on every write; transactions abort if a document they read changed.
+        self._versions: Counter = Counter()
+        self._update_times: dict[str, dt.datetime] = {}
+        self._lock = threading.RLock()
+        self._counts_lock = threading.Lock()
+        self.rpc_counts: Counter = Counter()
+        self._watches: list["FakeWatch"] = []
+
+    # -- RPC accounting -------------------------------------------------------------
+
+    def _rpc(self, name: str) -> None:
+        with self._counts_lock:
+            self.rpc_counts[name] += 1
+        delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def total_rpcs(self) -> int:
+        with self._counts_lock:
+            return sum(self.rpc_counts.values())
+
+    # -- client surface -------------------------------------------------------------
+
+    def collection(self, collection_id: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self, collection_id)
+
+    def collection_group(self, collection_id: str) -> "FakeQuery":
+        return FakeQuery(self, collection_id, group=True)
+
+    def get_all(
+        self,
+        refs: list["FakeDocumentReference"],
+        field_paths: list[str] | None = None,
+        transaction: Any = None,
+        read_time: Any = None,
+    ) -> Iterator["FakeSnapshot"]:
+        self._rpc("batch_get_documents")
+        with self._lock:
+            snapshots = [self._snapshot(ref, field_paths) for ref in refs]
+            if transaction is not None:
+                transaction._record_reads(refs)
+        yield from snapshots
+
+    def batch(self) -> "FakeWriteBatch":
+        return FakeWriteBatch(self)
+
+    def transaction(self) -> "FakeTransaction":
+        return FakeTransaction(self)
+
+    # -- storage --------------------------------------------------------------------
+
+    def _snapshot(self, ref: "FakeDocumentReference", field_paths: list[str] | None = None) -> "FakeSnapshot":
+        data = self._docs.get(ref.path)
+        if data is None:
+            return FakeSnapshot(ref, None)
+        if field_paths is not None:
+            data = _mask(data, field_paths)
+        return FakeSnapshot(ref, copy.deepcopy(data), self._update_times.get(ref.path))
+
+    def _apply(self, op: str, ref: "FakeDocumentReference", data: dict[str, Any] | None, merge: bool) -> None:
+        """Apply one write; caller holds the lock. Raises like Firestore on failed preconditions."""
+        existing = self._docs.get(ref.path)
+        self._versions[ref.path] += 1
+        # Strictly increasing per document, like Firestore's update_time.
+        now = dt.datetime.now(dt.timezone.utc)
+        previous = self._update_times.get(ref.path)
+        self._update_times[ref.path] = max(now, previous + dt.timedelta(microseconds=1)) if previous else now
+        if op == "create":
+            if existing is not None:
+                raise google_exceptions.AlreadyExists(f"Document already exists: {ref.path}")
+            self._docs[ref.path] = _resolve(data)
+        elif op == "set":
+            if merge:
+                _deep_merge(self._docs.setdefault(ref.path, {}), _resolve(data))
+            else:
+                self._docs[ref.path] = _resolve(data)
+        elif op == "update":
+            if existing is None:
+                raise google_exceptions.NotFound(f"No document to update: {ref.path}")
+            for key, value in _resolve(data).items():
+                target = existing
+                *parents, leaf = key.split(".")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[leaf] = value
+        elif op == "delete":
+            self._docs.pop(ref.path, None)
+
+    def _commit(
+        self,
+        writes: list[tuple[str, "FakeDocumentReference", Any, bool]],
+        read_versions: dict[str, int] | None = None,
+    ) -> None:
+        with self._lock:
+            for path, version in (read_versions or {}).items():
+                if self._versions[path] != version:
+                    raise google_exceptions.Aborted(f"Transaction read a document that changed: {path}")
+            # Validate preconditions first so a failed batch leaves no partial writes.
+            pending_creates = set()
+            for op, ref, _, _ in writes:
+                if op == "create":
+                    if ref.path in self._docs or ref.path in pending_creates:
+                        raise google_exceptions.AlreadyExists(f"Document already exists: {ref.path}")
+                    pending_creates.add(ref.path)
+                elif op == "update" and ref.path not in self._docs and ref.path not in pending_creates:
+                    raise google_exceptions.NotFound(f"No document to update: {ref.path}")
+            for op, ref, data, merge in writes:
+                self._apply(op, ref, data, merge)
+            watches = [watch for watch in self._watches if watch.is_active]
+            notifications = [
+                (watch, [ref for _, ref, _, _ in writes if watch.query._matches(ref, self._docs.get(ref.path), True)])
+                for watch in watches
+            ]
+        for watch, refs in notifications:
+            if refs:
+                watch._deliver(refs)
+
+    def _documents_in(self, collection_path: str) -> list["FakeDocumentReference"]:
+        prefix = collection_path + "/"
+        with self._lock:
+            paths = [path for path in self._docs if path.startswith(prefix) and "/" not in path[len(prefix) :]]
+        return [FakeDocumentReference(self, path) for path in sorted(paths)]
+
+
+class FakeCollectionReference:
+    def __init__(self, client: FakeFirestoreClient, path: str) -> None:
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> "FakeDocumentReference | None":
+        if "/" not in self.path:
+            return None
+        return FakeDocumentReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def document(self, document_id: str) -> "FakeDocumentReference":
+        return FakeDocumentReference(self._client, f"{self.path}/{document_id}")
+
+    def where(self, *, filter: Any) -> "FakeQuery":
+        return FakeQuery(self._client, self.path).where(filter=filter)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return FakeQuery(self._client, self.path).limit(count)
+
+    def order_by(self, field_path: str) -> "FakeQuery":
+        return FakeQuery(self._client, self.path).order_by(field_path)
+
+    def stream(self) -> Iterator["FakeSnapshot"]:
+        return FakeQuery(self._client, self.path).stream()
+
+    def list_documents(self, page_size: int | None = None) -> Iterator["FakeDocumentReference"]:
+        # Like Firestore, includes missing documents that only have subcollections.
+        self._client._rpc("list_documents")
+        prefix = self.path + "/"
+        with self._client._lock:
+            ids = {path[len(prefix) :].split("/", 1)[0] for path in self._client._docs if path.startswith(prefix)}
+        return iter([self.document(document_id) for document_id in sorted(ids)])
+
+
+class FakeDocumentReference:
+    def __init__(self, client: FakeFirestoreClient, path: str) -> None:
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    @property
+    def parent(self) -> FakeCollectionReference:
+        return FakeCollectionReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def collection(self, collection_id: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self, transaction: Any = None, timeout: float | None = None) -> "FakeSnapshot":
+        self._client._rpc("batch_get_documents")
+        with self._client._lock:
+            if transaction is not None:
+                transaction._record_reads([self])
+            return self._client._snapshot(self)
+
+    def set(self, data: dict[str, Any], merge: bool = False) -> None:
+        self._client._rpc("commit")
+        self._client._commit([("set", self, data, merge)])
+
+    def create(self, data: dict[str, Any]) -> None:
+        self._client._rpc("commit")
+        self._client._commit([("create", self, data, False)])
+
+    def update(self, data: dict[str, Any]) -> None:
+        self._client._rpc("commit")
+        self._client._commit([("update", self, data, False)])
+
+    def delete(self) -> None:
+        self._client._rpc("commit")
+        self._client._commit([("delete", self, None, False)])
+
+
+class FakeSnapshot:
+    def __init__(
+        self, reference: FakeDocumentReference, data: dict[str, Any] | None, update_time: dt.datetime | None = None
+    ) -> None:
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict[str, Any] | None:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+
+class FakeQuery:
+    _OPERATORS = {
+        "==": lambda a, b: a == b,
+        "!=": lambda a, b: a != b,
+        "<": lambda a, b: a < b,
+        "<=": lambda a, b: a <= b,
+        ">": lambda a, b: a > b,
+        ">=": lambda a, b: a >= b,
+        "in": lambda a, b: a in b,
+    }
+
+    def __init__(self, client: FakeFirestoreClient, collection_path: str, group: bool = False) -> None:
+        self._client = client
+        # With `group`, the collection ID every matching document's parent collection has.
+        self._collection_path = collection_path
+        self._group = group
+        self._filters: list[tuple[str, str, Any]] = []
+        self._orders: list[str] = []
+        self._start: tuple[dict[str, Any], bool] | None = None
+        self._end_at: dict[str, Any] | None = None
+        self._field_paths: list[str] | None = None
+        self._limit: int | None = None
+
+    def where(self, *, filter: Any) -> "FakeQuery":
+        self._filters.append((filter.field_path, filter.op_string, filter.value))
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        self._limit = count
+        return self
+
+    def order_by(self, field_path: str) -> "FakeQuery":
+        """Ascending only; `__name__` orders by document ID."""
+        self._orders.append(field_path)
+        return self
+
+    def select(self, field_paths: list[str]) -> "FakeQuery":
+        self._field_paths = list(field_paths)
+        return self
+
+    def start_at(self, values: dict[str, Any]) -> "FakeQuery":
+        self._start = (values, True)
+        return self
+
+    def start_after(self, values: dict[str, Any]) -> "FakeQuery":
+        self._start = (values, False)
+        return self
+
+    def end_at(self, values: dict[str, Any]) -> "FakeQuery":
+        self._end_at = values
+        return self
+
+    def _cursor(self, values: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(values[field] for field in self._orders[: len(values)])
+
+    def _order_key(self, ref: FakeDocumentReference, data: dict[str, Any]) -> tuple[Any, ...] | None:
+        key = []
+        for field in self._orders:
+            if field == "__name__":
+                key.append(ref.id)
+            elif field in data:
+                key.append(data[field])
+            else:
+                # Like Firestore, ordering by a field excludes documents without it.
+                return None
+        return tuple(key)
+
+    def _matches(self, ref: FakeDocumentReference, data: dict[str, Any] | None, deleted_ok: bool = False) -> bool:
+        """Whether `ref` is in this query's scope and `data` passes its filters (`deleted_ok`: or is gone)."""
+        parent_path, _, _ = ref.path.rpartition("/")
+        if self._group:
+            if parent_path.rsplit("/", 1)[-1] != self._collection_path:
+                return False
+        elif parent_path != self._collection_path:
+            return False
+        if data is None:
+            return deleted_ok
+        return all(field in data and self._OPERATORS[op](data[field], value) for field, op, value in self._filters)
+
+    def on_snapshot(self, callback: Any) -> "FakeWatch":
+        return FakeWatch(self, callback)
+
+    def stream(self, transaction: Any = None, read_time: Any = None) -> Iterator[FakeSnapshot]:
+        self._client._rpc("run_query")
+        matches = []
+        with self._client._lock:
+            if self._group:
+                refs = [FakeDocumentReference(self._client, path) for path in sorted(self._client._docs)]
+            else:
+                refs = self._client._documents_in(self._collection_path)
+            for ref in refs:
+                data = self._client._docs.get(ref.path)
+                if not self._matches(ref, data):
+                    continue
+                key = self._order_key(ref, data)
+                if key is not None:
+                    matches.append((key, ref))
+            matches.sort(key=lambda match: match[0])
+            if self._start is not None:
+                values, inclusive = self._start
+                cursor = self._cursor(values)
+                matches = [
+                    match for match in matches
+                    if match[0][: len(cursor)] > cursor or (inclusive and match[0][: len(cursor)] == cursor)
+                ]
+            if self._end_at is not None:
+                cursor = self._cursor(self._end_at)
+                matches = [match for match in matches if match[0][: len(cursor)] <= cursor]
+            results = []
+            for _, ref in matches:
+                results.append(self._client._snapshot(ref, self._field_paths))
+                if self._limit is not None and len(results) >= self._limit:
+                    break
+            if transaction is not None:
+                transaction._record_reads([snapshot.reference for snapshot in results])
+        yield from results
+
+
+class FakeDocumentChange:
+    def __init__(self, document: FakeSnapshot) -> None:
+        self.document = document
+        self.type = "MODIFIED" if document.exists else "REMOVED"
+
+
+class FakeWatch:
+    """Query listener: an initial snapshot, then the matching documents of every commit."""
+
+    def __init__(self, query: FakeQuery, callback: Any) -> None:
+        self.query = query
+        self._callback = callback
+        self.is_active = True
+        client = query._client
+        with client._lock:
+            client._watches.append(self)
+            initial = list(query.stream())
+        self._callback(initial, [FakeDocumentChange(snapshot) for snapshot in initial], dt.datetime.now(dt.timezone.utc))
+
+    def _deliver(self, refs: list[FakeDocumentReference]) -> None:
+        with self.query._client._lock:
+            snapshots = [self.query._client._snapshot(ref) for ref in refs]
+        self._callback(snapshots, [FakeDocumentChange(snapshot) for snapshot in snapshots], dt.datetime.now(dt.timezone.utc))
+
+    def close(self) -> None:
+        self.is_active = False
+        with self.query._client._lock:
+            if self in self.query._client._watches:
+                self.query._client._watches.remove(self)
+
+
+class FakeWriteBatch:
+    def __init__(self, client: FakeFirestoreClient) -> None:
+        self._client = client
+        self._writes: list[tuple[str, FakeDocumentReference, Any, bool]] = []
+
+    def set(self, ref: FakeDocumentReference, data: dict[str, Any], merge: bool = False) -> None:
+        self._writes.append(("set", ref, data, merge))
+
+    def create(self, ref: FakeDocumentReference, data: dict[str, Any]) -> None:
+        self._writes.append(("create", ref, data, False))
+
+    def update(self, ref: FakeDocumentReference, data: dict[str, Any]) -> None:
+        self._writes.append(("update", ref, data, False))
+
+    def delete(self, ref: FakeDocumentReference) -> None:
+        self._writes.append(("delete", ref, None, False))
+
+    def commit(self) -> None:
+        self._client._rpc("commit")
+        self._client._commit(self._writes)
+        self._writes = []
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Implements the protocol `@firestore.transactional` drives (`_begin`/`_commit`/`_rollback`).
+
+    Concurrency is optimistic: commit raises Aborted if a document the transaction read
+    was written in the meantime, and the decorator retries like it does against Firestore.
+    """
+
+    _max_attempts = 5
+    _read_only = False
+
+    def __init__(self, client: FakeFirestoreClient) -> None:
+        super().__init__(client)
+        self._id: bytes | None = None
+        self._read_versions: dict[str, int] = {}
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def _record_reads(self, refs: list[FakeDocumentReference]) -> None:
+        for ref in refs:
+            self._read_versions.setdefault(ref.path, self._client._versions[ref.path])
+
+    def _clean_up(self) -> None:
+        self._writes = []
+        self._read_versions = {}
+        self._id = None
+
+    def _begin(self, retry_id: bytes | None = None) -> None:
+        self._client._rpc("begin_transaction")
+        self._id = f"fake-{id(self)}-{time.monotonic_ns()}".encode("utf-8")
+
+    def _commit(self) -> list[Any]:
+        try:
+            self._client._rpc("commit")
+            self._client._commit(self._writes, self._read_versions)
+        finally:
+            self._clean_up()
+        return []
+
+    def _rollback(self) -> None:
+        if not self.in_progress:
+            return
+        self._client._rpc("rollback")
+        self._clean_up()
+
+    def get_all(self, refs: list[FakeDocumentReference]) -> Iterator[FakeSnapshot]:
+        return self._client.get_all(refs, transaction=self)
+
+
+def _resolve(data: Any) -> Any:
+    """Deep-copy write data, replacing SERVER_TIMESTAMP with the commit time."""
+    if data is firestore.SERVER_TIMESTAMP:
+        return dt.datetime.now(dt.timezone.utc)
+    if data is firestore.DELETE_FIELD:
+        return data
+    if isinstance(data, dict):
+        return {key: _resolve(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_resolve(value) for value in data]
+    return copy.deepcopy(data)
+
+
+def _mask(data: dict[str, Any], field_paths: list[str]) -> dict[str, Any]:
+    """Keep only `field_paths` (dotted) of a document, like a Firestore field mask."""
+    masked: dict[str, Any] = {}
+    for field_path in field_paths:
+        source: Any = data
+        *parents, leaf = field_path.split(".")
+        for parent in parents:
+            source = source.get(parent) if isinstance(source, dict) else None
+        if not isinstance(source, dict) or leaf not in source:
+            continue
+        target = masked
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = source[leaf]
+    return masked
+
+
+def _deep_merge(target: dict[str, Any], updates: dict[str, Any]) -> None:
+    for key, value in updates.items():
+        if value is firestore.DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict) and value:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _deep_merge(target[key], value)
+        else:
+            target[key] = value
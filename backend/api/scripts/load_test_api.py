@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""Load test every API endpoint in-process against the in-memory Firestore stand-in.
+
+No GCP project or emulator is needed: `app._db` is replaced by `FakeFirestoreClient`
+(see `scripts/fake_firestore.py`) with configurable per-RPC latency. Each endpoint is
+driven by concurrent client threads through Flask's WSGI test client, one endpoint at
+a time, and the script reports requests/sec, p50/p95/p99 latency and Firestore RPCs per
+request. `--enforce-budgets` fails the run when a hot path issues more RPCs than expected.
+Before the load, a replay check drives the streak endpoints against a fresh fake and fails the
+run when a batch-replayed streak does not carry over to the next day or a client streak
+snapshot overwrites the server-maintained one, and a validation check fails it when a malformed
+`limit` (non-ASCII digits included) gets anything but a 400 from GET /v1/progress.
+
+Usage examples:
+  python scripts/load_test_api.py
+  python scripts/load_test_api.py --latency-ms 8 --jitter-ms 3 --concurrency 16 --duration 10
+  python scripts/load_test_api.py --endpoints get_bootstrap revenuecat_webhook --auth token --enforce-budgets
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import itertools
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from fake_firestore import FakeFirestoreClient
+
+WEBHOOK_SECRET = "load-test-webhook-secret"
+
+# Firestore RPCs per request for steady-state hot paths (identity already cached).
+RPC_BUDGETS = {
+    "get_bootstrap": 1,
+    "get_user_subscription": 1,
+    "get_sync": 2,
+    "get_progress_history": 1,
+    "get_progress": 1,
+    # begin + streak read + commit: the body carries a streak section, checked against the stored streak.
+    "upsert_user_state": 3,
+    # begin + streak read + commit; a day before the current run adds one window query.
+    "upsert_qualifying_progress": 3,
+    "revenuecat_webhook": 3,
+}
+
+
+def _import_app() -> Any:
+    # Keep the app from starting background threads that would talk to real services.
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    os.environ["REVENUECAT_WEBHOOK_ASYNC"] = "0"
+    os.environ["ALLOW_DEV_USER_HEADER"] = "1"
+    os.environ["REVENUECAT_WEBHOOK_AUTH"] = WEBHOOK_SECRET
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
+def _seed(db: FakeFirestoreClient, user_ids: list[str], task_count: int) -> None:
+    today = dt.datetime.now(dt.timezone.utc).date().isoformat()
+    now = dt.datetime.now(dt.timezone.utc)
+    for user_id in user_ids:
+        user_ref = db.collection("users").document(user_id)
+        db._commit(
+            [
+                (
+                    "set",
+                    user_ref.collection("profile").document("self"),
+                    {
+                        "nickname": user_id,
+                        "notificationsEnabled": True,
+                        "termsAccepted": True,
+                        "termsOver16Accepted": True,
+                        "updatedAt": now,
+                    },
+                    False,
+                ),
+                (
+                    "set",
+                    user_ref.collection("routine").document("current"),
+                    {
+                        "routineTime": "07:00",
+                        "tasks": [{"id": f"task-{i}", "title": f"Task {i}", "minutes": 5} for i in range(task_count)],
+                        "updatedAt": now,
+                    },
+                    False,
+                ),
+                (
+                    "set",
+                    user_ref.collection("stats").document("streak"),
+                    {"currentStreak": 3, "longestStreak": 9, "lastQualifiedDate": today, "updatedAt": now},
+                    False,
+                ),
+                (
+                    "set",
+                    user_ref.collection("progress").document(today),
+                    {"date": today, "completed": 1, "total": task_count, "completedTaskIds": [], "updatedAt": now},
+                    False,
+                ),
+                (
+                    "set",
+                    user_ref.collection("payments").document("subscription"),
+                    {"paymentOption": "monthly", "isActive": True, "updatedAt": now},
+                    False,
+                ),
+            ]
+        )
+
+
+def _check_streak_replay(app: Any) -> list[str]:
+    """Failures of the offline replay scenario: days batch-written as qualifying, then the next day
+    posted on its own, then a stale client snapshot; the server-maintained streak must hold."""
+    db = app._db
+    app._db = FakeFirestoreClient()
+    try:
+        client = app.app.test_client()
+        headers = {"X-User-Id": "replay-check-user"}
+        entries = [{"date": f"2026-01-0{day}", "completed": 3, "total": 3} for day in range(1, 5)]
+        client.post("/v1/progress/daily/batch", json={"entries": entries}, headers=headers)
+        client.post("/v1/progress/daily", json={"date": "2026-01-05", "completed": 3, "total": 3}, headers=headers)
+        stale = {"currentStreak": 1, "longestStreak": 1, "lastQualifiedDate": "2026-01-01"}
+        client.post("/v1/stats/streak/snapshot", json=stale, headers=headers)
+        client.post("/v1/user/state", json={"streak": stale}, headers=headers)
+        streak = client.get("/v1/bootstrap", headers=headers).get_json()["streak"]
+    finally:
+        app._db = db
+    expected = {"currentStreak": 5, "longestStreak": 5, "lastQualifiedDate": "2026-01-05"}
+    return [
+        f"streak replay: {field}={streak.get(field)!r} expected {value!r}"
+        for field, value in expected.items()
+        if streak.get(field) != value
+    ]
+
+
+def _check_progress_limits(app: Any) -> list[str]:
+    """Failures of GET /v1/progress limit validation: each malformed limit must get a 400."""
+    db = app._db
+    app._db = FakeFirestoreClient()
+    try:
+        client = app.app.test_client()
+        headers = {"X-User-Id": "limit-check-user"}
+        failures = []
+        for limit in ("\u00b2", "\u0663", "0", "-1", "1.5", "abc"):
+            response = client.get(
+                "/v1/progress", query_string={"from": "2024-01-01", "to": "2024-02-28", "limit": limit}, headers=headers
+            )
+            if response.status_code != 400:
+                failures.append(f"progress limit {limit!r}: status {response.status_code} expected 400")
+    finally:
+        app._db = db
+    return failures
+
+
+class _RequestFactory:
+    """Builds (method, path, json, headers) for each endpoint; thread-safe sequence numbers."""
+
+    def __init__(self, user_ids: list[str], auth_mode: str, app: Any) -> None:
+        self.user_ids = user_ids
+        self.auth_mode = auth_mode
+        self._sequence = itertools.count()
+        self._tokens: dict[str, str] = {}
+        if auth_mode == "token":
+            # Pre-verified synthetic tokens: verification is served from the token cache,
+            # so identity resolution (alias reads/writes) runs against the fake.
+            exp = time.time() + 3600
+            for user_id in user_ids:
+                token = f"load-test-token-{user_id}"
+                claims = {
+                    "uid": user_id,
+                    "email": f"{user_id}@example.com",
+                    "email_verified": True,
+                    "exp": exp,
+                    "firebase": {"sign_in_provider": "google.com"},
+                }
+                cache_key = app.hashlib.sha256(token.encode("utf-8")).digest()
+                app._id_token_cache.set(cache_key, claims, ttl_seconds=3600)
+                self._tokens[user_id] = token
+
+    def _user_headers(self, user_id: str) -> dict[str, str]:
+        if self.auth_mode == "token":
+            return {"Authorization": f"Bearer {self._tokens[user_id]}"}
+        return {"X-User-Id": user_id}
+
+    def build(self, endpoint: str) -> tuple[str, str, Any, dict[str, str]]:
+        sequence = next(self._sequence)
+        user_id = self.user_ids[sequence % len(self.user_ids)]
+        headers = self._user_headers(user_id)
+        day = (dt.date(2026, 1, 1) + dt.timedelta(days=sequence % 365)).isoformat()
+        if endpoint == "get_bootstrap":
+            return "GET", "/v1/bootstrap", None, headers
+        if endpoint == "get_user_subscription":
+            return "GET", "/v1/user/subscription", None, headers
+        if endpoint == "get_sync":
+            return "GET", "/v1/sync", None, headers
+        if endpoint == "get_progress_history":
+            return "GET", "/v1/progress/history?from=2026-01-01&to=2026-12-31", None, headers
+        if endpoint == "get_progress":
+            return "GET", "/v1/progress?from=2026-01-01&to=2026-12-31&limit=100", None, headers
+        if endpoint == "upsert_user_profile":
+            return "POST", "/v1/user/profile", {"nickname": f"n{sequence}", "notificationsEnabled": True}, headers
+        if endpoint == "upsert_user_state":
+            body = {
+                "profile": {"nickname": f"n{sequence}", "notificationsEnabled": True},
+                "routine": {"routineTime": "07:00", "tasks": [{"id": "task-0", "title": "Stretch"}]},
+                "progress": {"date": day, "completed": 1, "total": 3},
+                "streak": {"currentStreak": 3, "longestStreak": 9, "lastQualifiedDate": day},
+            }
+            return "POST", "/v1/user/state", body, headers
+        if endpoint == "upsert_routine":
+            body = {"routineTime": "07:00", "tasks": [{"id": "task-0", "title": "Stretch"}]}
+            return "PUT", "/v1/routines/current", body, headers
+        if endpoint == "upsert_daily_progress":
+            return "POST", "/v1/progress/daily", {"date": day, "completed": 1, "total": 3}, headers
+        if endpoint == "upsert_qualifying_progress":
+            # After the seeded lastQualifiedDate, so each write advances the streak without a window query.
+            later = (dt.date.today() + dt.timedelta(days=1 + sequence)).isoformat()
+            return "POST", "/v1/progress/daily", {"date": later, "completed": 3, "total": 3}, headers
+        if endpoint == "upsert_daily_progress_batch":
+            start = dt.date(2025, 1, 1) + dt.timedelta(days=sequence % 300)
+            entries = [
+                {"date": (start + dt.timedelta(days=i)).isoformat(), "completed": 1, "total": 3} for i in range(7)
+            ]
+            return "POST", "/v1/progress/daily/batch", {"entries": entries}, headers
+        if endpoint == "upsert_streak_snapshot":
+            body = {"currentStreak": 3, "longestStreak": 9, "lastQualifiedDate": day}
+            return "POST", "/v1/stats/streak/snapshot", body, headers
+        if endpoint == "upsert_subscription_snapshot":
+            body = {"productId": "unstoppable_monthly", "isActive": True, "store": "APP_STORE"}
+            return "POST", "/v1/payments/subscription/snapshot", body, headers
+        if endpoint == "revenuecat_webhook":
+            event = {
+                "id": f"load-test-event-{sequence}-{time.monotonic_ns()}",
+                "type": "RENEWAL",
+                "app_user_id": user_id,
+                "product_id": "unstoppable_monthly",
+                "event_timestamp_ms": int(time.time() * 1000) + sequence,
+            }
+            webhook_headers = {"Authorization": f"Bearer {WEBHOOK_SECRET}"}
+            return "POST", "/v1/payments/revenuecat/webhook", {"event": event}, webhook_headers
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+ENDPOINTS = (
+    "get_bootstrap",
+    "get_user_subscription",
+    "get_sync",
+    "get_progress_history",
+    "get_progress",
+    "upsert_user_profile",
+    "upsert_user_state",
+    "upsert_routine",
+    "upsert_daily_progress",
+    "upsert_qualifying_progress",
+    "upsert_daily_progress_batch",
+    "upsert_streak_snapshot",
+    "upsert_subscription_snapshot",
+    "revenuecat_webhook",
+)
+
+
+def _drive(
+    app: Any, build: Callable[[], tuple[str, str, Any, dict[str, str]]], concurrency: int, duration: float
+) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        nonlocal errors
+        test_client = app.app.test_client()
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            method, path, body, headers = build()
+            started = time.perf_counter()
+            # Buffered, so streamed bodies are read (and their queries run) inside the timing.
+            response = test_client.open(path, method=method, json=body, headers=headers, buffered=True)
+            local_latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="In-process load test of every endpoint against a fake Firestore.")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads (default: 8).")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds of load per endpoint (default: 5).")
+    parser.add_argument("--latency-ms", type=float, default=5, help="Injected latency per RPC (default: 5).")
+    parser.add_argument("--jitter-ms", type=float, default=1, help="Uniform +/- jitter per RPC (default: 1).")
+    parser.add_argument("--users", type=int, default=100, help="Distinct seeded users (default: 100).")
+    parser.add_argument("--tasks", type=int, default=20, help="Routine tasks per seeded user (default: 20).")
+    parser.add_argument(
+        "--auth",
+        choices=("dev", "token"),
+        default="dev",
+        help="dev: X-User-Id header; token: cached bearer tokens, exercising identity resolution.",
+    )
+    parser.add_argument("--enforce-budgets", action="store_true", help="Exit 1 if a hot path exceeds its RPC budget.")
+    args = parser.parse_args()
+
+    if args.concurrency <= 0 or args.duration <= 0 or args.users <= 0 or args.tasks < 0:
+        raise ValueError("--concurrency, --duration and --users must be positive; --tasks non-negative.")
+    if args.latency_ms < 0 or args.jitter_ms < 0 or args.jitter_ms > args.latency_ms:
+        raise ValueError("--latency-ms and --jitter-ms must be non-negative with jitter <= latency.")
+
+    app = _import_app()
+    check_failures = _check_streak_replay(app) + _check_progress_limits(app)
+    for line in check_failures:
+        print(f"[CHECK FAILED] {line}")
+    db = FakeFirestoreClient(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=0)
+    app._db = db
+    user_ids = [f"load-user-{index}" for index in range(args.users)]
+    _seed(db, user_ids, args.tasks)
+    factory = _RequestFactory(user_ids, args.auth, app)
+
+    print(
+        f"Concurrency: {args.concurrency} | duration: {args.duration:g}s/endpoint | "
+        f"RPC latency: {args.latency_ms:g}+/-{args.jitter_ms:g} ms | auth: {args.auth}"
+    )
+    print(f"{'endpoint':<30} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rpc/req':>8} {'errors':>7}")
+    # Resolve every user's identity (and build their users/{uid} snapshot when USER_SNAPSHOT=1)
+    # once so steady-state RPC counts are measured.
+    warm_client = app.app.test_client()
+    for user_id in user_ids:
+        method, path, body, headers = factory.build("get_user_subscription")
+        warm_client.open(path, method=method, json=body, headers=headers)
+        if app.USER_SNAPSHOT:
+            app._rebuild_user_snapshot(db.transaction(), db, user_id)
+
+    over_budget = []
+    for endpoint in args.endpoints:
+        rpcs_before = db.total_rpcs()
+        latencies, errors = _drive(app, lambda: factory.build(endpoint), args.concurrency, args.duration)
+        rpcs_per_request = (db.total_rpcs() - rpcs_before) / max(1, len(latencies))
+        latencies.sort()
+        print(
+            f"{endpoint:<30} {len(latencies) / args.duration:>9,.1f} "
+            f"{statistics.median(latencies) * 1000 if latencies else 0:>8.2f} "
+            f"{_percentile(latencies, 0.95) * 1000:>8.2f} {_percentile(latencies, 0.99) * 1000:>8.2f} "
+            f"{rpcs_per_request:>8.2f} {errors:>7}"
+        )
+        budget = RPC_BUDGETS.get(endpoint)
+        if budget is not None and rpcs_per_request > budget + 0.01:
+            over_budget.append(f"{endpoint}: {rpcs_per_request:.2f} RPCs/request (budget {budget})")
+
+    for line in over_budget:
+        print(f"[OVER BUDGET] {line}")
+    if check_failures:
+        return 1
+    return 1 if over_budget and args.enforce_budgets else 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Compare requests/sec per instance between the sync (Flask) and async (Quart) serving modes.
+
+For each mode the script starts one gunicorn instance with `gunicorn.conf.py`, checks
+that it returns the same response body as the other mode, then drives it with a fixed
+number of concurrent clients for a fixed duration and reports throughput and latency.
+
+Run it against the Firestore emulator (or a test project) so the endpoints do real RPCs.
+
+Usage examples:
+  FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 GOOGLE_CLOUD_PROJECT=demo-unstoppable \\
+    python scripts/load_test_serving_modes.py --path /v1/bootstrap --concurrency 64
+  python scripts/load_test_serving_modes.py --modes async --duration 30 --workers 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(mode: str, workers: int, timeout: float) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "SERVING_MODE": mode,
+        "GUNICORN_WORKERS": str(workers),
+        "ALLOW_DEV_USER_HEADER": "1",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+        cwd=API_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn ({mode}) exited with status {server.returncode}.")
+        try:
+            with urllib.request.urlopen(f"{base_url}/healthz", timeout=timeout):
+                return server, base_url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError(f"gunicorn ({mode}) did not become healthy within {timeout:.0f}s.")
+
+
+def _fetch(url: str, user_id: str) -> tuple[int, bytes]:
+    req = urllib.request.Request(url, headers={"X-User-Id": user_id})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def _drive(url: str, user_id: str, concurrency: int, duration: float) -> tuple[int, int, list[float]]:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        nonlocal errors
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status, _ = _fetch(url, user_id)
+            except (urllib.error.URLError, ConnectionError):
+                status = 0
+            local_latencies.append(time.perf_counter() - started)
+            if status != 200:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return len(latencies), errors, latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the sync and async serving modes against each other.")
+    parser.add_argument("--path", default="/v1/bootstrap", help="Endpoint to load (default: /v1/bootstrap).")
+    parser.add_argument("--user-id", default="load-test-user", help="X-User-Id sent with every request.")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32).")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of load per mode (default: 15).")
+    parser.add_argument("--workers", type=int, default=1, help="Gunicorn workers per instance (default: 1).")
+    parser.add_argument("--startup-timeout", type=float, default=60, help="Seconds to wait for /healthz.")
+    args = parser.parse_args()
+
+    if args.concurrency <= 0 or args.duration <= 0 or args.workers <= 0:
+        raise ValueError("--concurrency, --duration and --workers must be positive.")
+
+    reference_body: bytes | None = None
+    for mode in args.modes:
+        server, base_url = _start_server(mode, args.workers, args.startup_timeout)
+        try:
+            url = f"{base_url}{args.path}"
+            status, body = _fetch(url, args.user_id)
+            if status != 200:
+                raise RuntimeError(f"{mode}: {args.path} returned {status}: {body[:200]!r}")
+            if reference_body is None:
+                reference_body = body
+            elif body != reference_body:
+                raise RuntimeError(f"{mode}: response body differs from {args.modes[0]} mode.")
+
+            # Warm connections and caches before the measured window.
+            _drive(url, args.user_id, args.concurrency, duration=min(2.0, args.duration))
+            total, errors, latencies = _drive(url, args.user_id, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        print(f"[{mode}] {args.path} workers={args.workers} concurrency={args.concurrency}")
+        print(f"  requests/sec: {total / args.duration:,.1f}")
+        print(f"  errors: {errors}/{total}")
+        if latencies:
+            print(f"  latency p50: {statistics.median(latencies) * 1000:,.1f} ms | p99: {p99 * 1000:,.1f} ms")
+    if len(args.modes) > 1:
+        print("Response bodies matched across modes.")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 """Backfill users/{uid}/payments/subscription.paymentOption from profile data.
 
+Each copy goes through the API's subscription write, so it also stores the derived entitlement
+fields and profile/self.completionRequirements.paymentOption, and it clears
+users/{uid}.snapshotVersion in the same write so the next bootstrap rebuilds the user snapshot
+instead of serving its stale subscription section.
+
 Usage examples:
   python scripts/migrate_payment_option_to_subscription.py --email user@example.com
   python scripts/migrate_payment_option_to_subscription.py --uid firebase-uid
   python scripts/migrate_payment_option_to_subscription.py --all
   python scripts/migrate_payment_option_to_subscription.py --all --apply
+  python scripts/migrate_payment_option_to_subscription.py --all --stream --workers 8 --chunk-size 200
+  python scripts/migrate_payment_option_to_subscription.py --all --stream --apply --checkpoint migrate.ckpt.json
 """
 
 from __future__ import annotations
 
 import argparse
+import itertools
+import json
 import os
 import sys
-from typing import Any, Iterable
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 
 def _normalize_email(raw: str) -> str:
@@ -41,6 +54,15 @@ def _coerce_payment_option(value: Any) -> str | None:
     return aliases.get(normalized, normalized)
 
 
+def _import_app() -> Any:
+    # Keep the app from starting its background certificate fetch on import.
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
 def _init_firestore(project_id: str | None) -> Any:
     import firebase_admin
     from firebase_admin import credentials, firestore
@@ -88,6 +110,196 @@ def _iter_target_uids(db: Any, *, email: str | None, uid: str | None, all_users:
     yield _resolve_uid(db, email=email, uid=uid)
 
 
+def _plan_user(
+    uid: str, profile_data: dict[str, Any], subscription_data: dict[str, Any]
+) -> tuple[str, str | None, str | None]:
+    """Decide what to do for one user: (outcome, option to copy, conflict message)."""
+    profile_option = _coerce_payment_option(profile_data.get("paymentOption"))
+    subscription_option = _coerce_payment_option(subscription_data.get("paymentOption"))
+
+    if subscription_option:
+        if profile_option and profile_option != subscription_option:
+            return (
+                "skipped_existing",
+                None,
+                f"[CONFLICT] users/{uid}: "
+                f"profile.paymentOption={profile_option} subscription.paymentOption={subscription_option}",
+            )
+        return "skipped_existing", None, None
+
+    if not profile_option:
+        return "skipped_missing", None, None
+    return "copy", profile_option, None
+
+
+def _subscription_payload(payment_option: str) -> dict[str, Any]:
+    from firebase_admin import firestore
+
+    return {
+        "paymentOption": payment_option,
+        "provider": "profile_sync",
+        "source": "profile_payment_option_migration",
+        "updatedAt": firestore.SERVER_TIMESTAMP,
+    }
+
+
+def _copy_writes(app: Any, subscription_ref: Any, payment_option: str) -> list[tuple[Any, dict[str, Any]]]:
+    """The subscription merge (with the profile requirement flag the API writes alongside it)
+    plus the users/{uid} snapshot invalidation, as (ref, merge data) pairs."""
+    from firebase_admin import firestore
+
+    writes = app._subscription_writes(subscription_ref, _subscription_payload(payment_option))
+    writes.append((subscription_ref.parent.parent, {"snapshotVersion": firestore.DELETE_FIELD}))
+    return writes
+
+
+def _iter_all_uids_streaming(db: Any, page_size: int) -> Iterator[str]:
+    # list_documents also returns users/{uid} parents that only have subcollections,
+    # in ascending document id order.
+    for ref in db.collection("users").list_documents(page_size=page_size):
+        raw_uid = str(ref.id).strip()
+        if raw_uid:
+            yield raw_uid
+
+
+def _chunked(values: Iterable[str], size: int) -> Iterator[list[str]]:
+    iterator = iter(values)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _load_checkpoint(path: Path | None) -> dict[str, Any]:
+    if path is None or not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _save_checkpoint(path: Path, last_uid: str, counts: Counter) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump({"lastCompletedUid": last_uid, "counts": dict(counts)}, handle, indent=2, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def _run_streaming(db: Any, app: Any, args: argparse.Namespace, dry_run: bool) -> int:
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else None
+    checkpoint = _load_checkpoint(checkpoint_path) if not dry_run else {}
+    resume_after = checkpoint.get("lastCompletedUid")
+    counts: Counter = Counter(checkpoint.get("counts", {}))
+
+    print(f"Mode: {'DRY-RUN' if dry_run else 'APPLY'} (streaming)")
+    print(f"Workers: {args.workers} | chunk size: {args.chunk_size}")
+    if resume_after:
+        print(f"Resuming after users/{resume_after}")
+
+    bulk_writer = None
+    bulk_lock = threading.Lock()
+    if not dry_run:
+        bulk_writer = db.bulk_writer()
+
+        def on_write_error(error: Any) -> bool:
+            if error.attempts < 3:
+                return True
+            path = error.operation.reference.path
+            with bulk_lock:
+                counts["errors"] += 1
+                if path.endswith("/payments/subscription"):
+                    counts["copied"] -= 1
+            print(f"[ERROR] {path}: write failed: {error.message}")
+            return False
+
+        bulk_writer.on_write_error(on_write_error)
+
+    def process_chunk(uids: list[str]) -> tuple[Counter, list[str]]:
+        chunk_counts: Counter = Counter()
+        lines: list[str] = []
+        refs = []
+        for uid in uids:
+            user_ref = db.collection("users").document(uid)
+            refs.append(user_ref.collection("profile").document("self"))
+            refs.append(user_ref.collection("payments").document("subscription"))
+        try:
+            snapshots = {snapshot.reference.path: snapshot for snapshot in db.get_all(refs)}
+        except Exception as exc:  # pragma: no cover - defensive path
+            chunk_counts["scanned"] += len(uids)
+            chunk_counts["errors"] += len(uids)
+            lines.append(f"[ERROR] users/{uids[0]}..{uids[-1]}: failed to read docs: {exc}")
+            return chunk_counts, lines
+
+        for profile_ref, subscription_ref, uid in zip(refs[0::2], refs[1::2], uids):
+            chunk_counts["scanned"] += 1
+            profile_doc = snapshots.get(profile_ref.path)
+            subscription_doc = snapshots.get(subscription_ref.path)
+            profile_data = (profile_doc.to_dict() or {}) if profile_doc and profile_doc.exists else {}
+            subscription_data = (
+                (subscription_doc.to_dict() or {}) if subscription_doc and subscription_doc.exists else {}
+            )
+            outcome, payment_option, conflict = _plan_user(uid, profile_data, subscription_data)
+            if conflict:
+                chunk_counts["conflicts"] += 1
+                lines.append(conflict)
+            if outcome != "copy":
+                chunk_counts[outcome] += 1
+                continue
+
+            chunk_counts["copied"] += 1
+            if dry_run:
+                lines.append(f"[DRY-RUN] Would copy users/{uid}/payments/subscription.paymentOption={payment_option}")
+                continue
+            with bulk_lock:
+                for ref, data in _copy_writes(app, subscription_ref, payment_option):
+                    bulk_writer.set(ref, data, merge=True)
+            lines.append(f"[OK] Copied users/{uid}/payments/subscription.paymentOption={payment_option}")
+        return chunk_counts, lines
+
+    uids: Iterable[str] = _iter_all_uids_streaming(db, page_size=max(args.chunk_size, 100))
+    if resume_after:
+        uids = itertools.dropwhile(lambda uid: uid <= resume_after, uids)
+
+    chunks_since_checkpoint = 0
+    in_flight: list[tuple[Future, str]] = []
+
+    def drain(limit: int) -> None:
+        nonlocal chunks_since_checkpoint
+        # Results are consumed in submission order, so the checkpoint only ever advances
+        # past chunks that are fully processed.
+        while len(in_flight) > limit:
+            future, last_uid = in_flight.pop(0)
+            chunk_counts, lines = future.result()
+            for line in lines:
+                print(line)
+            with bulk_lock:
+                counts.update(chunk_counts)
+            chunks_since_checkpoint += 1
+            if checkpoint_path is not None and not dry_run and (
+                chunks_since_checkpoint >= args.checkpoint_every or not in_flight
+            ):
+                bulk_writer.flush()
+                _save_checkpoint(checkpoint_path, last_uid, counts)
+                chunks_since_checkpoint = 0
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for chunk in _chunked(uids, args.chunk_size):
+            in_flight.append((pool.submit(process_chunk, chunk), chunk[-1]))
+            drain(limit=args.workers * 2)
+        drain(limit=0)
+
+    if bulk_writer is not None:
+        bulk_writer.close()
+        if checkpoint_path is not None and counts["scanned"]:
+            checkpoint_path.unlink(missing_ok=True)
+            print(f"Completed; removed checkpoint {checkpoint_path}")
+
+    print("\nSummary")
+    for key in ("scanned", "copied", "skipped_existing", "skipped_missing", "conflicts", "errors"):
+        print(f"- {key}: {counts[key]}")
+    return 0 if counts["errors"] == 0 else 1
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Backfill paymentOption from users/{uid}/profile/self into users/{uid}/payments/subscription."
@@ -106,10 +318,40 @@ def main() -> int:
         action="store_true",
         help="Apply writes. Default is dry-run.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="With --all: stream users in chunks with batched reads, a worker pool and a bulk writer.",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Streaming worker threads (default: 4).")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100,
+        help="Users per batched read in streaming mode (default: 100).",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Streaming --apply checkpoint file; an interrupted run resumes after the last completed user.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=10,
+        help="Chunks between checkpoint writes (default: 10).",
+    )
     args = parser.parse_args()
 
+    if args.stream and not args.all:
+        raise ValueError("--stream requires --all.")
+    if args.workers <= 0 or args.chunk_size <= 0 or args.checkpoint_every <= 0:
+        raise ValueError("--workers, --chunk-size and --checkpoint-every must be positive.")
+
     dry_run = not args.apply
     db = _init_firestore(args.project_id)
+    app = _import_app()
+    if args.stream:
+        return _run_streaming(db, app, args, dry_run)
     uids = sorted(set(_iter_target_uids(db, email=args.email, uid=args.uid, all_users=args.all)))
 
     if not uids:
@@ -127,8 +369,6 @@ def main() -> int:
     print(f"Mode: {'DRY-RUN' if dry_run else 'APPLY'}")
     print(f"Target users: {len(uids)}")
 
-    from firebase_admin import firestore
-
     for uid in uids:
         scanned += 1
         user_ref = db.collection("users").document(uid)
@@ -146,37 +386,27 @@ def main() -> int:
         profile_data = profile_doc.to_dict() if profile_doc.exists else {}
         subscription_data = subscription_doc.to_dict() if subscription_doc.exists else {}
 
-        profile_option = _coerce_payment_option(profile_data.get("paymentOption"))
-        subscription_option = _coerce_payment_option(subscription_data.get("paymentOption"))
-
-        if subscription_option:
+        outcome, profile_option, conflict = _plan_user(uid, profile_data, subscription_data)
+        if conflict:
+            conflicts += 1
+            print(conflict)
+        if outcome == "skipped_existing":
             skipped_existing += 1
-            if profile_option and profile_option != subscription_option:
-                conflicts += 1
-                print(
-                    f"[CONFLICT] users/{uid}: "
-                    f"profile.paymentOption={profile_option} subscription.paymentOption={subscription_option}"
-                )
             continue
-
-        if not profile_option:
+        if outcome == "skipped_missing":
             skipped_missing += 1
             continue
 
-        payload = {
-            "paymentOption": profile_option,
-            "provider": "profile_sync",
-            "source": "profile_payment_option_migration",
-            "updatedAt": firestore.SERVER_TIMESTAMP,
-        }
-
         if dry_run:
             copied += 1
             print(f"[DRY-RUN] {action} users/{uid}/payments/subscription.paymentOption={profile_option}")
             continue
 
         try:
-            subscription_ref.set(payload, merge=True)
+            batch = db.batch()
+            for ref, data in _copy_writes(app, subscription_ref, profile_option):
+                batch.set(ref, data, merge=True)
+            batch.commit()
             copied += 1
             print(f"[OK] {action} users/{uid}/payments/subscription.paymentOption={profile_option}")
         except Exception as exc:  # pragma: no cover - defensive path
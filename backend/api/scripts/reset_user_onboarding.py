@@ -6,8 +6,10 @@ It deletes docs under users/{uid} for:
   - profile/*
   - routine/*
   - progress/*
+  - progressMonths/*
   - stats/*
   - payments/*
+and the users/{uid} snapshot document itself (rebuilt by the next bootstrap).
 
 Usage examples:
   python scripts/reset_user_onboarding.py --email user@example.com
@@ -22,7 +24,7 @@ import os
 import sys
 from typing import Any
 
-SUBCOLLECTIONS_TO_CLEAR = ("profile", "routine", "progress", "stats", "payments")
+SUBCOLLECTIONS_TO_CLEAR = ("profile", "routine", "progress", "progressMonths", "stats", "payments")
 BATCH_SIZE = 200
 
 
@@ -111,6 +113,10 @@ def main() -> int:
         action = "Would delete" if args.dry_run else "Deleted"
         print(f"{action} {deleted} doc(s) in {col_ref.path}")
 
+    if not args.dry_run:
+        user_ref.delete()
+    print(f"{'Would delete' if args.dry_run else 'Deleted'} snapshot doc {user_ref.path}")
+
     if args.dry_run:
         print("Dry run: no changes applied.")
     else:
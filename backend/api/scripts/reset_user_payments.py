@@ -3,6 +3,8 @@
 
 This script deletes documents under:
   - users/{uid}/payments/*
+and the users/{uid} snapshot document (rebuilt by the next bootstrap), and marks an
+existing profile/self's stored paymentOption completion requirement as unmet.
 
 Optional:
   - payments/revenuecat/events/* for the same user id
@@ -135,6 +137,20 @@ def main() -> int:
     deleted_payments = _delete_collection_docs(db, payments_ref, dry_run=args.dry_run)
     action = "Would delete" if args.dry_run else "Deleted"
     print(f"{action} {deleted_payments} doc(s) in {payments_path}")
+    if not args.dry_run:
+        from google.api_core import exceptions as google_exceptions
+
+        user_ref = db.collection("users").document(uid)
+        # The profile's stored paymentOption requirement flag mirrors the deleted subscription.
+        # update() rather than a merge so a user without a profile does not get one.
+        try:
+            user_ref.collection("profile").document("self").update(
+                {"completionRequirements.paymentOption": False}
+            )
+        except google_exceptions.NotFound:
+            print(f"No profile doc users/{uid}/profile/self; requirement flag left unset")
+        user_ref.delete()
+    print(f"{action} snapshot doc users/{uid}")
 
     if args.clear_webhook_events:
         deleted_events = _delete_revenuecat_event_docs(db, uid=uid, dry_run=args.dry_run)
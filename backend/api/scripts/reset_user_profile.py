@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Reset only the profile document for a user in Firestore.
 
+The users/{uid} snapshot document is deleted too, so the next bootstrap rebuilds it.
+
 Usage examples:
   python scripts/reset_user_profile.py --email user@example.com
   python scripts/reset_user_profile.py --uid firebase-uid
@@ -78,8 +80,11 @@ def main() -> int:
         print("Dry run: no changes applied.")
         return 0
 
-    profile_ref.delete()
-    print("Deleted profile document.")
+    batch = db.batch()
+    batch.delete(profile_ref)
+    batch.delete(db.collection("users").document(uid))
+    batch.commit()
+    print("Deleted profile and snapshot documents.")
     return 0
 
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Stress the RevenueCat webhook with interleaved events for a single user.
+
+Each round fires a shuffled set of events (with distinct event timestamps) for one
+fresh user from several threads at once, then checks that
+users/{uid}/payments/subscription reflects the newest event.
+
+Runs against the Firestore emulator by default; set FIRESTORE_EMULATOR_HOST first:
+  gcloud emulators firestore start --host-port=127.0.0.1:8088
+  export FIRESTORE_EMULATOR_HOST=127.0.0.1:8088
+  python scripts/stress_revenuecat_webhook.py --rounds 20 --events 12 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+WEBHOOK_SECRET = "stress-webhook-secret"
+EVENT_TYPES = ["INITIAL_PURCHASE", "RENEWAL", "CANCELLATION", "UNCANCELLATION", "EXPIRATION"]
+
+
+def _import_app() -> Any:
+    os.environ["REVENUECAT_WEBHOOK_AUTH"] = WEBHOOK_SECRET
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "unstoppable-stress")
+    os.environ["LOCAL_ID_TOKEN_VERIFICATION"] = "0"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    import app
+
+    return app
+
+
+def _build_events(uid: str, count: int, base_ms: int) -> list[dict[str, Any]]:
+    events = []
+    for index in range(count):
+        events.append(
+            {
+                "id": f"stress-{uid}-{index}",
+                "type": random.choice(EVENT_TYPES),
+                "app_user_id": uid,
+                "product_id": random.choice(["unstoppable_monthly", "unstoppable_annual"]),
+                "event_timestamp_ms": base_ms + index * 1000,
+            }
+        )
+    return events
+
+
+def _run_round(app: Any, events: list[dict[str, Any]], threads: int, duplicates: int) -> None:
+    deliveries = events + random.sample(events, min(duplicates, len(events)))
+    random.shuffle(deliveries)
+    headers = {"Authorization": f"Bearer {WEBHOOK_SECRET}"}
+
+    def deliver(event: dict[str, Any]) -> int:
+        client = app.app.test_client()
+        response = client.post("/v1/payments/revenuecat/webhook", json={"event": event}, headers=headers)
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(deliver, deliveries))
+    failed = [status for status in statuses if status != 200]
+    if failed:
+        raise RuntimeError(f"{len(failed)} webhook deliveries failed with statuses {sorted(set(failed))}.")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Fire interleaved RevenueCat webhook events for one user and verify final state."
+    )
+    parser.add_argument("--rounds", type=int, default=10, help="Number of users/rounds (default: 10).")
+    parser.add_argument("--events", type=int, default=10, help="Events per round (default: 10).")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent deliveries (default: 8).")
+    parser.add_argument(
+        "--duplicates",
+        type=int,
+        default=3,
+        help="Extra redeliveries of random events per round (default: 3).",
+    )
+    parser.add_argument(
+        "--allow-live",
+        action="store_true",
+        help="Allow running without FIRESTORE_EMULATOR_HOST (writes to a real project).",
+    )
+    args = parser.parse_args()
+
+    if args.rounds <= 0 or args.events <= 0 or args.threads <= 0 or args.duplicates < 0:
+        raise ValueError("--rounds, --events and --threads must be positive; --duplicates non-negative.")
+    if not os.getenv("FIRESTORE_EMULATOR_HOST", "").strip() and not args.allow_live:
+        raise ValueError("Set FIRESTORE_EMULATOR_HOST (or pass --allow-live to target a real project).")
+
+    app = _import_app()
+    db = app._get_db()
+    mismatches = 0
+
+    for round_index in range(args.rounds):
+        uid = f"stress-{uuid.uuid4().hex[:12]}"
+        events = _build_events(uid, args.events, base_ms=1_700_000_000_000)
+        _run_round(app, events, threads=args.threads, duplicates=args.duplicates)
+
+        newest = events[-1]
+        subscription_doc = (
+            db.collection("users").document(uid).collection("payments").document("subscription").get()
+        )
+        subscription = subscription_doc.to_dict() if subscription_doc.exists else {}
+        if subscription.get("rawEventId") != newest["id"]:
+            mismatches += 1
+            print(
+                f"[MISMATCH] round {round_index}: users/{uid} rawEventId="
+                f"{subscription.get('rawEventId')} expected={newest['id']}"
+            )
+        else:
+            print(f"[OK] round {round_index}: users/{uid} rawEventId={newest['id']}")
+
+    print("\nSummary")
+    print(f"- rounds: {args.rounds}")
+    print(f"- events per round: {args.events} (+{args.duplicates} redeliveries)")
+    print(f"- mismatches: {mismatches}")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
@@ -1,16 +1,620 @@
+import base64
+import bisect
+import contextvars
 import datetime as dt
+import gzip
+import hashlib
+import inspect
+import json
 import os
+import re
 import secrets
-from typing import Any
-
+import threading
+import queue
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, NamedTuple
+
+import brotli
 import firebase_admin
-from firebase_admin import auth, credentials, firestore
-from flask import Flask, jsonify, request
+from firebase_admin import credentials, firestore
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from google.api_core import exceptions as google_exceptions
+from google.auth import jwt as google_jwt
 
 
 _db: firestore.Client | None = None
 
+FIREBASE_ID_TOKEN_CERT_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+FIREBASE_ID_TOKEN_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+class _TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL or an explicit deadline."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> int:
+        with self._lock:
+            stale_keys = [key for key in self._entries if predicate(key)]
+            for key in stale_keys:
+                del self._entries[key]
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class _AliasWriteThrottle:
+    """Elides "last seen" alias writes that would not change the alias mapping.
+
+    A write is skipped when the doc was last written by this process with the same
+    canonicalUserId/email less than the configured interval ago; lastSeen* fields are
+    refreshed at most once per interval.
+    """
+
+    def __init__(self, min_interval_seconds: float, max_entries: int) -> None:
+        self._last_writes = _TTLCache(max_entries=max_entries, ttl_seconds=min_interval_seconds)
+        self._lock = threading.Lock()
+        self.performed = 0
+        self.skipped = 0
+
+    def should_write(self, path: str, fingerprint: tuple[Any, ...]) -> bool:
+        if self._last_writes.get(path) == fingerprint:
+            with self._lock:
+                self.skipped += 1
+            return False
+        return True
+
+    def record_write(self, path: str, fingerprint: tuple[Any, ...]) -> None:
+        self._last_writes.set(path, fingerprint)
+        with self._lock:
+            self.performed += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"performed": self.performed, "skipped": self.skipped}
+
+
+class _SingleFlight:
+    """Coalesces concurrent reads of the same document path into one in-flight RPC.
+
+    Paths nobody is reading yet are fetched by the caller in one batched read; paths
+    another thread is already fetching are awaited and share that thread's snapshot.
+    Reads with different field masks never share a flight. A caller only joins a flight
+    that started no earlier than `not_before` (its request's start), so it still sees
+    every write committed before its request began; older flights are superseded by a
+    fresh read. Nothing is kept once the read completes.
+    """
+
+    class _Flight:
+        def __init__(self) -> None:
+            self.started = time.perf_counter()
+            self.done = threading.Event()
+            self.snapshot: Any = None
+            self.error: BaseException | None = None
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple[str, tuple[str, ...] | None], _SingleFlight._Flight] = {}
+        self.fetched = 0
+        self.coalesced = 0
+
+    def get_documents(
+        self,
+        refs: list[Any],
+        fetch: Callable[[list[Any]], dict[str, Any]],
+        field_paths: tuple[str, ...] | None = None,
+        not_before: float | None = None,
+    ) -> tuple[dict[str, Any], bool]:
+        """Return (snapshots by path, whether this caller issued an RPC); `fetch` applies `field_paths`.
+
+        `not_before` is a `time.perf_counter()` value; flights started before it are not joined.
+        """
+        if not self.enabled:
+            return fetch(refs), True
+
+        owned: list[tuple[Any, _SingleFlight._Flight]] = []
+        awaited: list[tuple[str, _SingleFlight._Flight]] = []
+        with self._lock:
+            for ref in refs:
+                flight = self._in_flight.get((ref.path, field_paths))
+                if flight is None or (not_before is not None and flight.started < not_before):
+                    flight = self._in_flight[(ref.path, field_paths)] = _SingleFlight._Flight()
+                    owned.append((ref, flight))
+                else:
+                    awaited.append((ref.path, flight))
+        self.record(fetched=len(owned), coalesced=len(awaited))
+
+        snapshots: dict[str, Any] = {}
+        if owned:
+            try:
+                fetched = fetch([ref for ref, _ in owned])
+            except BaseException as exc:
+                self._finish(owned, field_paths, error=exc)
+                raise
+            for ref, flight in owned:
+                flight.snapshot = snapshots[ref.path] = fetched.get(ref.path)
+            self._finish(owned, field_paths)
+
+        for path, flight in awaited:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            snapshots[path] = flight.snapshot
+        return snapshots, bool(owned)
+
+    def _finish(
+        self,
+        owned: list[tuple[Any, "_SingleFlight._Flight"]],
+        field_paths: tuple[str, ...] | None,
+        error: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            for ref, flight in owned:
+                # A newer flight may have superseded this one; leave it for its own owner to finish.
+                if self._in_flight.get((ref.path, field_paths)) is flight:
+                    del self._in_flight[(ref.path, field_paths)]
+        for _, flight in owned:
+            flight.error = error
+            flight.done.set()
+
+    def record(self, fetched: int, coalesced: int) -> None:
+        with self._lock:
+            self.fetched += fetched
+            self.coalesced += coalesced
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.fetched + self.coalesced
+            return {
+                "inFlight": len(self._in_flight),
+                "fetched": self.fetched,
+                "coalesced": self.coalesced,
+                "coalescingRatio": self.coalesced / total if total else 0.0,
+            }
+
+
+_SUBSCRIPTION_PATH = re.compile(r"users/[^/]+/payments/subscription\Z")
+
+
+class _SubscriptionCache:
+    """Optional in-process cache of `users/{uid}/payments/subscription` snapshots.
+
+    This process's own writes invalidate entries directly; writes from other instances arrive
+    through a Firestore listener on subscription docs updated since it started. Entries are
+    only served while the listener is streaming, and expire after the TTL regardless. Reads
+    that started before an invalidation are never cached, so a read racing a write can't put
+    the old document back; an invalidation issued before its commit extends that to reads
+    starting within `COMMIT_HOLD_SECONDS`.
+    """
+
+    COMMIT_HOLD_SECONDS = 10.0
+    # Invalidations are remembered this long; slower reads are never cached.
+    MAX_READ_SECONDS = 60.0
+    SUPERVISE_INTERVAL_SECONDS = 5.0
+    # Listener queries reach back this far, so a replacement listener overlaps the one it replaces.
+    LISTENER_LOOKBACK_SECONDS = 60.0
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: float, rotate_seconds: float) -> None:
+        self._entries = _TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.enabled = enabled and self._entries.enabled
+        self.rotate_seconds = rotate_seconds
+        self._lock = threading.Lock()
+        self._held_until: OrderedDict[str, float] = OrderedDict()
+        self._live_since: float | None = None
+        self._watch: Any = None
+        self._watch_started_at = 0.0
+        self._thread: threading.Thread | None = None
+        self.invalidations = 0
+        self.listener_starts = 0
+
+    @staticmethod
+    def caches(path: str) -> bool:
+        return _SUBSCRIPTION_PATH.match(path) is not None
+
+    def get(self, path: str) -> Any | None:
+        if not self.enabled:
+            return None
+        self.start()
+        if self._live_since is None:
+            return None
+        return self._entries.get(path)
+
+    def put(self, path: str, snapshot: Any, read_started: float) -> None:
+        """Cache a full snapshot read by a request that started at `read_started` (monotonic)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._live_since is None or read_started < self._live_since:
+                return
+            if time.monotonic() - read_started > self.MAX_READ_SECONDS:
+                return
+            if read_started < self._held_until.get(path, 0.0):
+                return
+            self._entries.set(path, snapshot)
+
+    def invalidate(self, path: str, before_commit: bool = False) -> None:
+        if not self.enabled or not self.caches(path):
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(path)
+            hold_until = now + (self.COMMIT_HOLD_SECONDS if before_commit else 0.0)
+            self._held_until[path] = max(hold_until, self._held_until.get(path, 0.0))
+            self._held_until.move_to_end(path)
+            while self._held_until and next(iter(self._held_until.values())) < now - self.MAX_READ_SECONDS:
+                self._held_until.popitem(last=False)
+            self.invalidations += 1
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="subscription-cache-listener", daemon=True)
+            self._thread.start()
+
+    def _set_live(self, live: bool) -> None:
+        with self._lock:
+            if not live:
+                self._live_since = None
+                self._entries.clear()
+            elif self._live_since is None:
+                self._live_since = time.monotonic()
+
+    def _listen(self) -> tuple[Any, threading.Event]:
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        caught_up = threading.Event()
+
+        def on_snapshot(_documents: Any, changes: Any, _read_time: Any) -> None:
+            for change in changes:
+                self.invalidate(change.document.reference.path)
+            caught_up.set()
+            self._set_live(True)
+
+        since = dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=self.LISTENER_LOOKBACK_SECONDS)
+        query = _get_db().collection_group("payments").where(filter=FieldFilter("updatedAt", ">", since))
+        watch = query.on_snapshot(on_snapshot)
+        self.listener_starts += 1
+        return watch, caught_up
+
+    def _supervise(self) -> None:
+        watch = self._watch
+        if watch is None or not watch.is_active:
+            self._set_live(False)
+            if watch is not None:
+                app.logger.warning("Subscription cache listener stopped; restarting it.")
+                watch.close()
+            self._watch, _ = self._listen()
+            self._watch_started_at = time.monotonic()
+        elif time.monotonic() - self._watch_started_at >= self.rotate_seconds:
+            # The listener keeps every document it has matched; replace it to bound memory,
+            # closing the old one only once the new one has caught up.
+            replacement, caught_up = self._listen()
+            if caught_up.wait(60):
+                self._watch, self._watch_started_at = replacement, time.monotonic()
+                watch.close()
+            else:
+                replacement.close()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._supervise()
+            except Exception:
+                app.logger.warning("Subscription cache listener failed to start.", exc_info=True)
+                self._set_live(False)
+            time.sleep(self.SUPERVISE_INTERVAL_SECONDS)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            live = self._live_since is not None
+            invalidations = self.invalidations
+        return {
+            **self._entries.stats(),
+            "live": int(live),
+            "invalidations": invalidations,
+            "listenerStarts": self.listener_starts,
+        }
+
+
+class _MetricsRegistry:
+    """In-process counters and latency histograms rendered in Prometheus text format.
+
+    Recording is a dict update under one lock; label values are kept low-cardinality
+    (endpoint names, RPC methods, collection paths without document ids). Every series also
+    carries `const_labels` naming the process, since each gunicorn worker on each instance
+    keeps its own registry and a scrape reaches whichever process serves it.
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, const_labels: dict[str, str] | None = None) -> None:
+        self._const_names = tuple(const_labels or {})
+        self._const_values = tuple((const_labels or {}).values())
+        self._lock = threading.Lock()
+        self._metadata: dict[str, tuple[str, str, tuple[str, ...]]] = {}
+        self._counters: dict[str, dict[tuple[str, ...], float]] = {}
+        # name -> labels -> [per-bucket counts (last is +Inf), sum]
+        self._histograms: dict[str, dict[tuple[str, ...], list[Any]]] = {}
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...]) -> None:
+        self._metadata[name] = ("counter", help_text, label_names)
+        self._counters[name] = {}
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...]) -> None:
+        self._metadata[name] = ("histogram", help_text, label_names)
+        self._histograms[name] = {}
+
+    def inc(self, name: str, labels: tuple[str, ...], value: float = 1) -> None:
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: tuple[str, ...], seconds: float) -> None:
+        index = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            series = self._histograms[name]
+            entry = series.get(labels)
+            if entry is None:
+                entry = series[labels] = [[0] * (len(self.BUCKETS) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += seconds
+
+    def render(self, gauges: dict[str, float] | None = None) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in self._metadata.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                label_names = (*self._const_names, *label_names)
+                if kind == "counter":
+                    for labels, value in self._counters[name].items():
+                        label_text = _prometheus_labels(label_names, (*self._const_values, *labels))
+                        lines.append(f"{name}{label_text} {value:g}")
+                    continue
+                for labels, (bucket_counts, total) in self._histograms[name].items():
+                    labels = (*self._const_values, *labels)
+                    cumulative = 0
+                    for bound, count in zip((*self.BUCKETS, "+Inf"), bucket_counts):
+                        cumulative += count
+                        bucket_labels = _prometheus_labels((*label_names, "le"), (*labels, str(bound)))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    label_text = _prometheus_labels(label_names, labels)
+                    lines.append(f"{name}_sum{label_text} {total:.6f}")
+                    lines.append(f"{name}_count{label_text} {cumulative}")
+        const_text = _prometheus_labels(self._const_names, self._const_values)
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{const_text} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_prometheus_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _prometheus_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Workers import the app after fork, so this names one worker process for its lifetime.
+_metrics = _MetricsRegistry({"revision": os.getenv("K_REVISION", "local"), "process": secrets.token_hex(6)})
+_metrics.histogram(
+    "unstoppable_http_request_seconds", "Request latency by endpoint.", ("endpoint", "method", "status")
+)
+_metrics.histogram(
+    "unstoppable_firestore_rpc_seconds",
+    "Firestore RPC latency (streams until fully read); collection is 'multiple' for cross-collection RPCs.",
+    ("endpoint", "phase", "rpc", "collection"),
+)
+_metrics.counter(
+    "unstoppable_firestore_documents_total",
+    "Documents read or written, and queries run, per collection.",
+    ("endpoint", "phase", "collection", "op"),
+)
+_metrics.histogram("unstoppable_auth_seconds", "Request authentication time, including identity resolution.", ("endpoint",))
+_metrics.histogram(
+    "unstoppable_token_verification_seconds", "ID token verification time by path.", ("path",)
+)
+_metrics.counter(
+    "unstoppable_http_response_bytes_total", "JSON response body bytes sent, by content encoding.", ("endpoint", "encoding")
+)
+_metrics.counter(
+    "unstoppable_http_compression_saved_bytes_total",
+    "Bytes saved by compressing JSON responses (uncompressed minus sent).",
+    ("endpoint", "encoding"),
+)
+
+# Endpoint and phase ("auth" or "handler") the current Firestore RPCs are attributed to.
+_metrics_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_endpoint", default="background")
+_metrics_phase: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_phase", default="handler")
+
+
+def _fetch_firebase_signing_certs() -> tuple[dict[str, str], float]:
+    """Download Firebase ID token signing certs; returns (kid -> PEM cert, max-age seconds)."""
+    import urllib.request
+
+    with urllib.request.urlopen(FIREBASE_ID_TOKEN_CERT_URL, timeout=10) as response:
+        certs = json.loads(response.read().decode("utf-8"))
+        cache_control = response.headers.get("Cache-Control", "")
+    match = re.search(r"max-age=(\d+)", cache_control)
+    max_age = float(match.group(1)) if match else 3600.0
+    return certs, max_age
+
+
+class _SigningKeyCache:
+    """Holds ID token signing keys and refreshes them in the background before they expire."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], tuple[dict[str, str], float]],
+        refresh_margin_seconds: float = 300,
+        retry_seconds: float = 30,
+    ) -> None:
+        self._fetch = fetch
+        self._refresh_margin_seconds = refresh_margin_seconds
+        self._retry_seconds = retry_seconds
+        self._keys: dict[str, str] = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._first_refresh_done = threading.Event()
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def keys(self) -> dict[str, str]:
+        with self._lock:
+            if self._expires_at <= time.monotonic():
+                return {}
+            return self._keys
+
+    def refresh(self) -> float:
+        """Fetch keys now and return seconds until the next refresh is due."""
+        with self._refresh_lock:
+            try:
+                keys, max_age = self._fetch()
+            except Exception:
+                with self._lock:
+                    self.refresh_errors += 1
+                self._first_refresh_done.set()
+                return self._retry_seconds
+            with self._lock:
+                self._keys = dict(keys)
+                self._expires_at = time.monotonic() + max_age
+                self.refreshes += 1
+            self._first_refresh_done.set()
+            return max(self._retry_seconds, max_age - self._refresh_margin_seconds)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="signing-key-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def wait_until_loaded(self, timeout: float) -> bool:
+        """Block until the first refresh attempt finishes; returns whether keys are loaded."""
+        self._first_refresh_done.wait(timeout)
+        return bool(self.keys())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.refresh())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._keys),
+                "refreshes": self.refreshes,
+                "refreshErrors": self.refresh_errors,
+            }
+
+
+# (uid, verified email or None) -> canonical user id. `_upsert_uid_alias` invalidates a uid's
+# entries whenever it writes its alias; the TTL only bounds staleness from out-of-band edits.
+_identity_cache = _TTLCache(
+    max_entries=_env_int("IDENTITY_CACHE_MAX_ENTRIES", 10000),
+    ttl_seconds=_env_int("IDENTITY_CACHE_TTL_SECONDS", 300),
+)
+# sha256(ID token) -> decoded claims. Entries expire at the token's exp claim.
+_id_token_cache = _TTLCache(
+    max_entries=_env_int("ID_TOKEN_CACHE_MAX_ENTRIES", 10000),
+    ttl_seconds=_env_int("ID_TOKEN_CACHE_MAX_TTL_SECONDS", 3600),
+)
+_signing_keys = _SigningKeyCache(fetch=_fetch_firebase_signing_certs)
+_alias_write_throttle = _AliasWriteThrottle(
+    min_interval_seconds=_env_int("ALIAS_WRITE_MIN_INTERVAL_SECONDS", 3600),
+    max_entries=_env_int("ALIAS_WRITE_THROTTLE_MAX_ENTRIES", 10000),
+)
+_document_reads = _SingleFlight(enabled=os.getenv("SINGLE_FLIGHT_READS", "1") == "1")
+_subscription_cache = _SubscriptionCache(
+    enabled=os.getenv("SUBSCRIPTION_CACHE", "0") == "1",
+    max_entries=_env_int("SUBSCRIPTION_CACHE_MAX_ENTRIES", 10000),
+    ttl_seconds=_env_int("SUBSCRIPTION_CACHE_TTL_SECONDS", 300),
+    rotate_seconds=_env_int("SUBSCRIPTION_CACHE_LISTENER_ROTATE_SECONDS", 3600),
+)
+
 
 def _ensure_firebase_initialized() -> None:
     if not firebase_admin._apps:
@@ -19,10 +623,231 @@ def _ensure_firebase_initialized() -> None:
 
 def _init_firestore_client() -> firestore.Client:
     _ensure_firebase_initialized()
-    return firestore.client()
+    return _instrument_firestore_client(firestore.client())
+
+
+# Server-streaming RPCs are timed until the caller finishes reading the stream.
+_FIRESTORE_STREAMING_RPCS = ("batch_get_documents", "run_query", "run_aggregation_query")
+_FIRESTORE_INSTRUMENTED_RPCS = (
+    "batch_get_documents",
+    "commit",
+    "batch_write",
+    "begin_transaction",
+    "rollback",
+    "run_query",
+    "run_aggregation_query",
+    "list_documents",
+    "list_collection_ids",
+    "partition_query",
+)
+
+
+def _request_field(rpc_request: Any, name: str) -> Any:
+    if isinstance(rpc_request, dict):
+        return rpc_request.get(name)
+    return getattr(rpc_request, name, None)
+
+
+def _collection_label(path: str, collection_id: str | None = None) -> str:
+    """`projects/p/databases/d/documents/users/u1/profile/self` -> `users/profile`."""
+    _, _, relative = str(path).partition("/documents")
+    segments = [segment for segment in relative.split("/") if segment]
+    collections = segments[0::2]
+    if collection_id:
+        collections.append(collection_id)
+    return "/".join(collections) or "-"
+
+
+def _firestore_rpc_collections(rpc: str, rpc_request: Any) -> tuple[str, list[str]]:
+    """Return (op, collection label per document or query) for one GAPIC request."""
+    if rpc == "batch_get_documents":
+        return "read", [_collection_label(path) for path in _request_field(rpc_request, "documents") or []]
+    if rpc in ("commit", "batch_write"):
+        labels = []
+        for write in _request_field(rpc_request, "writes") or []:
+            name = write.delete or write.update.name or write.transform.document
+            labels.append(_collection_label(name))
+        return "write", labels
+    if rpc in ("run_query", "run_aggregation_query", "partition_query"):
+        query = _request_field(rpc_request, "structured_query")
+        if query is None:
+            aggregation = _request_field(rpc_request, "structured_aggregation_query")
+            query = getattr(aggregation, "structured_query", None)
+        sources = getattr(query, "from_", None) or []
+        collection_id = sources[0].collection_id if sources else None
+        return "query", [_collection_label(_request_field(rpc_request, "parent") or "", collection_id)]
+    if rpc == "list_documents":
+        parent = _request_field(rpc_request, "parent") or ""
+        return "query", [_collection_label(parent, _request_field(rpc_request, "collection_id"))]
+    return "", []
+
+
+def _record_firestore_rpc(rpc: str, rpc_request: Any, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    endpoint = _metrics_endpoint.get()
+    phase = _metrics_phase.get()
+    op, collections = _firestore_rpc_collections(rpc, rpc_request)
+    distinct = set(collections)
+    collection = distinct.pop() if len(distinct) == 1 else ("multiple" if distinct else "-")
+    _metrics.observe("unstoppable_firestore_rpc_seconds", (endpoint, phase, rpc, collection), elapsed)
+    for label in collections:
+        _metrics.inc("unstoppable_firestore_documents_total", (endpoint, phase, label, op))
+
+
+def _instrumented_rpc(rpc: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    streaming = rpc in _FIRESTORE_STREAMING_RPCS
+
+    def finish_stream(stream: Any, rpc_request: Any, started: float) -> Any:
+        def timed() -> Any:
+            try:
+                yield from stream
+            finally:
+                _record_firestore_rpc(rpc, rpc_request, started)
+
+        return timed()
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        rpc_request = kwargs.get("request", args[0] if args else None)
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            _record_firestore_rpc(rpc, rpc_request, started)
+            raise
+        if streaming:
+            return finish_stream(result, rpc_request, started)
+        _record_firestore_rpc(rpc, rpc_request, started)
+        return result
+
+    async def call_async(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        rpc_request = kwargs.get("request", args[0] if args else None)
+        try:
+            result = await method(*args, **kwargs)
+        except Exception:
+            _record_firestore_rpc(rpc, rpc_request, started)
+            raise
+        if streaming:
+
+            async def timed() -> Any:
+                try:
+                    async for item in result:
+                        yield item
+                finally:
+                    _record_firestore_rpc(rpc, rpc_request, started)
+
+            return timed()
+        _record_firestore_rpc(rpc, rpc_request, started)
+        return result
+
+    return call_async if inspect.iscoroutinefunction(method) else call
+
+
+def _instrument_firestore_client(client: Any) -> Any:
+    """Time and count every RPC the (sync or async) client's GAPIC layer issues."""
+    api = client._firestore_api
+    for rpc in _FIRESTORE_INSTRUMENTED_RPCS:
+        method = getattr(api, rpc, None)
+        if method is not None:
+            setattr(api, rpc, _instrumented_rpc(rpc, method))
+    return client
+
+
+class _ResponseJSONProvider(DefaultJSONProvider):
+    """Serializes responses in one pass, rendering dates as ISO 8601.
+
+    `json.dumps` only calls `default` for values it cannot encode, so Firestore
+    documents are encoded as-is instead of being copied first to convert datetimes.
+    Firestore timestamps (`DatetimeWithNanoseconds`) are `datetime` subclasses.
+    """
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, (dt.datetime, dt.date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
 
 
 app = Flask(__name__)
+app.json = _ResponseJSONProvider(app)
+
+
+@app.before_request
+def _start_request_metrics() -> None:
+    request.environ["unstoppable.metrics_token"] = _metrics_endpoint.set(request.endpoint or "unknown")
+    request.environ["unstoppable.started_at"] = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response: Response) -> Response:
+    started = request.environ.get("unstoppable.started_at")
+    if started is not None:
+        _metrics.observe(
+            "unstoppable_http_request_seconds",
+            (request.endpoint or "unknown", request.method, str(response.status_code)),
+            time.perf_counter() - started,
+        )
+    return response
+
+
+COMPRESSION_MIN_BYTES = _env_int("COMPRESSION_MIN_BYTES", 1024)
+# Fast levels: most of the size reduction on small JSON bodies at a fraction of the default CPU cost.
+_COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "br": lambda body: brotli.compress(body, quality=4),
+    "gzip": lambda body: gzip.compress(body, compresslevel=5),
+}
+
+
+def _compress_body(body: bytes, accept_encodings: Any) -> tuple[bytes, str] | None:
+    """(compressed body, encoding) in the client's preferred supported encoding, or None if not worth it."""
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return None
+    encoding = accept_encodings.best_match(tuple(_COMPRESSORS))
+    if encoding is None:
+        return None
+    return _COMPRESSORS[encoding](body), encoding
+
+
+def _record_response_bytes(endpoint: str, encoding: str, uncompressed: int, sent: int) -> None:
+    _metrics.inc("unstoppable_http_response_bytes_total", (endpoint, encoding), sent)
+    if encoding != "identity":
+        _metrics.inc("unstoppable_http_compression_saved_bytes_total", (endpoint, encoding), uncompressed - sent)
+
+
+def _compressible(response: Any) -> bool:
+    return (
+        response.status_code == 200
+        and response.mimetype == "application/json"
+        and "Content-Encoding" not in response.headers
+    )
+
+
+@app.after_request
+def _compress_response(response: Response) -> Response:
+    if response.is_streamed or not _compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    compressed = _compress_body(body, request.accept_encodings)
+    if compressed is None:
+        _record_response_bytes(request.endpoint or "unknown", "identity", len(body), len(body))
+        return response
+    data, encoding = compressed
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The strong tag names the uncompressed body; If-None-Match compares weakly either way.
+        response.set_etag(etag, weak=True)
+    _record_response_bytes(request.endpoint or "unknown", encoding, len(body), len(data))
+    return response
+
+
+@app.teardown_request
+def _reset_request_metrics(_: BaseException | None) -> None:
+    token = request.environ.pop("unstoppable.metrics_token", None)
+    if token is not None:
+        _metrics_endpoint.reset(token)
 
 
 def _get_db() -> firestore.Client:
@@ -32,14 +857,84 @@ def _get_db() -> firestore.Client:
     return _db
 
 
-def _json_safe(value: Any) -> Any:
-    if isinstance(value, dict):
-        return {k: _json_safe(v) for k, v in value.items()}
-    if isinstance(value, list):
-        return [_json_safe(v) for v in value]
-    if isinstance(value, (dt.datetime, dt.date)):
-        return value.isoformat()
-    return value
+def _get_documents(refs: list[Any], field_paths: tuple[str, ...] | None = None) -> dict[str, Any]:
+    """Fetch documents with at most one BatchGetDocuments RPC, keyed by document path.
+
+    `field_paths` is a Firestore field mask applied to every document. Concurrent requests
+    reading the same paths with the same mask share one in-flight read (`_document_reads`)
+    if it started after this request did, and subscription docs are served from
+    `_subscription_cache` when it is enabled.
+    """
+    cached, refs = _cached_subscriptions(refs)
+    if not refs:
+        return cached
+
+    def fetch(missing: list[Any]) -> dict[str, Any]:
+        read_started = time.monotonic()
+        fetched = {
+            snapshot.reference.path: snapshot
+            for snapshot in _get_db().get_all(missing, field_paths=list(field_paths) if field_paths else None)
+        }
+        if field_paths is None:
+            _cache_subscriptions(fetched, read_started)
+        return fetched
+
+    snapshots, issued_rpc = _document_reads.get_documents(
+        refs, fetch, field_paths, not_before=request.environ.get("unstoppable.started_at")
+    )
+    if issued_rpc:
+        request.environ["unstoppable.firestore_reads"] = (
+            request.environ.get("unstoppable.firestore_reads", 0) + 1
+        )
+    return {**snapshots, **cached}
+
+
+def _cached_subscriptions(refs: list[Any]) -> tuple[dict[str, Any], list[Any]]:
+    """Split refs into (subscription snapshots served from `_subscription_cache`, refs still to read)."""
+    if not _subscription_cache.enabled:
+        return {}, refs
+    cached: dict[str, Any] = {}
+    for ref in refs:
+        if _subscription_cache.caches(ref.path):
+            snapshot = _subscription_cache.get(ref.path)
+            if snapshot is not None:
+                cached[ref.path] = snapshot
+    return cached, [ref for ref in refs if ref.path not in cached]
+
+
+def _cache_subscriptions(snapshots: dict[str, Any], read_started: float) -> None:
+    """Offer unmasked snapshots from a read that started at `read_started` to `_subscription_cache`."""
+    if not _subscription_cache.enabled:
+        return
+    for path, snapshot in snapshots.items():
+        if _subscription_cache.caches(path):
+            _subscription_cache.put(path, snapshot, read_started)
+
+
+def _snapshot_data(snapshots: dict[str, Any], ref: Any) -> dict[str, Any]:
+    snapshot = snapshots.get(ref.path)
+    if snapshot is None or not snapshot.exists:
+        return {}
+    return snapshot.to_dict() or {}
+
+
+def _documents_etag(refs: list[Any], snapshots: dict[str, Any], variant: str = "") -> str:
+    """Strong ETag for a response built only from `refs`: changes whenever one of them is written,
+    created or deleted, or a new revision is deployed, and is computed without serializing the body.
+
+    `variant` distinguishes different bodies built from the same documents (e.g. field selections).
+    """
+    digest = hashlib.sha256(f"{os.getenv('K_REVISION', '')}:{variant}".encode("utf-8"))
+    for ref in refs:
+        snapshot = snapshots.get(ref.path)
+        update_time = snapshot.update_time if snapshot is not None and snapshot.exists else None
+        digest.update(f"\n{ref.path}={update_time.isoformat() if update_time else '-'}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _etag_headers(etag: str) -> dict[str, str]:
+    # Clients may keep the body, but must revalidate with If-None-Match before using it.
+    return {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
 
 
 def _json_body() -> dict[str, Any]:
@@ -88,10 +983,13 @@ def _coerce_firestore_datetime(value: Any) -> dt.datetime | None:
 
 
 def _webhook_authorized() -> bool:
+    return _webhook_authorization_valid(request.headers.get("Authorization", ""))
+
+
+def _webhook_authorization_valid(provided: str) -> bool:
     expected = os.getenv("REVENUECAT_WEBHOOK_AUTH", "").strip()
     if not expected:
         return False
-    provided = request.headers.get("Authorization", "")
     if not provided.startswith("Bearer "):
         return False
     token = provided.replace("Bearer ", "", 1).strip()
@@ -161,25 +1059,126 @@ def _effective_payment_option(subscription: dict[str, Any] | None = None) -> str
     return from_subscription
 
 
+# Profile completion requirements, in `missingRequiredFields` order: field -> whether a value meets it.
+# `paymentOption` is read from the subscription doc, every other field from the profile doc.
+_PROFILE_REQUIREMENTS: dict[str, Callable[[Any], bool]] = {
+    "nickname": _non_empty_string,
+    "notificationsEnabled": lambda value: isinstance(value, bool),
+    "termsAccepted": lambda value: value is True,
+    "termsOver16Accepted": lambda value: value is True,
+    "paymentOption": lambda value: _coerce_payment_option(value) is not None,
+}
+# Profile doc field holding each requirement's flag as of the last write of its field. Writes keep it
+# current blind (a flag depends only on its own field), so reads never re-evaluate the requirements.
+PROFILE_REQUIREMENTS_FIELD = "completionRequirements"
+
+
+def _completion_requirements(
+    profile: dict[str, Any], subscription: dict[str, Any] | None = None
+) -> dict[str, bool]:
+    values = {field: profile.get(field) for field in _PROFILE_REQUIREMENTS}
+    values["paymentOption"] = _effective_payment_option(subscription)
+    return {field: met(values[field]) for field, met in _PROFILE_REQUIREMENTS.items()}
+
+
+def _completion_requirements_update(data: dict[str, Any]) -> dict[str, bool]:
+    """Flags for the requirement fields a profile or subscription write sets."""
+    return {field: met(data[field]) for field, met in _PROFILE_REQUIREMENTS.items() if field in data}
+
+
 def _profile_completion(
     profile: dict[str, Any], subscription: dict[str, Any] | None = None
 ) -> tuple[bool, list[str]]:
-    missing: list[str] = []
-
-    if not _non_empty_string(profile.get("nickname")):
-        missing.append("nickname")
-    if not isinstance(profile.get("notificationsEnabled"), bool):
-        missing.append("notificationsEnabled")
-    if profile.get("termsAccepted") is not True:
-        missing.append("termsAccepted")
-    if profile.get("termsOver16Accepted") is not True:
-        missing.append("termsOver16Accepted")
-    if not _effective_payment_option(subscription):
-        missing.append("paymentOption")
+    missing = [field for field, met in _completion_requirements(profile, subscription).items() if not met]
+    return len(missing) == 0, missing
 
+
+def _stored_profile_completion(profile: dict[str, Any]) -> tuple[bool, list[str]] | None:
+    """Completion projected from the stored requirement flags; None until every flag has been written."""
+    requirements = profile.get(PROFILE_REQUIREMENTS_FIELD)
+    if not isinstance(requirements, dict) or any(field not in requirements for field in _PROFILE_REQUIREMENTS):
+        return None
+    missing = [field for field in _PROFILE_REQUIREMENTS if requirements[field] is not True]
     return len(missing) == 0, missing
 
 
+def _profile_completion_fields(profile: dict[str, Any], subscription: dict[str, Any]) -> dict[str, Any]:
+    """`isProfileComplete` and `profileCompletion` response keys, from stored flags when complete."""
+    profile_complete, missing_profile_fields = _stored_profile_completion(profile) or _profile_completion(
+        profile, subscription
+    )
+    return {
+        "isProfileComplete": profile_complete,
+        "profileCompletion": {
+            "isComplete": profile_complete,
+            "missingRequiredFields": missing_profile_fields,
+        },
+    }
+
+
+def _profile_section(profile: dict[str, Any]) -> dict[str, Any]:
+    """Profile doc data as returned to clients, without the stored requirement flags."""
+    if PROFILE_REQUIREMENTS_FIELD not in profile:
+        return profile
+    return {key: value for key, value in profile.items() if key != PROFILE_REQUIREMENTS_FIELD}
+
+
+def _subscription_entitlement(data: dict[str, Any]) -> dict[str, Any]:
+    """Entitlement fields derived from a subscription write, evaluated as of the write.
+
+    `activeUntil` is the later of `expirationAt` and `gracePeriodExpiresAt`; `isActive` is forced off
+    once it has passed. Only fields the write can determine on its own are returned, since it merges.
+    A stored `isActive` stays true after `activeUntil` passes; reads go through `_subscription_section`.
+    """
+    derived: dict[str, Any] = {}
+    if "expirationAt" in data or "gracePeriodExpiresAt" in data:
+        ends = [
+            end
+            for end in map(_coerce_firestore_datetime, (data.get("expirationAt"), data.get("gracePeriodExpiresAt")))
+            if end is not None
+        ]
+        derived["activeUntil"] = max(ends) if ends else None
+    if "isActive" in data:
+        active_until = derived.get("activeUntil")
+        derived["isActive"] = data["isActive"] is True and (
+            active_until is None or active_until > dt.datetime.now(dt.timezone.utc)
+        )
+    return derived
+
+
+def _subscription_lapsed(data: dict[str, Any], now: dt.datetime | None = None) -> bool:
+    """Whether a stored subscription still says `isActive` although its `activeUntil` has passed."""
+    active_until = _coerce_firestore_datetime(data.get("activeUntil"))
+    return (
+        data.get("isActive") is True
+        and active_until is not None
+        and active_until <= (now or dt.datetime.now(dt.timezone.utc))
+    )
+
+
+def _subscription_section(data: dict[str, Any]) -> dict[str, Any]:
+    """Subscription doc data as returned to clients, with `isActive` evaluated as of now."""
+    if not _subscription_lapsed(data):
+        return data
+    return {**data, "isActive": False}
+
+
+def _subscription_variant(data: dict[str, Any]) -> str:
+    """ETag variant suffix that changes when a subscription lapses without being written."""
+    return ":lapsed" if _subscription_lapsed(data) else ""
+
+
+def _subscription_writes(subscription_ref: Any, data: dict[str, Any]) -> list[tuple[Any, dict[str, Any]]]:
+    """A subscription merge write with its derived entitlement fields, plus the profile's
+    `paymentOption` requirement flag when the write sets `paymentOption`."""
+    writes = [(subscription_ref, {**data, **_subscription_entitlement(data)})]
+    requirements = _completion_requirements_update(data)
+    if requirements:
+        profile_ref = subscription_ref.parent.parent.collection("profile").document("self")
+        writes.append((profile_ref, {PROFILE_REQUIREMENTS_FIELD: requirements}))
+    return writes
+
+
 def _upsert_uid_alias(uid: str, canonical_user_id: str, email: str | None, provider: str) -> None:
     payload: dict[str, Any] = {
         "canonicalUserId": canonical_user_id,
@@ -189,17 +1188,60 @@ def _upsert_uid_alias(uid: str, canonical_user_id: str, email: str | None, provi
     }
     if email:
         payload["email"] = email
+    alias_ref = _get_db().collection("user_uid_aliases").document(uid)
+    fingerprint = (canonical_user_id, email)
+    if not _alias_write_throttle.should_write(alias_ref.path, fingerprint):
+        return
     try:
-        _get_db().collection("user_uid_aliases").document(uid).set(payload, merge=True)
+        alias_ref.set(payload, merge=True)
     except google_exceptions.GoogleAPICallError:
         return
+    _alias_write_throttle.record_write(alias_ref.path, fingerprint)
+    _invalidate_canonical_user_id(uid=uid)
 
 
-def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
+def _identity_cache_key(decoded: dict[str, Any]) -> tuple[str, str | None] | None:
     raw_uid = decoded.get("uid")
     if not isinstance(raw_uid, str) or not raw_uid.strip():
         return None
-    uid = raw_uid.strip()
+    return raw_uid.strip(), _verified_email_from_decoded_token(decoded)
+
+
+def _invalidate_canonical_user_id(uid: str | None = None, email: str | None = None) -> None:
+    """Drop cached identity resolutions for a uid and/or email (all entries if both are None).
+
+    Also drops the webhook's cached resolution of the uid, which reads the same alias doc.
+    """
+    if uid is None and email is None:
+        _identity_cache.clear()
+        _webhook_canonical_user_ids.clear()
+        return
+    if uid is not None:
+        _webhook_canonical_user_ids.pop(uid)
+    normalized_email = _normalize_email(email)
+    _identity_cache.pop_where(
+        lambda key: (uid is not None and key[0] == uid)
+        or (normalized_email is not None and key[1] == normalized_email)
+    )
+
+
+def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
+    cache_key = _identity_cache_key(decoded)
+    if cache_key is None:
+        return None
+    cached = _identity_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    canonical_user_id, resolved = _resolve_canonical_user_id_uncached(decoded)
+    # Fallbacks taken after alias RPC failures are not cached so the next request retries them.
+    if resolved:
+        _identity_cache.set(cache_key, canonical_user_id)
+    return canonical_user_id
+
+
+def _resolve_canonical_user_id_uncached(decoded: dict[str, Any]) -> tuple[str, bool]:
+    uid = decoded["uid"].strip()
 
     firebase_claim = decoded.get("firebase")
     provider = ""
@@ -212,7 +1254,7 @@ def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
     email_verified = decoded.get("email_verified") is True
     if not email or not email_verified:
         _upsert_uid_alias(uid=uid, canonical_user_id=uid, email=email, provider=provider)
-        return uid
+        return uid, True
 
     alias_ref = _get_db().collection("user_email_aliases").document(email)
     try:
@@ -228,12 +1270,13 @@ def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
             }
         )
         canonical_user_id = uid
+        _alias_write_throttle.record_write(alias_ref.path, (canonical_user_id, email))
     except google_exceptions.AlreadyExists:
         try:
             alias_doc = alias_ref.get()
         except google_exceptions.GoogleAPICallError:
             _upsert_uid_alias(uid=uid, canonical_user_id=uid, email=email, provider=provider)
-            return uid
+            return uid, False
 
         alias_data = alias_doc.to_dict() if alias_doc.exists else {}
         raw_canonical = alias_data.get("canonicalUserId")
@@ -243,21 +1286,25 @@ def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
             canonical_user_id = uid
     except google_exceptions.GoogleAPICallError:
         _upsert_uid_alias(uid=uid, canonical_user_id=uid, email=email, provider=provider)
-        return uid
+        return uid, False
 
-    try:
-        alias_ref.set(
-            {
-                "canonicalUserId": canonical_user_id,
-                "email": email,
-                "lastSeenUid": uid,
-                "lastSeenProvider": provider,
-                "updatedAt": firestore.SERVER_TIMESTAMP,
-            },
-            merge=True,
-        )
-    except google_exceptions.GoogleAPICallError:
-        pass
+    email_fingerprint = (canonical_user_id, email)
+    if _alias_write_throttle.should_write(alias_ref.path, email_fingerprint):
+        try:
+            alias_ref.set(
+                {
+                    "canonicalUserId": canonical_user_id,
+                    "email": email,
+                    "lastSeenUid": uid,
+                    "lastSeenProvider": provider,
+                    "updatedAt": firestore.SERVER_TIMESTAMP,
+                },
+                merge=True,
+            )
+        except google_exceptions.GoogleAPICallError:
+            pass
+        else:
+            _alias_write_throttle.record_write(alias_ref.path, email_fingerprint)
 
     _upsert_uid_alias(uid=uid, canonical_user_id=canonical_user_id, email=email, provider=provider)
     if canonical_user_id != uid:
@@ -267,36 +1314,420 @@ def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
             email=email,
             provider=provider,
         )
-    return canonical_user_id
+    return canonical_user_id, True
+
+
+def _canonical_user_id_from_alias(alias_snapshot: Any, fallback_user_id: str) -> str:
+    if alias_snapshot is None or not alias_snapshot.exists:
+        return fallback_user_id
+    alias_data = alias_snapshot.to_dict() or {}
+    raw_canonical = alias_data.get("canonicalUserId")
+    if isinstance(raw_canonical, str) and raw_canonical.strip():
+        return raw_canonical.strip()
+    return fallback_user_id
+
+
+def _revenuecat_event_ref(db: firestore.Client, event_id: str) -> Any:
+    return db.collection("payments").document("revenuecat").collection("events").document(event_id)
+
+
+@firestore.transactional
+def _apply_revenuecat_event(
+    transaction: firestore.Transaction,
+    db: firestore.Client,
+    *,
+    app_user_id: str,
+    event_id: str,
+    event_doc: dict[str, Any],
+    subscription_update: dict[str, Any],
+    event_stored: bool = False,
+) -> str:
+    """Record a webhook event and apply it to the user's subscription atomically.
+
+    The uid alias, event doc and subscription doc are read in one batched get, so the
+    common case (app_user_id is already canonical) costs begin + get + commit. With
+    ``event_stored`` the event doc was already persisted as pending by the async ingest
+    path and is marked processed instead of created. Returns "duplicate",
+    "ignoredOutOfOrder" or "applied".
+    """
+    alias_ref = db.collection("user_uid_aliases").document(app_user_id)
+    event_ref = _revenuecat_event_ref(db, event_id)
+    subscription_ref = (
+        db.collection("users").document(app_user_id).collection("payments").document("subscription")
+    )
+    snapshots = {
+        snapshot.reference.path: snapshot
+        for snapshot in transaction.get_all([alias_ref, event_ref, subscription_ref])
+    }
+    if _revenuecat_event_already_applied(snapshots[event_ref.path], event_stored):
+        return "duplicate"
+
+    canonical_user_id = _canonical_user_id_from_alias(snapshots.get(alias_ref.path), app_user_id)
+    if canonical_user_id != app_user_id:
+        subscription_ref = (
+            db.collection("users")
+            .document(canonical_user_id)
+            .collection("payments")
+            .document("subscription")
+        )
+        subscription_snapshot = subscription_ref.get(transaction=transaction)
+    else:
+        subscription_snapshot = snapshots[subscription_ref.path]
+
+    return _stage_revenuecat_event(
+        transaction,
+        event_ref=event_ref,
+        subscription_ref=subscription_ref,
+        subscription_snapshot=subscription_snapshot,
+        canonical_user_id=canonical_user_id,
+        event_doc=event_doc,
+        subscription_update=subscription_update,
+        event_stored=event_stored,
+    )
+
+
+def _revenuecat_event_already_applied(event_snapshot: Any, event_stored: bool) -> bool:
+    if event_stored:
+        return not event_snapshot.exists or (event_snapshot.to_dict() or {}).get("status") != "pending"
+    return event_snapshot.exists
+
+
+def _stage_revenuecat_event(
+    transaction: Any,
+    *,
+    event_ref: Any,
+    subscription_ref: Any,
+    subscription_snapshot: Any,
+    canonical_user_id: str,
+    event_doc: dict[str, Any],
+    subscription_update: dict[str, Any],
+    event_stored: bool,
+) -> str:
+    """Queue the subscription and event writes on a (sync or async) transaction; returns the outcome."""
+    existing_data = (subscription_snapshot.to_dict() or {}) if subscription_snapshot.exists else {}
+    existing_event_at = _coerce_firestore_datetime(existing_data.get("latestEventAt"))
+    if existing_event_at is not None and subscription_update["latestEventAt"] < existing_event_at:
+        outcome = "ignoredOutOfOrder"
+    else:
+        outcome = "applied"
+        writes = _subscription_writes(subscription_ref, {**subscription_update, "appUserId": canonical_user_id})
+        for ref, data in _with_user_snapshot(subscription_ref.parent.parent, writes):
+            transaction.set(ref, data, merge=True)
+        # The transaction commits after this returns; hold the entry until it has.
+        _subscription_cache.invalidate(subscription_ref.path, before_commit=True)
+
+    event_status = {
+        "appUserId": canonical_user_id,
+        "status": outcome,
+        "processedAt": firestore.SERVER_TIMESTAMP,
+    }
+    if event_stored:
+        transaction.update(event_ref, event_status)
+    else:
+        transaction.create(event_ref, {**event_doc, **event_status})
+    return outcome
+
+
+class _WebhookWorkerPool:
+    """Applies queued webhook events on background threads, preserving per-user order.
+
+    Each key is pinned to one worker queue by a stable hash, so events submitted under the same
+    key are applied in the order they were acknowledged. Callers resolve the key (the canonical
+    user) before submitting, so nothing here waits on I/O.
+    """
+
+    def __init__(self, workers: int, max_attempts: int = 5) -> None:
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self._queues: list[queue.Queue] = []
+        self._pending: dict[int, float] = {}
+        self._queued_ids: set[str] = set()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_lag_seconds = 0.0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._queues:
+                return
+            for index in range(self.workers):
+                work_queue: queue.Queue = queue.Queue()
+                self._queues.append(work_queue)
+                threading.Thread(
+                    target=self._run,
+                    args=(work_queue,),
+                    name=f"webhook-worker-{index}",
+                    daemon=True,
+                ).start()
+
+    def submit(self, key: str, job: Callable[[], Any], job_id: str | None = None) -> None:
+        """Queue `job`; `job_id` (if given) reports as queued until the job finishes."""
+        self._ensure_started()
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            self._pending[sequence] = time.monotonic()
+            if job_id is not None:
+                self._queued_ids.add(job_id)
+        shard = zlib.crc32(key.encode("utf-8")) % self.workers
+        self._queues[shard].put((sequence, job, job_id))
+
+    def is_queued(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._queued_ids
+
+    def _run(self, work_queue: queue.Queue) -> None:
+        while True:
+            sequence, job, job_id = work_queue.get()
+            with self._lock:
+                self.last_lag_seconds = time.monotonic() - self._pending[sequence]
+            succeeded = False
+            for attempt in range(self.max_attempts):
+                try:
+                    job()
+                    succeeded = True
+                    break
+                except Exception:
+                    time.sleep(min(2**attempt * 0.1, 5.0))
+            with self._lock:
+                del self._pending[sequence]
+                self._queued_ids.discard(job_id)
+                if succeeded:
+                    self.processed += 1
+                else:
+                    # The event doc stays "pending" and is picked up by the next recovery sweep.
+                    self.failed += 1
+
+    def stats(self) -> dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            oldest = min(self._pending.values(), default=now)
+            return {
+                "queueDepth": len(self._pending),
+                "oldestPendingSeconds": now - oldest,
+                "lastLagSeconds": self.last_lag_seconds,
+                "processed": self.processed,
+                "failed": self.failed,
+            }
+
+
+def _webhook_async_enabled() -> bool:
+    return os.getenv("REVENUECAT_WEBHOOK_ASYNC", "0") == "1"
+
+
+# A pending event belongs to the instance that queued it until its lease runs out; only then
+# may a recovery sweep claim it.
+REVENUECAT_WEBHOOK_LEASE_SECONDS = _env_int("REVENUECAT_WEBHOOK_LEASE_SECONDS", 300)
+_webhook_canonical_user_ids = _TTLCache(
+    max_entries=_env_int("IDENTITY_CACHE_MAX_ENTRIES", 10000),
+    ttl_seconds=_env_int("IDENTITY_CACHE_TTL_SECONDS", 300),
+)
 
 
-def _canonical_user_id_for_app_user_id(raw_user_id: str) -> str:
-    user_id = raw_user_id.strip()
-    if not user_id:
-        return user_id
+def _webhook_canonical_user_id(app_user_id: str) -> str:
+    """Canonical user of a RevenueCat app_user_id, so all of a user's IDs share one worker.
 
+    Resolved on the thread that queues the event (the webhook request or the recovery sweep).
+    """
+    cached = _webhook_canonical_user_ids.get(app_user_id)
+    if cached is not None:
+        return cached
     try:
-        alias_doc = _get_db().collection("user_uid_aliases").document(user_id).get()
+        alias_snapshot = _get_db().collection("user_uid_aliases").document(app_user_id).get()
     except google_exceptions.GoogleAPICallError:
-        return user_id
+        return app_user_id
+    canonical_user_id = _canonical_user_id_from_alias(alias_snapshot, app_user_id)
+    _webhook_canonical_user_ids.set(app_user_id, canonical_user_id)
+    return canonical_user_id
 
-    if not alias_doc.exists:
-        return user_id
 
-    alias_data = alias_doc.to_dict() or {}
-    raw_canonical = alias_data.get("canonicalUserId")
-    if isinstance(raw_canonical, str) and raw_canonical.strip():
-        return raw_canonical.strip()
-    return user_id
+_webhook_pool = _WebhookWorkerPool(workers=_env_int("REVENUECAT_WEBHOOK_WORKERS", 4))
+
+
+def _revenuecat_event_lease() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=REVENUECAT_WEBHOOK_LEASE_SECONDS)
+
+
+def _enqueue_revenuecat_event(parsed: "_RevenueCatEvent", canonical_user_id: str) -> None:
+    def job() -> None:
+        db = _get_db()
+        _apply_revenuecat_event(
+            db.transaction(),
+            db,
+            app_user_id=parsed.app_user_id,
+            event_id=parsed.event_id,
+            event_doc=parsed.event_doc,
+            subscription_update=parsed.subscription_update,
+            event_stored=True,
+        )
+
+    _webhook_pool.submit(canonical_user_id, job, job_id=parsed.event_id)
+
+
+def _revenuecat_event_claimable(data: dict[str, Any], now: dt.datetime, min_age_seconds: float) -> bool:
+    """Whether a pending event's lease has run out (events stored before leases: by age)."""
+    if data.get("status") != "pending":
+        return False
+    lease_until = _coerce_firestore_datetime(data.get("leaseUntil"))
+    if lease_until is None:
+        received_at = _coerce_firestore_datetime(data.get("receivedAt"))
+        lease_until = received_at + dt.timedelta(seconds=min_age_seconds) if received_at is not None else None
+    return lease_until is None or lease_until <= now
+
+
+@firestore.transactional
+def _claim_revenuecat_event(
+    transaction: firestore.Transaction, event_ref: Any, min_age_seconds: float
+) -> dict[str, Any] | None:
+    """Take a fresh lease on a pending event whose lease ran out; returns its data, or None if
+    another sweep (or the instance that queued it) still owns it."""
+    snapshots = {snapshot.reference.path: snapshot for snapshot in transaction.get_all([event_ref])}
+    data = _snapshot_data(snapshots, event_ref)
+    if not _revenuecat_event_claimable(data, dt.datetime.now(dt.timezone.utc), min_age_seconds):
+        return None
+    transaction.update(event_ref, {"leaseUntil": _revenuecat_event_lease()})
+    return data
+
+
+def _requeue_pending_revenuecat_events(min_age_seconds: float = 60, limit: int = 500) -> int:
+    """Re-enqueue events acknowledged but never applied (e.g. after an instance restart).
+
+    Every worker of every instance sweeps, so each event is claimed in a transaction first:
+    one sweep wins it per lease period, and events still queued in this process are skipped.
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    db = _get_db()
+    events_ref = db.collection("payments").document("revenuecat").collection("events")
+    pending_docs = list(
+        events_ref.where(filter=FieldFilter("status", "==", "pending")).limit(limit).stream()
+    )
+    now = dt.datetime.now(dt.timezone.utc)
+    pending_events = []
+    for doc in pending_docs:
+        if _webhook_pool.is_queued(doc.id) or not _revenuecat_event_claimable(
+            doc.to_dict() or {}, now, min_age_seconds
+        ):
+            continue
+        data = _claim_revenuecat_event(db.transaction(), doc.reference, min_age_seconds)
+        if data is None:
+            continue
+        payload = data.get("payload")
+        if not isinstance(payload, dict):
+            continue
+        parsed, error = _normalize_revenuecat_event(payload)
+        if error:
+            continue
+        event_at = _coerce_firestore_datetime(data.get("eventAt"))
+        if event_at is not None:
+            parsed.subscription_update["latestEventAt"] = event_at
+        pending_events.append((event_at or dt.datetime.min.replace(tzinfo=dt.timezone.utc), parsed))
+
+    pending_events.sort(key=lambda item: item[0])
+    for _, parsed in pending_events:
+        _enqueue_revenuecat_event(parsed, _webhook_canonical_user_id(parsed.app_user_id))
+    return len(pending_events)
+
+
+def _run_revenuecat_recovery_sweeps() -> None:
+    interval = _env_int("REVENUECAT_WEBHOOK_RECOVERY_SECONDS", 300)
+    while True:
+        try:
+            _requeue_pending_revenuecat_events()
+        except google_exceptions.GoogleAPICallError:
+            pass
+        time.sleep(max(interval, 30))
+
+
+def _local_id_token_verification_enabled() -> bool:
+    if os.getenv("FIREBASE_AUTH_EMULATOR_HOST", "").strip():
+        return False
+    return os.getenv("LOCAL_ID_TOKEN_VERIFICATION", "1") == "1"
+
+
+def _firebase_project_id() -> str | None:
+    _ensure_firebase_initialized()
+    return firebase_admin.get_app().project_id
+
+
+def _verify_id_token_locally(
+    token: str,
+    signing_keys: _SigningKeyCache,
+    project_id: str | None,
+) -> dict[str, Any] | None:
+    """Verify a Firebase ID token against cached signing keys without any network I/O.
+
+    Applies the same checks as firebase_admin's verifier. Returns None when the signing
+    key for the token is not cached, so the caller can fall back to firebase_admin.
+    """
+    keys = signing_keys.keys()
+    if not keys or not project_id:
+        return None
+    header = google_jwt.decode_header(token)
+    if header.get("alg") != "RS256":
+        raise ValueError("ID token has incorrect algorithm.")
+    kid = header.get("kid")
+    if not kid:
+        raise ValueError('ID token has no "kid" claim.')
+    if kid not in keys:
+        return None
+
+    claims = google_jwt.decode(token, certs={kid: keys[kid]}, audience=project_id)
+    if claims.get("iss") != FIREBASE_ID_TOKEN_ISSUER_PREFIX + project_id:
+        raise ValueError('ID token has incorrect "iss" (issuer) claim.')
+    subject = claims.get("sub")
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise ValueError('ID token has an invalid "sub" (subject) claim.')
+    claims["uid"] = subject
+    return claims
+
+
+def _verify_id_token(token: str) -> dict[str, Any]:
+    started = time.perf_counter()
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _id_token_cache.get(cache_key)
+    if cached is not None:
+        _metrics.observe("unstoppable_token_verification_seconds", ("cache",), time.perf_counter() - started)
+        return cached
+
+    decoded = None
+    verification_path = "local"
+    if _local_id_token_verification_enabled():
+        decoded = _verify_id_token_locally(token, _signing_keys, _firebase_project_id())
+    if decoded is None:
+        verification_path = "firebase_admin"
+        # Only the fallback path needs firebase_admin.auth; keep it out of cold-start imports.
+        from firebase_admin import auth
+
+        _ensure_firebase_initialized()
+        decoded = auth.verify_id_token(token)
+    exp = decoded.get("exp") if isinstance(decoded, dict) else None
+    if isinstance(exp, (int, float)):
+        _id_token_cache.set(cache_key, decoded, ttl_seconds=exp - time.time())
+    _metrics.observe(
+        "unstoppable_token_verification_seconds", (verification_path,), time.perf_counter() - started
+    )
+    return decoded
 
 
 def _user_id_from_request() -> tuple[str | None, tuple[dict[str, str], int] | None]:
+    started = time.perf_counter()
+    phase_token = _metrics_phase.set("auth")
+    try:
+        return _authenticate_request()
+    finally:
+        _metrics_phase.reset(phase_token)
+        _metrics.observe("unstoppable_auth_seconds", (_metrics_endpoint.get(),), time.perf_counter() - started)
+
+
+def _authenticate_request() -> tuple[str | None, tuple[dict[str, str], int] | None]:
     auth_header = request.headers.get("Authorization", "")
     if auth_header.startswith("Bearer "):
-        _ensure_firebase_initialized()
         token = auth_header.replace("Bearer ", "", 1).strip()
         try:
-            decoded = auth.verify_id_token(token)
+            decoded = _verify_id_token(token)
             user_id = _resolve_canonical_user_id(decoded)
             if not user_id:
                 return None, ({"error": "Token missing uid claim."}, 401)
@@ -327,13 +1758,135 @@ def healthz() -> tuple[dict[str, str], int]:
     return {"status": "ok"}, 200
 
 
-@app.post("/v1/user/profile")
-def upsert_user_profile() -> tuple[Any, int]:
-    user_id, err = _user_id_from_request()
-    if err:
-        return err
-
-    payload = _json_body()
+def _metrics_authorized(provided: str) -> bool:
+    # Fails closed: the service is public, so metrics are only served with a configured secret.
+    expected = os.getenv("METRICS_AUTH", "").strip()
+    if not expected:
+        return False
+    if not provided.startswith("Bearer "):
+        return False
+    return secrets.compare_digest(provided.replace("Bearer ", "", 1).strip(), expected)
+
+
+def _metrics_text() -> str:
+    gauges: dict[str, float] = {}
+    for prefix, stats in (
+        ("unstoppable_identity_cache", _identity_cache.stats()),
+        ("unstoppable_id_token_cache", _id_token_cache.stats()),
+        ("unstoppable_alias_write_throttle", _alias_write_throttle.stats()),
+        ("unstoppable_single_flight_reads", _document_reads.stats()),
+        ("unstoppable_subscription_cache", _subscription_cache.stats()),
+        ("unstoppable_signing_keys", _signing_keys.stats()),
+        ("unstoppable_webhook_pool", _webhook_pool.stats()),
+    ):
+        for key, value in stats.items():
+            gauges[f"{prefix}_{re.sub(r'(?<!^)(?=[A-Z])', '_', key).lower()}"] = value
+    return _metrics.render(gauges)
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    if not _metrics_authorized(request.headers.get("Authorization", "")):
+        return Response("Unauthorized\n", status=401, content_type="text/plain")
+    return Response(_metrics_text(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# Optional denormalized copy of a user's sections in the users/{uid} document itself. Every
+# write endpoint and the webhook mirror their writes into it in the same commit, so bootstrap
+# can read one document instead of five.
+USER_SNAPSHOT = os.getenv("USER_SNAPSHOT", "0") == "1"
+USER_SNAPSHOT_VERSION = 1
+# Progress docs are mirrored into `progressDays` only within this many days of the server's
+# today (client time zones run a day ahead or behind); writes prune the days just past it.
+USER_SNAPSHOT_PROGRESS_WINDOW_DAYS = 1
+USER_SNAPSHOT_PROGRESS_PRUNE_DAYS = 7
+# Days pruning missed (e.g. after a long gap) only accumulate until bootstrap rebuilds the snapshot.
+USER_SNAPSHOT_MAX_PROGRESS_DAYS = 16
+# Snapshot field mirroring each single-document section, by its path below users/{uid}.
+_USER_SNAPSHOT_SECTIONS = {
+    "profile/self": "profile",
+    "routine/current": "routine",
+    "stats/streak": "streak",
+    "payments/subscription": "subscription",
+}
+
+
+def _user_snapshot_progress_dates(today: dt.date) -> list[str]:
+    window = USER_SNAPSHOT_PROGRESS_WINDOW_DAYS
+    return [(today + dt.timedelta(days=offset)).isoformat() for offset in range(-window, window + 1)]
+
+
+def _user_snapshot_update(writes: list[tuple[Any, dict[str, Any]]]) -> dict[str, Any]:
+    """Merge data that mirrors `writes` (sub-document ref, merge data) into the users/{uid} snapshot.
+
+    Never sets `snapshotVersion`: only `_rebuild_user_snapshot` marks a snapshot complete, so a
+    user whose snapshot was never built keeps being rebuilt by bootstrap until it is.
+    """
+    today = dt.datetime.now(dt.timezone.utc).date()
+    window = set(_user_snapshot_progress_dates(today))
+    update: dict[str, Any] = {}
+    for ref, data in writes:
+        subpath = ref.path.split("/", 2)[2]
+        if subpath in _USER_SNAPSHOT_SECTIONS:
+            update[_USER_SNAPSHOT_SECTIONS[subpath]] = data
+        elif subpath.startswith("progress/") and ref.id in window:
+            update.setdefault("progressDays", {})[ref.id] = data
+    if "progressDays" in update:
+        for days in range(USER_SNAPSHOT_PROGRESS_PRUNE_DAYS):
+            past = today - dt.timedelta(days=USER_SNAPSHOT_PROGRESS_WINDOW_DAYS + 1 + days)
+            update["progressDays"][past.isoformat()] = firestore.DELETE_FIELD
+    return update
+
+
+def _with_user_snapshot(user_ref: Any, writes: list[tuple[Any, dict[str, Any]]]) -> list[tuple[Any, dict[str, Any]]]:
+    """`writes` plus the users/{uid} snapshot write mirroring them, when `USER_SNAPSHOT` is on."""
+    if not USER_SNAPSHOT:
+        return writes
+    update = _user_snapshot_update(writes)
+    return [*writes, (user_ref, update)] if update else writes
+
+
+# Monthly rollups of progress days at users/{uid}/progressMonths/{yyyy-mm}, so history reads cost
+# one document per month instead of one per day.
+PROGRESS_ROLLUP_COLLECTION = "progressMonths"
+_PROGRESS_ROLLUP_DAY_FIELDS = ("completed", "total", "completedTaskIds")
+
+
+def _progress_rollup_writes(writes: list[tuple[Any, dict[str, Any]]]) -> list[tuple[Any, dict[str, Any]]]:
+    """One merge per month covering the progress day writes in `writes`."""
+    rollups: dict[str, tuple[Any, dict[str, Any]]] = {}
+    for ref, data in writes:
+        if not ref.path.split("/", 2)[2].startswith("progress/"):
+            continue
+        month = ref.id[:7]
+        if month not in rollups:
+            rollup_ref = ref.parent.parent.collection(PROGRESS_ROLLUP_COLLECTION).document(month)
+            rollups[month] = (rollup_ref, {"month": month, "days": {}, "updatedAt": firestore.SERVER_TIMESTAMP})
+        day = {field: data[field] for field in _PROGRESS_ROLLUP_DAY_FIELDS if field in data}
+        rollups[month][1]["days"][ref.id] = day
+    return list(rollups.values())
+
+
+def _with_mirrors(user_ref: Any, writes: list[tuple[Any, dict[str, Any]]]) -> list[tuple[Any, dict[str, Any]]]:
+    """`writes` plus the progress rollups and users/{uid} snapshot write that mirror them."""
+    return _with_user_snapshot(user_ref, [*writes, *_progress_rollup_writes(writes)])
+
+
+def _commit_user_writes(db: Any, user_ref: Any, writes: list[tuple[Any, dict[str, Any]]]) -> None:
+    """Merge `writes` below `user_ref` and their mirrors in one commit."""
+    batch = db.batch()
+    for ref, data in _with_mirrors(user_ref, writes):
+        batch.set(ref, data, merge=True)
+    batch.commit()
+    for ref, _ in writes:
+        _subscription_cache.invalidate(ref.path)
+
+
+def _profile_update(payload: dict[str, Any], decoded: Any) -> tuple[dict[str, Any], str | None]:
+    """Split a profile payload into the profile doc update and the canonical payment option."""
     allowed_fields = {
         "nickname",
         "ageGroup",
@@ -351,52 +1904,60 @@ def upsert_user_profile() -> tuple[Any, int]:
         normalized_payment_option = _coerce_payment_option(profile_data["paymentOption"])
     profile_data.pop("paymentOption", None)
 
-    verified_email = _verified_email_from_decoded_token(
-        request.environ.get("unstoppable.decoded_token")
-    )
+    verified_email = _verified_email_from_decoded_token(decoded)
     if verified_email:
         profile_data["email"] = verified_email
-
-    db = _get_db()
     if profile_data:
         profile_data["updatedAt"] = firestore.SERVER_TIMESTAMP
-        profile_ref = (
-            db.collection("users")
-            .document(user_id)
-            .collection("profile")
-            .document("self")
-        )
-        profile_ref.set(profile_data, merge=True)
+    requirements = _completion_requirements_update(profile_data)
     if normalized_payment_option:
-        (
-            db.collection("users")
-            .document(user_id)
-            .collection("payments")
-            .document("subscription")
-            .set(
-                {
-                    "paymentOption": normalized_payment_option,
-                    "provider": "profile_sync",
-                    "source": "profile_payment_option",
-                    "updatedAt": firestore.SERVER_TIMESTAMP,
-                },
-                merge=True,
-            )
-        )
+        requirements["paymentOption"] = True
+    if requirements:
+        profile_data[PROFILE_REQUIREMENTS_FIELD] = requirements
+    return profile_data, normalized_payment_option
 
-    return jsonify({"ok": True, "userId": user_id}), 200
+
+def _profile_payment_option_update(payment_option: str) -> dict[str, Any]:
+    return {
+        "paymentOption": payment_option,
+        "provider": "profile_sync",
+        "source": "profile_payment_option",
+        "updatedAt": firestore.SERVER_TIMESTAMP,
+    }
 
 
-@app.put("/v1/routines/current")
-def upsert_routine() -> tuple[Any, int]:
+@app.post("/v1/user/profile")
+def upsert_user_profile() -> tuple[Any, int]:
     user_id, err = _user_id_from_request()
     if err:
         return err
 
-    payload = _json_body()
+    profile_data, normalized_payment_option = _profile_update(
+        _json_body(), request.environ.get("unstoppable.decoded_token")
+    )
+
+    db = _get_db()
+    user_ref = db.collection("users").document(user_id)
+    writes = []
+    if profile_data:
+        writes.append((user_ref.collection("profile").document("self"), profile_data))
+    if normalized_payment_option:
+        writes.append(
+            (
+                user_ref.collection("payments").document("subscription"),
+                _profile_payment_option_update(normalized_payment_option),
+            )
+        )
+    if writes:
+        _commit_user_writes(db, user_ref, writes)
+
+    return jsonify({"ok": True, "userId": user_id}), 200
+
+
+def _routine_update(payload: dict[str, Any]) -> tuple[dict[str, Any] | None, str | None]:
     tasks = payload.get("tasks", [])
     if tasks is not None and not isinstance(tasks, list):
-        return jsonify({"error": "tasks must be an array."}), 400
+        return None, "tasks must be an array."
 
     routine_data = {}
     if "routineTime" in payload:
@@ -404,171 +1965,1220 @@ def upsert_routine() -> tuple[Any, int]:
     if "tasks" in payload:
         routine_data["tasks"] = payload["tasks"]
     routine_data["updatedAt"] = firestore.SERVER_TIMESTAMP
-
-    db = _get_db()
-    routine_ref = (
-        db.collection("users")
-        .document(user_id)
-        .collection("routine")
-        .document("current")
-    )
-    routine_ref.set(routine_data, merge=True)
-
-    return jsonify({"ok": True, "userId": user_id}), 200
+    return routine_data, None
 
 
-@app.post("/v1/progress/daily")
-def upsert_daily_progress() -> tuple[Any, int]:
+@app.put("/v1/routines/current")
+def upsert_routine() -> tuple[Any, int]:
     user_id, err = _user_id_from_request()
     if err:
         return err
 
-    payload = _json_body()
-    date_value = str(payload.get("date", _today_yyyy_mm_dd()))
+    routine_data, error = _routine_update(_json_body())
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = _get_db()
+    user_ref = db.collection("users").document(user_id)
+    _commit_user_writes(db, user_ref, [(user_ref.collection("routine").document("current"), routine_data)])
+
+    return jsonify({"ok": True, "userId": user_id}), 200
+
+
+def _daily_progress_doc(payload: dict[str, Any]) -> tuple[dict[str, Any] | None, str | None]:
+    date_value = str(payload.get("date", _today_yyyy_mm_dd()))
 
     try:
         dt.date.fromisoformat(date_value)
     except ValueError:
-        return jsonify({"error": "date must be yyyy-mm-dd."}), 400
+        return None, "date must be yyyy-mm-dd."
 
     completed = payload.get("completed")
     total = payload.get("total")
     completed_task_ids = payload.get("completedTaskIds", [])
 
     if not isinstance(completed, int) or completed < 0:
-        return jsonify({"error": "completed must be a non-negative integer."}), 400
+        return None, "completed must be a non-negative integer."
     if not isinstance(total, int) or total < 0:
-        return jsonify({"error": "total must be a non-negative integer."}), 400
+        return None, "total must be a non-negative integer."
     if not isinstance(completed_task_ids, list):
-        return jsonify({"error": "completedTaskIds must be an array."}), 400
+        return None, "completedTaskIds must be an array."
 
-    progress_doc = {
+    return {
         "date": date_value,
         "completed": completed,
         "total": total,
         "completedTaskIds": completed_task_ids,
         "updatedAt": firestore.SERVER_TIMESTAMP,
+    }, None
+
+
+# A day qualifies for the streak at 80% of its tasks, the same rule as the app's StreakManager.
+STREAK_QUALIFYING_PERCENT = 80
+# A day written before the current run is counted by reading at most this many days on each side of it.
+STREAK_RECOMPUTE_WINDOW_DAYS = _env_int("STREAK_RECOMPUTE_WINDOW_DAYS", 60)
+_STREAK_FIELDS = ("currentStreak", "longestStreak", "lastQualifiedDate")
+
+
+def _qualifies(progress: dict[str, Any]) -> bool:
+    completed, total = progress.get("completed"), progress.get("total")
+    return (
+        isinstance(completed, int)
+        and isinstance(total, int)
+        and total > 0
+        and completed * 100 >= total * STREAK_QUALIFYING_PERCENT
+    )
+
+
+def _streak_state(streak: dict[str, Any]) -> tuple[int, int, dt.date | None]:
+    """(currentStreak, longestStreak, lastQualifiedDate) of a stats/streak doc, tolerating bad values."""
+    current, longest = (value if isinstance(value, int) and value > 0 else 0 for value in (
+        streak.get("currentStreak"), streak.get("longestStreak")
+    ))
+    try:
+        last = dt.date.fromisoformat(streak.get("lastQualifiedDate") or "")
+    except (TypeError, ValueError):
+        last = None
+    return current, longest, last
+
+
+def _streak_recompute_window(streak: dict[str, Any], day: dt.date) -> tuple[dt.date, dt.date] | None:
+    """Days to read when qualifying `day` can't advance the streak from its stored fields alone.
+
+    The current run is the `currentStreak` days ending at `lastQualifiedDate`. Only a day before
+    it (a late or out-of-order write) needs its neighbours: it may extend the run backwards or
+    join older runs into a new longest one. Returns None for every other day.
+    """
+    current, _, last = _streak_state(streak)
+    if last is None or day > last:
+        return None
+    run_start = last - dt.timedelta(days=current - 1)
+    if day >= run_start:
+        return None
+    window = dt.timedelta(days=STREAK_RECOMPUTE_WINDOW_DAYS)
+    return day - window, min(day + window, run_start - dt.timedelta(days=1))
+
+
+def _advance_streak(
+    streak: dict[str, Any], day: dt.date, window: dict[str, dict[str, Any]] | None = None
+) -> dict[str, Any] | None:
+    """stats/streak update for `day` having qualified, or None when the streak doesn't change.
+
+    `window` holds the progress docs (by date) in `_streak_recompute_window(streak, day)`, when
+    there is one. Runs reaching the window's edge are counted up to that edge.
+    """
+    current, longest, last = _streak_state(streak)
+    if last is None or day > last:
+        current = current + 1 if last is not None and day == last + dt.timedelta(days=1) else 1
+        last = day
+    elif window is None:
+        return None  # already part of the current run
+    else:
+        qualified = {date_value for date_value, progress in window.items() if _qualifies(progress)}
+        qualified.add(day.isoformat())
+        one_day = dt.timedelta(days=1)
+        start = end = day
+        while (start - one_day).isoformat() in qualified:
+            start -= one_day
+        while (end + one_day).isoformat() in qualified:
+            end += one_day
+        run = (end - start).days + 1
+        if end + one_day == last - dt.timedelta(days=current - 1):
+            current += run  # bridges the gap before the current run
+        elif run <= longest:
+            return None
+        longest = max(longest, run)
+    return {
+        "currentStreak": current,
+        "longestStreak": max(longest, current),
+        "lastQualifiedDate": last.isoformat(),
+        "source": "server",
+        "updatedAt": firestore.SERVER_TIMESTAMP,
     }
-    db = _get_db()
-    progress_ref = (
-        db.collection("users")
-        .document(user_id)
-        .collection("progress")
-        .document(date_value)
+
+
+def _streak_window_query(user_ref: Any, window: tuple[dt.date, dt.date]) -> Any:
+    start, end = window
+    return (
+        user_ref.collection("progress")
+        .order_by("__name__")
+        .select(["completed", "total"])
+        .start_at({"__name__": start.isoformat()})
+        .end_at({"__name__": end.isoformat()})
     )
-    progress_ref.set(progress_doc, merge=True)
 
-    return jsonify({"ok": True, "userId": user_id, "date": date_value}), 200
 
+def _streak_recompute_windows(streak: dict[str, Any], days: list[dt.date]) -> list[tuple[dt.date, dt.date]]:
+    """The `_streak_recompute_window`s of `days`, merged where they overlap or touch.
 
-@app.post("/v1/stats/streak/snapshot")
-def upsert_streak_snapshot() -> tuple[Any, int]:
+    Advancing the streak by the days in date order only ever needs days inside these ranges.
+    """
+    merged: list[tuple[dt.date, dt.date]] = []
+    for lo, hi in sorted(filter(None, (_streak_recompute_window(streak, day) for day in days))):
+        if merged and lo <= merged[-1][1] + dt.timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _advance_streak_by(
+    streak: dict[str, Any], progress_docs: list[dict[str, Any]], window: dict[str, dict[str, Any]]
+) -> dict[str, Any] | None:
+    """stats/streak update for every qualifying day of `progress_docs`, applied in date order, or
+    None when the streak doesn't change.
+
+    `window` holds the stored progress docs (by date) in `_streak_recompute_windows`; the written
+    days take precedence over it.
+    """
+    window = {**window, **{progress_doc["date"]: progress_doc for progress_doc in progress_docs}}
+    update = None
+    for progress_doc in sorted(progress_docs, key=lambda progress_doc: progress_doc["date"]):
+        if not _qualifies(progress_doc):
+            continue
+        day = dt.date.fromisoformat(progress_doc["date"])
+        bounds = _streak_recompute_window(streak, day)
+        day_window = None
+        if bounds is not None:
+            lo, hi = bounds[0].isoformat(), bounds[1].isoformat()
+            day_window = {date_value: data for date_value, data in window.items() if lo <= date_value <= hi}
+        advanced = _advance_streak(streak, day, day_window)
+        if advanced is not None:
+            streak = update = advanced
+    return update
+
+
+def _streak_base(
+    streak: dict[str, Any], streak_snapshot: dict[str, Any] | None
+) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """(streak to advance from, stats/streak write) for a stored streak and an optional client snapshot.
+
+    A client snapshot replaces the stored streak only while the server doesn't maintain it
+    (`source: "server"`); after that, snapshots are ignored.
+    """
+    if streak_snapshot is None or streak.get("source") == "server":
+        return streak, None
+    return {**streak, **streak_snapshot}, streak_snapshot
+
+
+def _stage_progress_with_streak(
+    transaction: Any,
+    user_ref: Any,
+    progress_docs: list[dict[str, Any]],
+    streak: dict[str, Any],
+    window: dict[str, dict[str, Any]],
+    writes: list[tuple[Any, dict[str, Any]]] | None = None,
+    streak_snapshot: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Queue progress writes, any other `writes`, their mirrors and stats/streak (the client
+    snapshot when it applies, advanced by the qualifying days) on a (sync or async) transaction;
+    returns the resulting streak fields."""
+    streak, streak_write = _streak_base(streak, streak_snapshot)
+    streak_update = _advance_streak_by(streak, progress_docs, window)
+    if streak_update is not None:
+        streak = streak_update
+        streak_write = {**(streak_write or {}), **streak_update}
+    progress_collection = user_ref.collection("progress")
+    staged = [
+        *(writes or []),
+        *((progress_collection.document(progress_doc["date"]), progress_doc) for progress_doc in progress_docs),
+    ]
+    if streak_write is not None:
+        staged.append((user_ref.collection("stats").document("streak"), streak_write))
+    for ref, data in _with_mirrors(user_ref, staged):
+        transaction.set(ref, data, merge=True)
+    return {field: streak.get(field) for field in _STREAK_FIELDS}
+
+
+@firestore.transactional
+def _commit_progress_with_streak(
+    transaction: firestore.Transaction,
+    user_ref: Any,
+    progress_docs: list[dict[str, Any]],
+    writes: list[tuple[Any, dict[str, Any]]] | None = None,
+    streak_snapshot: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Write progress days and advance stats/streak from the qualifying ones atomically, together
+    with any other `writes` and a client `streak_snapshot` (see `_streak_base`).
+
+    Costs begin + get + commit, plus one range query per merged recompute window when qualifying
+    days land before the current run (each spans at most 2 * STREAK_RECOMPUTE_WINDOW_DAYS + 1
+    days around them). Returns the resulting streak fields.
+    """
+    streak_ref = user_ref.collection("stats").document("streak")
+    snapshots = {snapshot.reference.path: snapshot for snapshot in transaction.get_all([streak_ref])}
+    streak = _snapshot_data(snapshots, streak_ref)
+    days = [dt.date.fromisoformat(progress_doc["date"]) for progress_doc in progress_docs if _qualifies(progress_doc)]
+    window: dict[str, dict[str, Any]] = {}
+    for bounds in _streak_recompute_windows(_streak_base(streak, streak_snapshot)[0], days):
+        window.update(
+            {
+                snapshot.id: snapshot.to_dict() or {}
+                for snapshot in _streak_window_query(user_ref, bounds).stream(transaction=transaction)
+            }
+        )
+    return _stage_progress_with_streak(
+        transaction, user_ref, progress_docs, streak, window, writes, streak_snapshot
+    )
+
+
+@app.post("/v1/progress/daily")
+def upsert_daily_progress() -> tuple[Any, int]:
+    user_id, err = _user_id_from_request()
+    if err:
+        return err
+
+    progress_doc, error = _daily_progress_doc(_json_body())
+    if error:
+        return jsonify({"error": error}), 400
+
+    date_value = progress_doc["date"]
+    db = _get_db()
+    user_ref = db.collection("users").document(user_id)
+    if not _qualifies(progress_doc):
+        _commit_user_writes(db, user_ref, [(user_ref.collection("progress").document(date_value), progress_doc)])
+        return jsonify({"ok": True, "userId": user_id, "date": date_value}), 200
+
+    # The streak is read and advanced in the same transaction as the day that moves it.
+    streak = _commit_progress_with_streak(db.transaction(), user_ref, [progress_doc])
+    return jsonify({"ok": True, "userId": user_id, "date": date_value, "streak": streak}), 200
+
+
+# Firestore rejects batched writes with more than 500 operations.
+FIRESTORE_BATCH_MAX_WRITES = 500
+# Each entry of a progress batch costs its day and (at worst) its own month rollup, and every chunk
+# leaves room for its stats/streak and users/{uid} snapshot writes.
+PROGRESS_BATCH_CHUNK_SIZE = (FIRESTORE_BATCH_MAX_WRITES - 1 - (1 if USER_SNAPSHOT else 0)) // 2
+PROGRESS_BATCH_MAX_ENTRIES = _env_int("PROGRESS_BATCH_MAX_ENTRIES", 1000)
+
+
+def _daily_progress_batch(
+    payload: dict[str, Any],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], tuple[dict[str, Any], int] | None]:
+    """Validate a batch payload; returns (progress docs, per-entry results, error response)."""
+    entries = payload.get("entries")
+    if not isinstance(entries, list) or not entries:
+        return [], [], ({"error": "entries must be a non-empty array."}, 400)
+    if len(entries) > PROGRESS_BATCH_MAX_ENTRIES:
+        return [], [], ({"error": f"entries must contain at most {PROGRESS_BATCH_MAX_ENTRIES} items."}, 400)
+
+    # Validate every entry before writing anything so a bad entry never leaves a partial replay.
+    results: list[dict[str, Any]] = []
+    progress_docs: list[dict[str, Any]] = []
+    seen_dates: set[str] = set()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            progress_doc, error = None, "entry must be an object."
+        elif "date" not in entry:
+            progress_doc, error = None, "date is required."
+        else:
+            progress_doc, error = _daily_progress_doc(entry)
+        if progress_doc is not None and progress_doc["date"] in seen_dates:
+            progress_doc, error = None, "duplicate date in batch."
+        result: dict[str, Any] = {"index": index}
+        if progress_doc is not None:
+            result["date"] = progress_doc["date"]
+            seen_dates.add(progress_doc["date"])
+            progress_docs.append(progress_doc)
+        if error:
+            result["status"] = "invalid"
+            result["error"] = error
+        results.append(result)
+
+    if len(progress_docs) != len(entries):
+        for result in results:
+            result.setdefault("status", "not_written")
+        return [], results, ({"error": "One or more entries are invalid.", "results": results}, 400)
+    return progress_docs, results, None
+
+
+def _mark_progress_results(results: list[dict[str, Any]], status: str, error: str | None = None) -> None:
+    for result in results:
+        result["status"] = status
+        if error is not None:
+            result["error"] = error
+
+
+def _progress_batch_chunks(
+    progress_docs: list[dict[str, Any]], results: list[dict[str, Any]]
+) -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+    """(progress docs, their results) in chunks of `PROGRESS_BATCH_CHUNK_SIZE`, in date order, so
+    a replay advances the streak forwards instead of landing days before the current run."""
+    entries = sorted(zip(progress_docs, results), key=lambda entry: entry[0]["date"])
+    for start in range(0, len(entries), PROGRESS_BATCH_CHUNK_SIZE):
+        chunk = entries[start : start + PROGRESS_BATCH_CHUNK_SIZE]
+        yield [progress_doc for progress_doc, _ in chunk], [result for _, result in chunk]
+
+
+def _progress_batch_response(
+    user_id: str, results: list[dict[str, Any]], failed: bool, streak: dict[str, Any] | None = None
+) -> tuple[dict[str, Any], int]:
+    written = sum(1 for result in results if result["status"] == "written")
+    body = {"ok": not failed, "userId": user_id, "written": written, "results": results}
+    if streak is not None:
+        body["streak"] = streak
+    return body, 500 if failed else 200
+
+
+@app.post("/v1/progress/daily/batch")
+def upsert_daily_progress_batch() -> tuple[Any, int]:
     user_id, err = _user_id_from_request()
     if err:
         return err
 
-    payload = _json_body()
+    progress_docs, results, error_response = _daily_progress_batch(_json_body())
+    if error_response:
+        body, status = error_response
+        return jsonify(body), status
+
+    db = _get_db()
+    user_ref = db.collection("users").document(user_id)
+    progress_collection = user_ref.collection("progress")
+    failed = False
+    streak = None
+    for chunk_docs, chunk_results in _progress_batch_chunks(progress_docs, results):
+        if failed:
+            _mark_progress_results(chunk_results, "not_written")
+            continue
+        try:
+            if any(_qualifies(progress_doc) for progress_doc in chunk_docs):
+                # Qualifying days advance the streak in one transaction per chunk, like a single day.
+                streak = _commit_progress_with_streak(db.transaction(), user_ref, chunk_docs)
+            else:
+                batch = db.batch()
+                writes = [
+                    (progress_collection.document(progress_doc["date"]), progress_doc) for progress_doc in chunk_docs
+                ]
+                for ref, data in _with_mirrors(user_ref, writes):
+                    batch.set(ref, data, merge=True)
+                batch.commit()
+        except Exception as exc:
+            failed = True
+            _mark_progress_results(chunk_results, "failed", str(exc))
+            continue
+        _mark_progress_results(chunk_results, "written")
+
+    body, status = _progress_batch_response(user_id, results, failed, streak)
+    return jsonify(body), status
+
+
+def _streak_snapshot_doc(payload: dict[str, Any]) -> tuple[dict[str, Any] | None, str | None]:
     current_streak = payload.get("currentStreak")
     longest_streak = payload.get("longestStreak")
     last_qualified_date = payload.get("lastQualifiedDate", "")
 
     if not isinstance(current_streak, int) or current_streak < 0:
-        return jsonify({"error": "currentStreak must be a non-negative integer."}), 400
+        return None, "currentStreak must be a non-negative integer."
     if not isinstance(longest_streak, int) or longest_streak < 0:
-        return jsonify({"error": "longestStreak must be a non-negative integer."}), 400
+        return None, "longestStreak must be a non-negative integer."
     if not isinstance(last_qualified_date, str):
-        return jsonify({"error": "lastQualifiedDate must be a string."}), 400
+        return None, "lastQualifiedDate must be a string."
 
     normalized_last_qualified_date = last_qualified_date.strip()
     if normalized_last_qualified_date:
         try:
             dt.date.fromisoformat(normalized_last_qualified_date)
         except ValueError:
-            return jsonify({"error": "lastQualifiedDate must be yyyy-mm-dd or empty."}), 400
+            return None, "lastQualifiedDate must be yyyy-mm-dd or empty."
 
-    streak_data = {
+    return {
         "currentStreak": current_streak,
         "longestStreak": longest_streak,
         "lastQualifiedDate": normalized_last_qualified_date,
         "source": "app_snapshot",
         "updatedAt": firestore.SERVER_TIMESTAMP,
+    }, None
+
+
+PROGRESS_HISTORY_MAX_DAYS = _env_int("PROGRESS_HISTORY_MAX_DAYS", 366)
+
+
+def _date_range(args: Any, max_days: int | None = None) -> tuple[tuple[dt.date, dt.date] | None, str | None]:
+    """Validate the `from`/`to` query parameters (inclusive yyyy-mm-dd bounds, at most `max_days` apart)."""
+    bounds: list[dt.date] = []
+    for name in ("from", "to"):
+        raw = args.get(name, "").strip()
+        if not raw:
+            return None, f"{name} is required."
+        try:
+            bounds.append(dt.date.fromisoformat(raw))
+        except ValueError:
+            return None, f"{name} must be yyyy-mm-dd."
+    start, end = bounds
+    if start > end:
+        return None, "from must not be after to."
+    if max_days is not None and (end - start).days + 1 > max_days:
+        return None, f"range must span at most {max_days} days."
+    return (start, end), None
+
+
+def _progress_rollup_refs(db: Any, user_id: str, start: dt.date, end: dt.date) -> list[Any]:
+    """Rollup refs of every month from `start` to `end`, in order."""
+    collection = db.collection("users").document(user_id).collection(PROGRESS_ROLLUP_COLLECTION)
+    # Step by month number: date arithmetic past December 9999 overflows.
+    first, last = start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+    return [collection.document(f"{index // 12:04d}-{index % 12 + 1:02d}") for index in range(first, last + 1)]
+
+
+def _progress_history_days(
+    rollups: list[dict[str, Any]], start: dt.date, end: dt.date
+) -> list[dict[str, Any]]:
+    """Days of the rollups between `start` and `end` inclusive, sorted by date."""
+    first, last = start.isoformat(), end.isoformat()
+    days = []
+    for rollup in rollups:
+        rollup_days = rollup.get("days")
+        if not isinstance(rollup_days, dict):
+            continue
+        for date_value, day in rollup_days.items():
+            if first <= date_value <= last and isinstance(day, dict):
+                days.append({"date": date_value, **day})
+    days.sort(key=lambda day: day["date"])
+    return days
+
+
+@app.get("/v1/progress/history")
+def get_progress_history() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = _user_id_from_request()
+    if err:
+        return err
+
+    date_range, error = _date_range(request.args, PROGRESS_HISTORY_MAX_DAYS)
+    if error:
+        return jsonify({"error": error}), 400
+    start, end = date_range
+
+    # One rollup per month, all in a single batched read, instead of one document per day.
+    refs = _progress_rollup_refs(_get_db(), user_id, start, end)
+    snapshots = _get_documents(refs)
+    etag = _documents_etag(refs, snapshots, variant=f"{start}:{end}")
+    headers = {
+        "X-Firestore-Rpc-Count": str(request.environ.get("unstoppable.firestore_reads", 0)),
+        **_etag_headers(etag),
     }
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, headers
+    days = _progress_history_days([_snapshot_data(snapshots, ref) for ref in refs], start, end)
+    return (
+        jsonify({"ok": True, "userId": user_id, "from": start.isoformat(), "to": end.isoformat(), "days": days}),
+        200,
+        headers,
+    )
 
-    db = _get_db()
-    streak_ref = db.collection("users").document(user_id).collection("stats").document("streak")
-    streak_ref.set(streak_data, merge=True)
 
-    return jsonify({"ok": True, "userId": user_id}), 200
+PROGRESS_PAGE_SIZE = _env_int("PROGRESS_PAGE_SIZE", 100)
+PROGRESS_PAGE_MAX_SIZE = _env_int("PROGRESS_PAGE_MAX_SIZE", 1000)
+PROGRESS_DAY_FIELDS = ("completed", "total", "completedTaskIds", "updatedAt")
 
 
-@app.get("/v1/bootstrap")
-def get_bootstrap() -> tuple[Any, int]:
+class _ProgressPageRequest(NamedTuple):
+    start: dt.date
+    end: dt.date
+    after: str | None
+    field_paths: list[str] | None
+    limit: int
+
+
+def _encode_progress_cursor(date_value: str) -> str:
+    raw = json.dumps({"v": 1, "d": date_value}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _progress_cursor(token: str) -> tuple[str | None, str | None]:
+    """Parse the `cursor` query argument; an empty token means the first page."""
+    token = token.strip()
+    if not token:
+        return None, None
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raw = None
+    if isinstance(raw, dict) and raw.get("v") == 1 and isinstance(raw.get("d"), str):
+        return raw["d"], None
+    return None, "cursor must be a nextCursor returned by /v1/progress."
+
+
+def _progress_page_request(args: Any) -> tuple[_ProgressPageRequest | None, str | None]:
+    """Validate `from`, `to`, `cursor`, `fields` and `limit` for GET /v1/progress."""
+    date_range, error = _date_range(args)
+    if error:
+        return None, error
+    after, error = _progress_cursor(args.get("cursor", ""))
+    if error:
+        return None, error
+    fields, error = _parse_fields(args.get("fields", ""), PROGRESS_DAY_FIELDS)
+    if error:
+        return None, error
+    raw_limit = args.get("limit", "").strip()
+    limit = PROGRESS_PAGE_SIZE
+    if raw_limit:
+        # isdigit() alone accepts digits like "²" that int() rejects.
+        if not (raw_limit.isascii() and raw_limit.isdigit()) or not 1 <= int(raw_limit) <= PROGRESS_PAGE_MAX_SIZE:
+            return None, f"limit must be an integer from 1 to {PROGRESS_PAGE_MAX_SIZE}."
+        limit = int(raw_limit)
+    start, end = date_range
+    # Days are flat documents, so a dotted selection masks its top-level field.
+    field_paths = sorted(fields) if fields else None
+    return _ProgressPageRequest(start, end, after, field_paths, limit), None
+
+
+def _progress_range_query(user_ref: Any, page: _ProgressPageRequest) -> Any:
+    """Progress days of the page's range after its cursor, by date; one extra row detects another page."""
+    query = user_ref.collection("progress").order_by("__name__")
+    if page.field_paths is not None:
+        query = query.select(page.field_paths)
+    if page.after is not None:
+        query = query.start_after({"__name__": page.after})
+    else:
+        query = query.start_at({"__name__": page.start.isoformat()})
+    return query.end_at({"__name__": page.end.isoformat()}).limit(page.limit + 1)
+
+
+def _progress_page_open(user_id: str, page: _ProgressPageRequest) -> str:
+    head = {"ok": True, "userId": user_id, "from": page.start.isoformat(), "to": page.end.isoformat()}
+    return app.json.dumps(head)[:-1] + ',"days":['
+
+
+def _progress_page_day(index: int, snapshot: Any) -> str:
+    return ("," if index else "") + app.json.dumps({"date": snapshot.id, **(snapshot.to_dict() or {})})
+
+
+def _progress_page_close(next_cursor: str | None, error: str | None = None) -> str:
+    tail = ',"error":' + json.dumps(error) if error is not None else ""
+    return '],"nextCursor":' + json.dumps(next_cursor) + tail + "}"
+
+
+PROGRESS_PAGE_INTERRUPTED = "Progress read failed mid-page; resume from nextCursor."
+
+
+def _progress_page(
+    user_id: str, page: _ProgressPageRequest, first: Any, snapshots: Iterator[Any]
+) -> Iterator[str]:
+    """The JSON body of one page, one day at a time, as the query streams in.
+
+    `first` is the query's first snapshot (None for an empty page), pulled before the response
+    starts so a query that cannot run still gets an error status. A read that fails once the
+    body has started ends the page early instead: the days sent stay valid JSON, `nextCursor`
+    resumes after the last of them, and `error` is set to `PROGRESS_PAGE_INTERRUPTED`.
+    """
+    yield _progress_page_open(user_id, page)
+    next_cursor = None
+    error = None
+    if first is not None:
+        yield _progress_page_day(0, first)
+        last_date = first.id
+        try:
+            for index, snapshot in enumerate(snapshots, start=1):
+                if index == page.limit:
+                    next_cursor = _encode_progress_cursor(last_date)
+                    break
+                yield _progress_page_day(index, snapshot)
+                last_date = snapshot.id
+        except google_exceptions.GoogleAPICallError:
+            app.logger.warning("Progress page read failed after %s.", last_date, exc_info=True)
+            next_cursor = _encode_progress_cursor(last_date)
+            error = PROGRESS_PAGE_INTERRUPTED
+    yield _progress_page_close(next_cursor, error)
+
+
+@app.get("/v1/progress")
+def get_progress() -> Any:
+    """Progress days from `from` to `to`, by date, `limit` per page, streamed as the query returns them."""
     user_id, err = _user_id_from_request()
     if err:
         return err
 
+    page, error = _progress_page_request(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    user_ref = _get_db().collection("users").document(user_id)
+    # The query runs lazily as the body is written, so a page is never held in memory whole.
+    snapshots = iter(_progress_range_query(user_ref, page).stream())
+    request.environ["unstoppable.firestore_reads"] = request.environ.get("unstoppable.firestore_reads", 0) + 1
+    try:
+        first = next(snapshots, None)
+    except google_exceptions.GoogleAPICallError:
+        app.logger.warning("Progress page read failed.", exc_info=True)
+        return jsonify({"error": "Failed to read progress."}), 503
+    return Response(
+        stream_with_context(_progress_page(user_id, page, first, snapshots)),
+        mimetype="application/json",
+        headers={"X-Firestore-Rpc-Count": str(request.environ["unstoppable.firestore_reads"])},
+    )
+
+
+@app.post("/v1/stats/streak/snapshot")
+def upsert_streak_snapshot() -> tuple[Any, int]:
+    user_id, err = _user_id_from_request()
+    if err:
+        return err
+
+    streak_data, error = _streak_snapshot_doc(_json_body())
+    if error:
+        return jsonify({"error": error}), 400
+
     db = _get_db()
     user_ref = db.collection("users").document(user_id)
-    profile_doc = user_ref.collection("profile").document("self").get()
-    routine_doc = user_ref.collection("routine").document("current").get()
-    streak_doc = user_ref.collection("stats").document("streak").get()
-    today_doc = user_ref.collection("progress").document(_today_yyyy_mm_dd()).get()
-    subscription_doc = user_ref.collection("payments").document("subscription").get()
-    profile_data = profile_doc.to_dict() if profile_doc.exists else {}
-    subscription_data = subscription_doc.to_dict() if subscription_doc.exists else {}
-    profile_complete, missing_profile_fields = _profile_completion(profile_data, subscription_data)
+    # Read in a transaction: once the server maintains the streak, a client snapshot is ignored.
+    streak = _commit_progress_with_streak(db.transaction(), user_ref, [], streak_snapshot=streak_data)
+
+    return jsonify({"ok": True, "userId": user_id, "streak": streak}), 200
+
+
+def _bootstrap_refs(db: Any, user_id: str) -> list[Any]:
+    """Profile, routine, streak, today's progress and subscription refs, in that order."""
+    user_ref = db.collection("users").document(user_id)
+    return [
+        user_ref.collection("profile").document("self"),
+        user_ref.collection("routine").document("current"),
+        user_ref.collection("stats").document("streak"),
+        user_ref.collection("progress").document(_today_yyyy_mm_dd()),
+        user_ref.collection("payments").document("subscription"),
+    ]
+
+
+def _bootstrap_response(user_id: str, refs: list[Any], snapshots: dict[str, Any]) -> dict[str, Any]:
+    return _bootstrap_body(user_id, [_snapshot_data(snapshots, ref) for ref in refs])
+
+
+def _bootstrap_body(user_id: str, sections: list[dict[str, Any]]) -> dict[str, Any]:
+    """Bootstrap response from the data of each `_bootstrap_refs` document, in the same order."""
+    profile_data, routine_data, streak_data, today_data, subscription_data = sections
 
     response = {
         "userId": user_id,
-        "profile": _json_safe(profile_data),
-        "isProfileComplete": profile_complete,
-        "profileCompletion": {
-            "isComplete": profile_complete,
-            "missingRequiredFields": missing_profile_fields,
-        },
-        "routine": _json_safe(routine_doc.to_dict() if routine_doc.exists else {}),
-        "streak": _json_safe(streak_doc.to_dict() if streak_doc.exists else {}),
+        "profile": _profile_section(profile_data),
+        **_profile_completion_fields(profile_data, subscription_data),
+        "routine": routine_data,
+        "streak": streak_data,
         "progress": {
-            "today": _json_safe(today_doc.to_dict() if today_doc.exists else {}),
+            "today": today_data,
         },
-        "subscription": _json_safe(subscription_data),
+        "subscription": _subscription_section(subscription_data),
     }
-    return jsonify(response), 200
+    return response
+
+
+BOOTSTRAP_RESPONSE_KEYS = (
+    "userId",
+    "profile",
+    "isProfileComplete",
+    "profileCompletion",
+    "routine",
+    "streak",
+    "progress",
+    "subscription",
+)
+# Response key -> (index into `_bootstrap_refs`, path from the key down to the document's fields).
+_BOOTSTRAP_DOCUMENT_KEYS: dict[str, tuple[int, tuple[str, ...]]] = {
+    "profile": (0, ()),
+    "routine": (1, ()),
+    "streak": (2, ()),
+    "progress": (3, ("today",)),
+    "subscription": (4, ()),
+}
+# Document fields `_profile_completion` reads, by index into `_bootstrap_refs`.
+_PROFILE_COMPLETION_FIELDS: dict[int, tuple[str, ...]] = {
+    0: (PROFILE_REQUIREMENTS_FIELD, "nickname", "notificationsEnabled", "termsAccepted", "termsOver16Accepted"),
+    4: ("paymentOption",),
+}
+_FIELD_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+def _parse_fields(raw: str, allowed_keys: tuple[str, ...]) -> tuple[dict[str, Any] | None, str | None]:
+    """Parse `fields=a,b.c` into a selection tree (`{"a": {}, "b": {"c": {}}}`, `{}` selects everything below).
+
+    Returns (None, None) when no selection was requested.
+    """
+    tree: dict[str, Any] = {}
+    for path in raw.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        segments = path.split(".")
+        if not all(_FIELD_NAME.match(segment) for segment in segments):
+            return None, f"Invalid field path: {path}"
+        if segments[0] not in allowed_keys:
+            return None, f"Unknown field: {segments[0]}"
+        node = tree
+        for segment in segments[:-1]:
+            if node.get(segment) == {}:
+                break  # an ancestor is already selected whole
+            node = node.setdefault(segment, {})
+        else:
+            node[segments[-1]] = {}
+    return (tree or None), None
 
 
-@app.get("/v1/user/subscription")
-def get_user_subscription() -> tuple[Any, int]:
+def _project(value: Any, fields: dict[str, Any]) -> Any:
+    if not fields or not isinstance(value, dict):
+        return value
+    return {key: _project(value[key], selection) for key, selection in fields.items() if key in value}
+
+
+def _field_paths(fields: dict[str, Any], prefix: str = "") -> list[str]:
+    paths: list[str] = []
+    for key, selection in fields.items():
+        if selection:
+            paths.extend(_field_paths(selection, f"{prefix}{key}."))
+        else:
+            paths.append(prefix + key)
+    return paths
+
+
+def _bootstrap_read_plan(fields: dict[str, Any] | None) -> tuple[list[int], tuple[str, ...] | None]:
+    """Which `_bootstrap_refs` a field selection needs, and the Firestore field mask for reading them.
+
+    The mask is shared by every document in the batched read, so it is the union of the fields
+    needed from each; any section selected whole disables it.
+    """
+    if fields is None:
+        return list(range(len(_BOOTSTRAP_DOCUMENT_KEYS))), None
+
+    needed = _bootstrap_document_fields(fields)
+    if any(paths is None for paths in needed.values()):
+        return sorted(needed), None
+    return sorted(needed), tuple(sorted(set().union(*needed.values()))) if needed else None
+
+
+def _bootstrap_document_fields(fields: dict[str, Any]) -> dict[int, set[str] | None]:
+    """Fields a selection needs from each `_bootstrap_refs` document (None: the whole document)."""
+    needed: dict[int, set[str] | None] = {}
+
+    def need(index: int, paths: list[str] | tuple[str, ...] | None) -> None:
+        if paths is None:
+            needed[index] = None
+        elif needed.get(index, set()) is not None:
+            needed.setdefault(index, set()).update(paths)
+
+    for key, selection in fields.items():
+        if key in ("isProfileComplete", "profileCompletion"):
+            for index, paths in _PROFILE_COMPLETION_FIELDS.items():
+                need(index, paths)
+        elif key in _BOOTSTRAP_DOCUMENT_KEYS:
+            index, path = _BOOTSTRAP_DOCUMENT_KEYS[key]
+            for segment in path:
+                if not selection:
+                    break  # the whole key is selected, so the whole document is needed
+                selection = selection.get(segment)
+                if selection is None:
+                    break  # selects only keys next to the document
+            if selection is not None:
+                paths = _field_paths(selection) if selection else None
+                if paths is not None and key == "subscription" and "isActive" in paths:
+                    paths.append("activeUntil")  # `isActive` is evaluated against it on read
+                need(index, paths)
+    return needed
+
+
+# Snapshot field holding each `_bootstrap_refs` document; progress is keyed by date below it.
+_USER_SNAPSHOT_FIELDS = ("profile", "routine", "streak", "progressDays", "subscription")
+
+
+def _user_snapshot_field_paths(fields: dict[str, Any] | None) -> tuple[str, ...] | None:
+    """Field mask for reading the users/{uid} snapshot for a bootstrap field selection."""
+    if fields is None:
+        return None
+    paths = {"snapshotVersion"}
+    for index, document_paths in _bootstrap_document_fields(fields).items():
+        snapshot_field = _USER_SNAPSHOT_FIELDS[index]
+        if document_paths is None or snapshot_field == "progressDays":
+            paths.add(snapshot_field)
+        else:
+            paths.update(f"{snapshot_field}.{path}" for path in document_paths)
+    return tuple(sorted(paths))
+
+
+def _user_snapshot_sections(snapshot: Any, today: str) -> list[dict[str, Any]] | None:
+    """Bootstrap sections from a users/{uid} snapshot, or None when it has to be rebuilt first."""
+    data = (snapshot.to_dict() or {}) if snapshot is not None and snapshot.exists else {}
+    if data.get("snapshotVersion") != USER_SNAPSHOT_VERSION:
+        return None
+    progress_days = data.get("progressDays") or {}
+    if len(progress_days) > USER_SNAPSHOT_MAX_PROGRESS_DAYS:
+        return None
+    sections = [data.get(field) or {} for field in _USER_SNAPSHOT_FIELDS]
+    sections[_USER_SNAPSHOT_FIELDS.index("progressDays")] = progress_days.get(today) or {}
+    return sections
+
+
+def _user_snapshot_refs(db: Any, user_id: str) -> tuple[list[Any], list[Any], list[Any]]:
+    """(`_bootstrap_refs`, progress refs in the snapshot window, every ref a rebuild reads)."""
+    user_ref = db.collection("users").document(user_id)
+    refs = _bootstrap_refs(db, user_id)
+    progress_refs = [
+        user_ref.collection("progress").document(day)
+        for day in _user_snapshot_progress_dates(dt.date.fromisoformat(refs[3].id))
+    ]
+    return refs, progress_refs, [*refs, *(ref for ref in progress_refs if ref.path != refs[3].path)]
+
+
+def _stage_user_snapshot(
+    transaction: Any,
+    user_ref: Any,
+    refs: list[Any],
+    progress_refs: list[Any],
+    snapshots: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Queue a complete users/{uid} snapshot on a (sync or async) transaction; returns the bootstrap sections."""
+    sections = [_snapshot_data(snapshots, ref) for ref in refs]
+    snapshot = {field: data for field, data in zip(_USER_SNAPSHOT_FIELDS, sections) if field != "progressDays"}
+    progress_days = {ref.id: _snapshot_data(snapshots, ref) for ref in progress_refs}
+    snapshot["progressDays"] = {day: data for day, data in progress_days.items() if data}
+    snapshot["snapshotVersion"] = USER_SNAPSHOT_VERSION
+    snapshot["snapshotBuiltAt"] = firestore.SERVER_TIMESTAMP
+    transaction.set(user_ref, snapshot)
+    return sections
+
+
+@firestore.transactional
+def _rebuild_user_snapshot(
+    transaction: firestore.Transaction, db: firestore.Client, user_id: str
+) -> list[dict[str, Any]]:
+    """Rebuild users/{uid} from the section documents it mirrors.
+
+    The documents are read in the transaction, so a write committed in the meantime makes it
+    retry instead of being overwritten by stale data. Returns the bootstrap sections.
+    """
+    refs, progress_refs, read_refs = _user_snapshot_refs(db, user_id)
+    snapshots = {snapshot.reference.path: snapshot for snapshot in transaction.get_all(read_refs)}
+    return _stage_user_snapshot(
+        transaction, db.collection("users").document(user_id), refs, progress_refs, snapshots
+    )
+
+
+USER_WRITE_SECTIONS = ("profile", "routine", "progress", "streak")
+
+
+class _UserWritePlan(NamedTuple):
+    writes: list[tuple[Any, dict[str, Any]]]
+    sections: list[str]
+    progress_date: str | None
+    # Written with `_commit_progress_with_streak` when either is set: a qualifying day advances the
+    # streak, and a client streak snapshot must not overwrite a server-maintained one.
+    progress_docs: list[dict[str, Any]]
+    streak_snapshot: dict[str, Any] | None
+
+
+def _user_write_plan(payload: dict[str, Any], user_ref: Any, decoded: Any) -> tuple[_UserWritePlan | None, str | None]:
+    """Validate the sections of a combined user write into (ref, merge data) pairs.
+
+    Each section is validated with the same rules as its single-section endpoint.
+    """
+    sections = {key: payload[key] for key in USER_WRITE_SECTIONS if key in payload}
+    if not sections:
+        return None, f"At least one of {', '.join(USER_WRITE_SECTIONS)} is required."
+    for key, section in sections.items():
+        if not isinstance(section, dict):
+            return None, f"{key} must be an object."
+
+    writes: list[tuple[Any, dict[str, Any]]] = []
+    progress_doc: dict[str, Any] | None = None
+    streak_snapshot: dict[str, Any] | None = None
+    if "profile" in sections:
+        profile_data, payment_option = _profile_update(sections["profile"], decoded)
+        if profile_data:
+            writes.append((user_ref.collection("profile").document("self"), profile_data))
+        if payment_option:
+            writes.append(
+                (
+                    user_ref.collection("payments").document("subscription"),
+                    _profile_payment_option_update(payment_option),
+                )
+            )
+    if "routine" in sections:
+        routine_data, error = _routine_update(sections["routine"])
+        if error:
+            return None, f"routine: {error}"
+        writes.append((user_ref.collection("routine").document("current"), routine_data))
+    if "progress" in sections:
+        progress_doc, error = _daily_progress_doc(sections["progress"])
+        if error:
+            return None, f"progress: {error}"
+    if "streak" in sections:
+        streak_snapshot, error = _streak_snapshot_doc(sections["streak"])
+        if error:
+            return None, f"streak: {error}"
+    progress_docs = []
+    if progress_doc is not None:
+        if streak_snapshot is not None or _qualifies(progress_doc):
+            progress_docs.append(progress_doc)
+        else:
+            writes.append((user_ref.collection("progress").document(progress_doc["date"]), progress_doc))
+    return (
+        _UserWritePlan(
+            writes=writes,
+            sections=list(sections),
+            progress_date=progress_doc["date"] if progress_doc is not None else None,
+            progress_docs=progress_docs,
+            streak_snapshot=streak_snapshot,
+        ),
+        None,
+    )
+
+
+def _user_write_response(user_id: str, plan: _UserWritePlan, streak: dict[str, Any] | None = None) -> dict[str, Any]:
+    response: dict[str, Any] = {"ok": True, "userId": user_id, "sections": plan.sections}
+    if plan.progress_date:
+        response["date"] = plan.progress_date
+    if streak is not None:
+        response["streak"] = streak
+    return response
+
+
+@app.post("/v1/user/state")
+def upsert_user_state() -> tuple[Any, int]:
+    """Write any combination of profile, routine, daily progress and streak in one commit."""
     user_id, err = _user_id_from_request()
     if err:
         return err
 
     db = _get_db()
-    subscription_doc = (
-        db.collection("users")
-        .document(user_id)
-        .collection("payments")
-        .document("subscription")
-        .get()
+    user_ref = db.collection("users").document(user_id)
+    plan, error = _user_write_plan(_json_body(), user_ref, request.environ.get("unstoppable.decoded_token"))
+    if error:
+        return jsonify({"error": error}), 400
+
+    if not plan.progress_docs and plan.streak_snapshot is None:
+        _commit_user_writes(db, user_ref, plan.writes)
+        return jsonify(_user_write_response(user_id, plan)), 200
+
+    # Everything goes in the transaction that reads and advances the streak, so the write stays atomic.
+    streak = _commit_progress_with_streak(
+        db.transaction(), user_ref, plan.progress_docs, plan.writes, plan.streak_snapshot
     )
+    for ref, _ in plan.writes:
+        _subscription_cache.invalidate(ref.path)
+    return jsonify(_user_write_response(user_id, plan, streak)), 200
+
+
+@app.get("/v1/bootstrap")
+def get_bootstrap() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = _user_id_from_request()
+    if err:
+        return err
+
+    fields, error = _parse_fields(request.args.get("fields", ""), BOOTSTRAP_RESPONSE_KEYS)
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = _get_db()
+    indexes, field_paths = _bootstrap_read_plan(fields)
+    if USER_SNAPSHOT and indexes:
+        return _bootstrap_from_user_snapshot(db, user_id, fields)
+
+    refs = _bootstrap_refs(db, user_id)
+    read_refs = [refs[index] for index in indexes]
+    # The documents come back from a single batched read instead of sequential gets; a field
+    # selection skips documents it doesn't need and masks the fields of the rest.
+    snapshots = _get_documents(read_refs, field_paths)
+    rpc_count = request.environ.get("unstoppable.firestore_reads", 0)
+    variant = (json.dumps(fields, sort_keys=True) if fields else "") + _subscription_variant(
+        _snapshot_data(snapshots, refs[_BOOTSTRAP_DOCUMENT_KEYS["subscription"][0]])
+    )
+    etag = _documents_etag(read_refs, snapshots, variant=variant)
+    headers = {"X-Firestore-Rpc-Count": str(rpc_count), **_etag_headers(etag)}
+    # Decided from document update times alone, so an unchanged bootstrap is never serialized.
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, headers
+    response = _bootstrap_response(user_id, refs, snapshots)
+    return jsonify(_project(response, fields) if fields else response), 200, headers
+
+
+def _bootstrap_from_user_snapshot(
+    db: firestore.Client, user_id: str, fields: dict[str, Any] | None
+) -> tuple[Any, int, dict[str, str]]:
+    """Bootstrap from the users/{uid} snapshot in one document read, rebuilding it first when
+    it is missing or stale (a rebuilt response carries no ETag)."""
+    user_ref = db.collection("users").document(user_id)
+    today = _today_yyyy_mm_dd()
+    snapshots = _get_documents([user_ref], _user_snapshot_field_paths(fields))
+    sections = _user_snapshot_sections(snapshots[user_ref.path], today)
+    etag = None
+    if sections is None:
+        sections = _rebuild_user_snapshot(db.transaction(), db, user_id)
+        request.environ["unstoppable.firestore_reads"] = request.environ.get("unstoppable.firestore_reads", 0) + 1
+    else:
+        # Today's date picks the progress day out of the snapshot, so it is part of the variant.
+        variant = f"{today}:{json.dumps(fields, sort_keys=True)}{_subscription_variant(sections[-1])}"
+        etag = _documents_etag([user_ref], snapshots, variant=variant)
+    headers = {"X-Firestore-Rpc-Count": str(request.environ.get("unstoppable.firestore_reads", 0))}
+    if etag is not None:
+        headers.update(_etag_headers(etag))
+        if request.if_none_match.contains_weak(etag):
+            return "", 304, headers
+    response = _bootstrap_body(user_id, sections)
+    return jsonify(_project(response, fields) if fields else response), 200, headers
+
+
+@app.get("/v1/user/subscription")
+def get_user_subscription() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = _user_id_from_request()
+    if err:
+        return err
+
+    subscription_ref = (
+        _get_db().collection("users").document(user_id).collection("payments").document("subscription")
+    )
+    # Shares an in-flight read with a concurrent bootstrap for the same user.
+    snapshots = _get_documents([subscription_ref])
+    subscription = _snapshot_data(snapshots, subscription_ref)
+    etag = _documents_etag([subscription_ref], snapshots, variant=_subscription_variant(subscription))
+    headers = _etag_headers(etag)
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, headers
     return (
         jsonify(
             {
                 "ok": True,
                 "userId": user_id,
-                "subscription": _json_safe(subscription_doc.to_dict() if subscription_doc.exists else {}),
+                "subscription": _subscription_section(subscription),
             }
         ),
         200,
+        headers,
     )
 
 
-@app.post("/v1/payments/subscription/snapshot")
-def upsert_subscription_snapshot() -> tuple[Any, int]:
+SYNC_SECTIONS = ("profile", "routine", "streak", "subscription")
+SYNC_PROGRESS_PAGE_SIZE = _env_int("SYNC_PROGRESS_PAGE_SIZE", 200)
+# Sync reads are pinned slightly in the past so the read time is never ahead of Firestore's clock.
+SYNC_READ_LAG_MS = _env_int("SYNC_READ_LAG_MS", 1000)
+
+
+class _SyncWatermark(NamedTuple):
+    """Everything with `updatedAt <= updated_at` has been synced, except progress days at exactly
+    `updated_at` that sort after `progress_date` (set only when a progress page was cut short)."""
+
+    updated_at: dt.datetime
+    progress_date: str | None
+
+
+def _encode_sync_watermark(watermark: _SyncWatermark) -> str:
+    raw = json.dumps(
+        {"v": 1, "t": watermark.updated_at.isoformat(), "p": watermark.progress_date},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _sync_since(token: str) -> tuple[_SyncWatermark | None, str | None]:
+    """Parse the `since` query argument; an empty token means a full sync."""
+    token = token.strip()
+    if not token:
+        return None, None
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raw = None
+    if isinstance(raw, dict) and raw.get("v") == 1 and isinstance(raw.get("t"), str):
+        updated_at = _parse_iso_datetime(raw["t"])
+        progress_date = raw.get("p")
+        if updated_at is not None and (progress_date is None or isinstance(progress_date, str)):
+            return _SyncWatermark(updated_at, progress_date), None
+    return None, "since must be a watermark returned by /v1/sync."
+
+
+def _sync_read_time() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc) - dt.timedelta(milliseconds=SYNC_READ_LAG_MS)
+
+
+def _sync_refs(user_ref: Any) -> list[Any]:
+    """Profile, routine, streak and subscription refs, in `SYNC_SECTIONS` order."""
+    return [
+        user_ref.collection("profile").document("self"),
+        user_ref.collection("routine").document("current"),
+        user_ref.collection("stats").document("streak"),
+        user_ref.collection("payments").document("subscription"),
+    ]
+
+
+def _sync_progress_query(user_ref: Any, since: _SyncWatermark | None) -> Any:
+    """Progress days changed after `since`, oldest change first; one extra row detects another page."""
+    query = user_ref.collection("progress").order_by("updatedAt").order_by("__name__")
+    if since is not None:
+        cursor: dict[str, Any] = {"updatedAt": since.updated_at}
+        if since.progress_date is not None:
+            cursor["__name__"] = since.progress_date
+        query = query.start_after(cursor)
+    return query.limit(SYNC_PROGRESS_PAGE_SIZE + 1)
+
+
+def _sync_response(
+    user_id: str,
+    refs: list[Any],
+    snapshots: dict[str, Any],
+    progress_snapshots: list[Any],
+    since: _SyncWatermark | None,
+    read_time: dt.datetime,
+) -> dict[str, Any]:
+    """Sections and progress days changed after `since` (everything when it is None), plus the next watermark.
+
+    `snapshots` and `progress_snapshots` must both have been read at `read_time`.
+    """
+    response: dict[str, Any] = {"userId": user_id, "full": since is None}
+    for section, ref in zip(SYNC_SECTIONS, refs):
+        data = _snapshot_data(snapshots, ref)
+        updated_at = _coerce_firestore_datetime(data.get("updatedAt"))
+        if section == "subscription" and since is not None and _subscription_lapsed(data, read_time):
+            # A lapse changes the response without a write; send it once, on the first sync after it.
+            if not _subscription_lapsed(data, since.updated_at):
+                updated_at = read_time
+        if since is None or (updated_at is not None and updated_at > since.updated_at):
+            if section == "profile":
+                data = _profile_section(data)
+            elif section == "subscription":
+                data = _subscription_section(data)
+            response[section] = data
+    if "profile" in response or "subscription" in response:
+        profile_ref, _, _, subscription_ref = refs
+        response.update(
+            _profile_completion_fields(
+                _snapshot_data(snapshots, profile_ref), _snapshot_data(snapshots, subscription_ref)
+            )
+        )
+
+    days = [{"date": snapshot.id, **(snapshot.to_dict() or {})} for snapshot in progress_snapshots]
+    has_more = len(days) > SYNC_PROGRESS_PAGE_SIZE
+    if has_more:
+        days = days[:SYNC_PROGRESS_PAGE_SIZE]
+        last = progress_snapshots[SYNC_PROGRESS_PAGE_SIZE - 1]
+        watermark = _SyncWatermark(_coerce_firestore_datetime(days[-1]["updatedAt"]), last.id)
+    else:
+        watermark = _SyncWatermark(read_time, None)
+    response["progress"] = {"days": days, "hasMore": has_more}
+    response["watermark"] = _encode_sync_watermark(watermark)
+    return response
+
+
+@app.get("/v1/sync")
+def get_sync() -> tuple[Any, int, dict[str, str]]:
+    """Sections and progress days written since the client's watermark."""
     user_id, err = _user_id_from_request()
     if err:
         return err
 
-    payload = _json_body()
+    since, error = _sync_since(request.args.get("since", ""))
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = _get_db()
+    user_ref = db.collection("users").document(user_id)
+    refs = _sync_refs(user_ref)
+    # Both reads see one snapshot, so every write committed at or before read_time is either
+    # returned now or already covered by `since`; the next watermark can start right there.
+    read_time = _sync_read_time()
+    snapshots = {snapshot.reference.path: snapshot for snapshot in db.get_all(refs, read_time=read_time)}
+    progress_snapshots = list(_sync_progress_query(user_ref, since).stream(read_time=read_time))
+    request.environ["unstoppable.firestore_reads"] = request.environ.get("unstoppable.firestore_reads", 0) + 2
+
+    response = _sync_response(user_id, refs, snapshots, progress_snapshots, since, read_time)
+    rpc_count = request.environ["unstoppable.firestore_reads"]
+    return jsonify(response), 200, {"X-Firestore-Rpc-Count": str(rpc_count)}
+
+
+def _subscription_snapshot_update(payload: dict[str, Any], user_id: str) -> dict[str, Any]:
     allowed_fields = {
         "entitlementId",
         "entitlementIds",
@@ -603,31 +3213,34 @@ def upsert_subscription_snapshot() -> tuple[Any, int]:
         snapshot["paymentOption"] = normalized_payment_option
     else:
         snapshot.pop("paymentOption", None)
+    return snapshot
 
+
+@app.post("/v1/payments/subscription/snapshot")
+def upsert_subscription_snapshot() -> tuple[Any, int]:
+    user_id, err = _user_id_from_request()
+    if err:
+        return err
+
+    snapshot = _subscription_snapshot_update(_json_body(), user_id)
     db = _get_db()
-    (
-        db.collection("users")
-        .document(user_id)
-        .collection("payments")
-        .document("subscription")
-        .set(snapshot, merge=True)
-    )
+    user_ref = db.collection("users").document(user_id)
+    subscription_ref = user_ref.collection("payments").document("subscription")
+    _commit_user_writes(db, user_ref, _subscription_writes(subscription_ref, snapshot))
     return jsonify({"ok": True, "userId": user_id}), 200
 
 
-@app.post("/v1/payments/revenuecat/webhook")
-def revenuecat_webhook() -> tuple[Any, int]:
-    if not _webhook_authorized():
-        return jsonify({"error": "Unauthorized webhook request."}), 401
+class _RevenueCatEvent(NamedTuple):
+    event_id: str
+    app_user_id: str
+    event_doc: dict[str, Any]
+    subscription_update: dict[str, Any]
 
-    payload = _json_body()
-    event = payload.get("event", payload)
-    if not isinstance(event, dict):
-        return jsonify({"error": "Invalid webhook payload."}), 400
 
+def _normalize_revenuecat_event(event: dict[str, Any]) -> tuple[_RevenueCatEvent | None, str | None]:
     raw_event_id = event.get("id") or event.get("event_id")
     if not isinstance(raw_event_id, str) or not raw_event_id.strip():
-        return jsonify({"error": "Missing event id."}), 400
+        return None, "Missing event id."
     event_id = raw_event_id.strip()
 
     raw_event_type = event.get("type")
@@ -635,9 +3248,8 @@ def revenuecat_webhook() -> tuple[Any, int]:
 
     raw_user_id = event.get("app_user_id")
     if not isinstance(raw_user_id, str) or not raw_user_id.strip():
-        return jsonify({"error": "Missing app_user_id."}), 400
+        return None, "Missing app_user_id."
     app_user_id = raw_user_id.strip()
-    canonical_app_user_id = _canonical_user_id_for_app_user_id(app_user_id)
 
     entitlement_ids: list[str] = []
     if isinstance(event.get("entitlement_ids"), list):
@@ -680,41 +3292,18 @@ def revenuecat_webhook() -> tuple[Any, int]:
     else:
         is_active = False
 
-    db = _get_db()
-    event_ref = db.collection("payments").document("revenuecat").collection("events").document(event_id)
-
-    try:
-        event_ref.create(
-            {
-                "provider": "revenuecat",
-                "eventId": event_id,
-                "eventType": event_type,
-                "appUserId": canonical_app_user_id,
-                "rawAppUserId": app_user_id,
-                "eventAt": event_at,
-                "receivedAt": firestore.SERVER_TIMESTAMP,
-                "payload": event,
-            }
-        )
-    except google_exceptions.AlreadyExists:
-        return jsonify({"ok": True, "duplicate": True, "eventId": event_id}), 200
-
-    subscription_ref = (
-        db.collection("users")
-        .document(canonical_app_user_id)
-        .collection("payments")
-        .document("subscription")
-    )
-    existing_doc = subscription_ref.get()
-    existing_data = existing_doc.to_dict() if existing_doc.exists else {}
-    existing_event_at = _coerce_firestore_datetime(existing_data.get("latestEventAt"))
-    if existing_event_at is not None and event_at < existing_event_at:
-        return jsonify({"ok": True, "ignoredOutOfOrder": True, "eventId": event_id}), 200
-
     entitlement_id = entitlement_ids[0] if entitlement_ids else ""
-    normalized = {
+    event_doc = {
+        "provider": "revenuecat",
+        "eventId": event_id,
+        "eventType": event_type,
+        "rawAppUserId": app_user_id,
+        "eventAt": event_at,
+        "receivedAt": firestore.SERVER_TIMESTAMP,
+        "payload": event,
+    }
+    subscription_update = {
         "provider": "revenuecat",
-        "appUserId": canonical_app_user_id,
         "rawAppUserId": app_user_id,
         "entitlementId": entitlement_id,
         "entitlementIds": entitlement_ids,
@@ -731,9 +3320,120 @@ def revenuecat_webhook() -> tuple[Any, int]:
         "source": "webhook",
         "updatedAt": firestore.SERVER_TIMESTAMP,
     }
-    subscription_ref.set(normalized, merge=True)
 
-    return jsonify({"ok": True, "eventId": event_id}), 200
+    return (
+        _RevenueCatEvent(
+            event_id=event_id,
+            app_user_id=app_user_id,
+            event_doc=event_doc,
+            subscription_update=subscription_update,
+        ),
+        None,
+    )
+
+
+def _revenuecat_event_from_body(payload: dict[str, Any]) -> tuple[_RevenueCatEvent | None, str | None]:
+    event = payload.get("event", payload)
+    if not isinstance(event, dict):
+        return None, "Invalid webhook payload."
+    return _normalize_revenuecat_event(event)
+
+
+def _revenuecat_outcome_response(outcome: str, event_id: str) -> dict[str, Any]:
+    if outcome == "duplicate":
+        return {"ok": True, "duplicate": True, "eventId": event_id}
+    if outcome == "ignoredOutOfOrder":
+        return {"ok": True, "ignoredOutOfOrder": True, "eventId": event_id}
+    if outcome == "queued":
+        return {"ok": True, "queued": True, "eventId": event_id}
+    return {"ok": True, "eventId": event_id}
+
+
+@app.post("/v1/payments/revenuecat/webhook")
+def revenuecat_webhook() -> tuple[Any, int]:
+    if not _webhook_authorized():
+        return jsonify({"error": "Unauthorized webhook request."}), 401
+
+    parsed, error = _revenuecat_event_from_body(_json_body())
+    if error:
+        return jsonify({"error": error}), 400
+    event_id = parsed.event_id
+
+    db = _get_db()
+    if _webhook_async_enabled():
+        # Persist the raw event durably, ack, and let the worker pool apply it.
+        try:
+            _revenuecat_event_ref(db, event_id).create(
+                {
+                    **parsed.event_doc,
+                    "appUserId": parsed.app_user_id,
+                    "status": "pending",
+                    "leaseUntil": _revenuecat_event_lease(),
+                }
+            )
+        except google_exceptions.AlreadyExists:
+            return jsonify(_revenuecat_outcome_response("duplicate", event_id)), 200
+        _enqueue_revenuecat_event(parsed, _webhook_canonical_user_id(parsed.app_user_id))
+        return jsonify(_revenuecat_outcome_response("queued", event_id)), 200
+
+    try:
+        outcome = _apply_revenuecat_event(
+            db.transaction(),
+            db,
+            app_user_id=parsed.app_user_id,
+            event_id=event_id,
+            event_doc=parsed.event_doc,
+            subscription_update=parsed.subscription_update,
+        )
+    except google_exceptions.AlreadyExists:
+        # A concurrent delivery of the same event committed its insert first.
+        outcome = "duplicate"
+    return jsonify(_revenuecat_outcome_response(outcome, event_id)), 200
+
+
+if _local_id_token_verification_enabled():
+    # Preload signing keys so token verification never waits on a certificate fetch.
+    _signing_keys.start()
+
+if _webhook_async_enabled():
+    threading.Thread(
+        target=_run_revenuecat_recovery_sweeps, name="webhook-recovery", daemon=True
+    ).start()
+
+
+def warm_up(timeout_seconds: float = 10) -> dict[str, float]:
+    """Prepare this worker for traffic; returns seconds spent per step.
+
+    Called from the gunicorn `post_worker_init` hook, so the Firestore client, its gRPC
+    channel and credentials, and the ID token signing keys are ready before the worker
+    accepts its first request. Failures are tolerated: requests fall back to lazy setup.
+    """
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    db = _get_db()
+    timings["firestoreClient"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        # One small read opens the gRPC channel and fetches an access token.
+        db.collection("_warmup").document("ping").get(timeout=timeout_seconds)
+    except google_exceptions.GoogleAPICallError:
+        pass
+    timings["firestoreChannel"] = time.perf_counter() - started
+
+    if _local_id_token_verification_enabled():
+        started = time.perf_counter()
+        _signing_keys.start()
+        _signing_keys.wait_until_loaded(timeout_seconds)
+        _firebase_project_id()
+        timings["signingKeys"] = time.perf_counter() - started
+
+    if _subscription_cache.enabled:
+        # Connects in the background; entries are served once the listener has caught up.
+        _subscription_cache.start()
+
+    return timings
 
 
 if __name__ == "__main__":
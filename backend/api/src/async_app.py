@@ -0,0 +1,764 @@
+"""Async serving mode: the same API as `app.py`, served by Quart on Firestore's AsyncClient.
+
+Request validation, payload shaping and response bodies are shared with the sync app, so
+both modes return identical responses. Firestore calls are awaited on the event loop
+instead of holding a worker thread, so one worker can keep many RPCs in flight.
+
+Enable with `SERVING_MODE=async` (see `gunicorn.conf.py`).
+"""
+
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from firebase_admin import firestore_async
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore import AsyncClient, AsyncTransaction, async_transactional
+from quart import Quart, Response, g, jsonify, request, stream_with_context
+from quart.wrappers.response import DataBody
+
+from src import app as sync_app
+
+
+_async_db: AsyncClient | None = None
+
+app = Quart(__name__)
+app.json = sync_app._ResponseJSONProvider(app)
+
+
+def _get_async_db() -> AsyncClient:
+    global _async_db
+    if _async_db is None:
+        sync_app._ensure_firebase_initialized()
+        _async_db = sync_app._instrument_firestore_client(firestore_async.client())
+    return _async_db
+
+
+class _AsyncSingleFlight:
+    """asyncio counterpart of `app._SingleFlight`; records into the same counters for /metrics."""
+
+    def __init__(self, counters: Any) -> None:
+        self._counters = counters
+        # (path, mask) -> (future, perf_counter value when its read started)
+        self._in_flight: dict[tuple[str, tuple[str, ...] | None], tuple[asyncio.Future, float]] = {}
+
+    async def get_documents(
+        self,
+        refs: list[Any],
+        fetch: Callable[[list[Any]], Awaitable[dict[str, Any]]],
+        field_paths: tuple[str, ...] | None = None,
+        not_before: float | None = None,
+    ) -> tuple[dict[str, Any], bool]:
+        if not self._counters.enabled:
+            return await fetch(refs), True
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        owned: list[tuple[Any, asyncio.Future]] = []
+        awaited: list[tuple[str, asyncio.Future]] = []
+        for ref in refs:
+            entry = self._in_flight.get((ref.path, field_paths))
+            if entry is None or (not_before is not None and entry[1] < not_before):
+                flight = loop.create_future()
+                self._in_flight[(ref.path, field_paths)] = (flight, started)
+                owned.append((ref, flight))
+            else:
+                awaited.append((ref.path, entry[0]))
+        self._counters.record(fetched=len(owned), coalesced=len(awaited))
+
+        snapshots: dict[str, Any] = {}
+        if owned:
+            try:
+                fetched = await fetch([ref for ref, _ in owned])
+            except BaseException as exc:
+                for ref, flight in owned:
+                    self._release(ref.path, field_paths, flight)
+                    flight.set_exception(exc)
+                    # Mark retrieved so an exception nobody else awaited is not logged as lost.
+                    flight.exception()
+                raise
+            for ref, flight in owned:
+                self._release(ref.path, field_paths, flight)
+                snapshots[ref.path] = fetched.get(ref.path)
+                flight.set_result(snapshots[ref.path])
+
+        for path, flight in awaited:
+            snapshots[path] = await asyncio.shield(flight)
+        return snapshots, bool(owned)
+
+    def _release(self, path: str, field_paths: tuple[str, ...] | None, flight: asyncio.Future) -> None:
+        # A newer flight may have superseded this one; leave it for its own owner to finish.
+        entry = self._in_flight.get((path, field_paths))
+        if entry is not None and entry[0] is flight:
+            del self._in_flight[(path, field_paths)]
+
+
+_document_reads = _AsyncSingleFlight(sync_app._document_reads)
+
+
+async def _get_documents(refs: list[Any], field_paths: tuple[str, ...] | None = None) -> dict[str, Any]:
+    """Async counterpart of `app._get_documents`: at most one BatchGetDocuments RPC, keyed by path.
+
+    Shares `app._subscription_cache`, whose listener runs on the sync client's threads.
+    """
+    cached, refs = sync_app._cached_subscriptions(refs)
+    if not refs:
+        return cached
+
+    async def fetch(missing: list[Any]) -> dict[str, Any]:
+        read_started = time.monotonic()
+        mask = list(field_paths) if field_paths else None
+        fetched = {
+            snapshot.reference.path: snapshot async for snapshot in _get_async_db().get_all(missing, field_paths=mask)
+        }
+        if field_paths is None:
+            sync_app._cache_subscriptions(fetched, read_started)
+        return fetched
+
+    snapshots, issued_rpc = await _document_reads.get_documents(
+        refs, fetch, field_paths, not_before=g.get("started_at")
+    )
+    if issued_rpc:
+        g.firestore_reads = g.get("firestore_reads", 0) + 1
+    return {**snapshots, **cached}
+
+
+async def _commit_user_writes(user_ref: Any, writes: list[tuple[Any, dict[str, Any]]]) -> None:
+    """Async counterpart of `app._commit_user_writes`."""
+    batch = _get_async_db().batch()
+    for ref, data in sync_app._with_mirrors(user_ref, writes):
+        batch.set(ref, data, merge=True)
+    await batch.commit()
+    for ref, _ in writes:
+        sync_app._subscription_cache.invalidate(ref.path)
+
+
+async def _json_body() -> dict[str, Any]:
+    payload = await request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return {}
+    return payload
+
+
+async def _resolve_canonical_user_id(decoded: dict[str, Any]) -> str | None:
+    cache_key = sync_app._identity_cache_key(decoded)
+    if cache_key is None:
+        return None
+    cached = sync_app._identity_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    # Cache misses run the sync alias reads/writes off the event loop; they are rare.
+    return await asyncio.to_thread(sync_app._resolve_canonical_user_id, decoded)
+
+
+async def _verify_id_token(token: str) -> dict[str, Any]:
+    started = time.perf_counter()
+    cached = sync_app._id_token_cache.get(hashlib.sha256(token.encode("utf-8")).digest())
+    if cached is not None:
+        sync_app._metrics.observe(
+            "unstoppable_token_verification_seconds", ("cache",), time.perf_counter() - started
+        )
+        return cached
+    # Local verification is CPU-only, but the firebase_admin fallback may fetch certificates.
+    return await asyncio.to_thread(sync_app._verify_id_token, token)
+
+
+async def _user_id_from_request() -> tuple[str | None, tuple[dict[str, str], int] | None]:
+    started = time.perf_counter()
+    phase_token = sync_app._metrics_phase.set("auth")
+    try:
+        return await _authenticate_request()
+    finally:
+        sync_app._metrics_phase.reset(phase_token)
+        sync_app._metrics.observe(
+            "unstoppable_auth_seconds", (sync_app._metrics_endpoint.get(),), time.perf_counter() - started
+        )
+
+
+async def _authenticate_request() -> tuple[str | None, tuple[dict[str, str], int] | None]:
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        token = auth_header.replace("Bearer ", "", 1).strip()
+        try:
+            decoded = await _verify_id_token(token)
+            user_id = await _resolve_canonical_user_id(decoded)
+            if not user_id:
+                return None, ({"error": "Token missing uid claim."}, 401)
+            g.decoded_token = decoded
+            return user_id, None
+        except Exception:
+            return None, ({"error": "Invalid auth token."}, 401)
+
+    if os.getenv("ALLOW_DEV_USER_HEADER", "0") == "1":
+        dev_user = request.headers.get("X-User-Id", "").strip()
+        if dev_user:
+            g.decoded_token = None
+            return dev_user, None
+
+    return None, (
+        {"error": "Missing Authorization bearer token."},
+        401,
+    )
+
+
+@app.before_request
+async def _start_request_metrics() -> None:
+    # Each ASGI request runs in its own task, so the context variable needs no reset.
+    sync_app._metrics_endpoint.set(request.endpoint or "unknown")
+    g.started_at = time.perf_counter()
+
+
+@app.after_request
+async def _record_request_metrics(response: Response) -> Response:
+    started = g.get("started_at")
+    if started is not None:
+        sync_app._metrics.observe(
+            "unstoppable_http_request_seconds",
+            (request.endpoint or "unknown", request.method, str(response.status_code)),
+            time.perf_counter() - started,
+        )
+    return response
+
+
+@app.after_request
+async def _compress_response(response: Response) -> Response:
+    if not isinstance(response.response, DataBody) or not sync_app._compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = await response.get_data()
+    compressed = sync_app._compress_body(body, request.accept_encodings)
+    if compressed is None:
+        sync_app._record_response_bytes(request.endpoint or "unknown", "identity", len(body), len(body))
+        return response
+    data, encoding = compressed
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    sync_app._record_response_bytes(request.endpoint or "unknown", encoding, len(body), len(data))
+    return response
+
+
+@app.before_serving
+async def _warm_up() -> None:
+    # The async gRPC channel is bound to the serving event loop, so it is opened here
+    # rather than in the gunicorn post_worker_init hook.
+    if os.getenv("WARM_UP_ON_START", "1") != "1":
+        return
+    try:
+        await _get_async_db().collection("_warmup").document("ping").get(timeout=10)
+    except Exception as exc:  # Never keep the worker from serving because warm-up failed.
+        app.logger.warning("Async Firestore warm-up failed: %s", exc)
+
+
+@app.get("/healthz")
+async def healthz() -> tuple[dict[str, str], int]:
+    return {"status": "ok"}, 200
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    if not sync_app._metrics_authorized(request.headers.get("Authorization", "")):
+        return Response("Unauthorized\n", status=401, content_type="text/plain")
+    return Response(sync_app._metrics_text(), content_type=sync_app.PROMETHEUS_CONTENT_TYPE)
+
+
+@app.post("/v1/user/profile")
+async def upsert_user_profile() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    profile_data, normalized_payment_option = sync_app._profile_update(
+        await _json_body(), g.get("decoded_token")
+    )
+
+    user_ref = _get_async_db().collection("users").document(user_id)
+    writes = []
+    if profile_data:
+        writes.append((user_ref.collection("profile").document("self"), profile_data))
+    if normalized_payment_option:
+        writes.append(
+            (
+                user_ref.collection("payments").document("subscription"),
+                sync_app._profile_payment_option_update(normalized_payment_option),
+            )
+        )
+    if writes:
+        await _commit_user_writes(user_ref, writes)
+
+    return jsonify({"ok": True, "userId": user_id}), 200
+
+
+@app.put("/v1/routines/current")
+async def upsert_routine() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    routine_data, error = sync_app._routine_update(await _json_body())
+    if error:
+        return jsonify({"error": error}), 400
+
+    user_ref = _get_async_db().collection("users").document(user_id)
+    await _commit_user_writes(user_ref, [(user_ref.collection("routine").document("current"), routine_data)])
+
+    return jsonify({"ok": True, "userId": user_id}), 200
+
+
+@app.post("/v1/progress/daily")
+async def upsert_daily_progress() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    progress_doc, error = sync_app._daily_progress_doc(await _json_body())
+    if error:
+        return jsonify({"error": error}), 400
+
+    date_value = progress_doc["date"]
+    db = _get_async_db()
+    user_ref = db.collection("users").document(user_id)
+    if not sync_app._qualifies(progress_doc):
+        await _commit_user_writes(user_ref, [(user_ref.collection("progress").document(date_value), progress_doc)])
+        return jsonify({"ok": True, "userId": user_id, "date": date_value}), 200
+
+    streak = await _commit_progress_with_streak(db.transaction(), db, user_ref, [progress_doc])
+    return jsonify({"ok": True, "userId": user_id, "date": date_value, "streak": streak}), 200
+
+
+@async_transactional
+async def _commit_progress_with_streak(
+    transaction: AsyncTransaction,
+    db: AsyncClient,
+    user_ref: Any,
+    progress_docs: list[dict[str, Any]],
+    writes: list[tuple[Any, dict[str, Any]]] | None = None,
+    streak_snapshot: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Async counterpart of `app._commit_progress_with_streak`."""
+    streak_ref = user_ref.collection("stats").document("streak")
+    snapshots = {
+        snapshot.reference.path: snapshot async for snapshot in db.get_all([streak_ref], transaction=transaction)
+    }
+    streak = sync_app._snapshot_data(snapshots, streak_ref)
+    days = [
+        dt.date.fromisoformat(progress_doc["date"])
+        for progress_doc in progress_docs
+        if sync_app._qualifies(progress_doc)
+    ]
+    window: dict[str, dict[str, Any]] = {}
+    for bounds in sync_app._streak_recompute_windows(sync_app._streak_base(streak, streak_snapshot)[0], days):
+        query = sync_app._streak_window_query(user_ref, bounds)
+        window.update(
+            {snapshot.id: snapshot.to_dict() or {} async for snapshot in query.stream(transaction=transaction)}
+        )
+    return sync_app._stage_progress_with_streak(
+        transaction, user_ref, progress_docs, streak, window, writes, streak_snapshot
+    )
+
+
+@app.post("/v1/progress/daily/batch")
+async def upsert_daily_progress_batch() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    progress_docs, results, error_response = sync_app._daily_progress_batch(await _json_body())
+    if error_response:
+        body, status = error_response
+        return jsonify(body), status
+
+    db = _get_async_db()
+    user_ref = db.collection("users").document(user_id)
+    progress_collection = user_ref.collection("progress")
+    failed = False
+    streak = None
+    for chunk_docs, chunk_results in sync_app._progress_batch_chunks(progress_docs, results):
+        if failed:
+            sync_app._mark_progress_results(chunk_results, "not_written")
+            continue
+        try:
+            if any(sync_app._qualifies(progress_doc) for progress_doc in chunk_docs):
+                streak = await _commit_progress_with_streak(db.transaction(), db, user_ref, chunk_docs)
+            else:
+                batch = db.batch()
+                writes = [
+                    (progress_collection.document(progress_doc["date"]), progress_doc) for progress_doc in chunk_docs
+                ]
+                for ref, data in sync_app._with_mirrors(user_ref, writes):
+                    batch.set(ref, data, merge=True)
+                await batch.commit()
+        except Exception as exc:
+            failed = True
+            sync_app._mark_progress_results(chunk_results, "failed", str(exc))
+            continue
+        sync_app._mark_progress_results(chunk_results, "written")
+
+    body, status = sync_app._progress_batch_response(user_id, results, failed, streak)
+    return jsonify(body), status
+
+
+@app.get("/v1/progress/history")
+async def get_progress_history() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    date_range, error = sync_app._date_range(request.args, sync_app.PROGRESS_HISTORY_MAX_DAYS)
+    if error:
+        return jsonify({"error": error}), 400
+    start, end = date_range
+
+    refs = sync_app._progress_rollup_refs(_get_async_db(), user_id, start, end)
+    snapshots = await _get_documents(refs)
+    etag = sync_app._documents_etag(refs, snapshots, variant=f"{start}:{end}")
+    headers = {"X-Firestore-Rpc-Count": str(g.get("firestore_reads", 0)), **sync_app._etag_headers(etag)}
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, headers
+    days = sync_app._progress_history_days([sync_app._snapshot_data(snapshots, ref) for ref in refs], start, end)
+    return (
+        jsonify({"ok": True, "userId": user_id, "from": start.isoformat(), "to": end.isoformat(), "days": days}),
+        200,
+        headers,
+    )
+
+
+async def _progress_page(user_id: str, page: Any, first: Any, snapshots: AsyncIterator[Any]) -> AsyncIterator[str]:
+    """Async counterpart of `app._progress_page`."""
+    yield sync_app._progress_page_open(user_id, page)
+    next_cursor = None
+    error = None
+    if first is not None:
+        yield sync_app._progress_page_day(0, first)
+        last_date = first.id
+        index = 1
+        try:
+            async for snapshot in snapshots:
+                if index == page.limit:
+                    next_cursor = sync_app._encode_progress_cursor(last_date)
+                    break
+                yield sync_app._progress_page_day(index, snapshot)
+                last_date = snapshot.id
+                index += 1
+        except google_exceptions.GoogleAPICallError:
+            app.logger.warning("Progress page read failed after %s.", last_date, exc_info=True)
+            next_cursor = sync_app._encode_progress_cursor(last_date)
+            error = sync_app.PROGRESS_PAGE_INTERRUPTED
+    yield sync_app._progress_page_close(next_cursor, error)
+
+
+@app.get("/v1/progress")
+async def get_progress() -> Any:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    page, error = sync_app._progress_page_request(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    user_ref = _get_async_db().collection("users").document(user_id)
+    snapshots = aiter(sync_app._progress_range_query(user_ref, page).stream())
+    g.firestore_reads = g.get("firestore_reads", 0) + 1
+    try:
+        first = await anext(snapshots, None)
+    except google_exceptions.GoogleAPICallError:
+        app.logger.warning("Progress page read failed.", exc_info=True)
+        return jsonify({"error": "Failed to read progress."}), 503
+    return Response(
+        stream_with_context(_progress_page)(user_id, page, first, snapshots),
+        mimetype="application/json",
+        headers={"X-Firestore-Rpc-Count": str(g.firestore_reads)},
+    )
+
+
+@app.post("/v1/stats/streak/snapshot")
+async def upsert_streak_snapshot() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    streak_data, error = sync_app._streak_snapshot_doc(await _json_body())
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = _get_async_db()
+    user_ref = db.collection("users").document(user_id)
+    streak = await _commit_progress_with_streak(db.transaction(), db, user_ref, [], streak_snapshot=streak_data)
+
+    return jsonify({"ok": True, "userId": user_id, "streak": streak}), 200
+
+
+@app.post("/v1/user/state")
+async def upsert_user_state() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    db = _get_async_db()
+    user_ref = db.collection("users").document(user_id)
+    plan, error = sync_app._user_write_plan(await _json_body(), user_ref, g.get("decoded_token"))
+    if error:
+        return jsonify({"error": error}), 400
+
+    if not plan.progress_docs and plan.streak_snapshot is None:
+        await _commit_user_writes(user_ref, plan.writes)
+        return jsonify(sync_app._user_write_response(user_id, plan)), 200
+
+    streak = await _commit_progress_with_streak(
+        db.transaction(), db, user_ref, plan.progress_docs, plan.writes, plan.streak_snapshot
+    )
+    for ref, _ in plan.writes:
+        sync_app._subscription_cache.invalidate(ref.path)
+    return jsonify(sync_app._user_write_response(user_id, plan, streak)), 200
+
+
+@app.get("/v1/bootstrap")
+async def get_bootstrap() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    fields, error = sync_app._parse_fields(request.args.get("fields", ""), sync_app.BOOTSTRAP_RESPONSE_KEYS)
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = _get_async_db()
+    indexes, field_paths = sync_app._bootstrap_read_plan(fields)
+    if sync_app.USER_SNAPSHOT and indexes:
+        return await _bootstrap_from_user_snapshot(db, user_id, fields)
+
+    refs = sync_app._bootstrap_refs(db, user_id)
+    read_refs = [refs[index] for index in indexes]
+    snapshots = await _get_documents(read_refs, field_paths)
+    rpc_count = g.get("firestore_reads", 0)
+    variant = (json.dumps(fields, sort_keys=True) if fields else "") + sync_app._subscription_variant(
+        sync_app._snapshot_data(snapshots, refs[sync_app._BOOTSTRAP_DOCUMENT_KEYS["subscription"][0]])
+    )
+    etag = sync_app._documents_etag(read_refs, snapshots, variant=variant)
+    headers = {"X-Firestore-Rpc-Count": str(rpc_count), **sync_app._etag_headers(etag)}
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, headers
+    response = sync_app._bootstrap_response(user_id, refs, snapshots)
+    return jsonify(sync_app._project(response, fields) if fields else response), 200, headers
+
+
+@async_transactional
+async def _rebuild_user_snapshot(transaction: AsyncTransaction, db: AsyncClient, user_id: str) -> list[dict[str, Any]]:
+    """Async counterpart of `app._rebuild_user_snapshot`."""
+    refs, progress_refs, read_refs = sync_app._user_snapshot_refs(db, user_id)
+    snapshots = {
+        snapshot.reference.path: snapshot async for snapshot in db.get_all(read_refs, transaction=transaction)
+    }
+    return sync_app._stage_user_snapshot(
+        transaction, db.collection("users").document(user_id), refs, progress_refs, snapshots
+    )
+
+
+async def _bootstrap_from_user_snapshot(
+    db: AsyncClient, user_id: str, fields: dict[str, Any] | None
+) -> tuple[Any, int, dict[str, str]]:
+    """Async counterpart of `app._bootstrap_from_user_snapshot`."""
+    user_ref = db.collection("users").document(user_id)
+    today = sync_app._today_yyyy_mm_dd()
+    snapshots = await _get_documents([user_ref], sync_app._user_snapshot_field_paths(fields))
+    sections = sync_app._user_snapshot_sections(snapshots[user_ref.path], today)
+    etag = None
+    if sections is None:
+        sections = await _rebuild_user_snapshot(db.transaction(), db, user_id)
+        g.firestore_reads = g.get("firestore_reads", 0) + 1
+    else:
+        variant = f"{today}:{json.dumps(fields, sort_keys=True)}{sync_app._subscription_variant(sections[-1])}"
+        etag = sync_app._documents_etag([user_ref], snapshots, variant=variant)
+    headers = {"X-Firestore-Rpc-Count": str(g.get("firestore_reads", 0))}
+    if etag is not None:
+        headers.update(sync_app._etag_headers(etag))
+        if request.if_none_match.contains_weak(etag):
+            return "", 304, headers
+    response = sync_app._bootstrap_body(user_id, sections)
+    return jsonify(sync_app._project(response, fields) if fields else response), 200, headers
+
+
+@app.get("/v1/user/subscription")
+async def get_user_subscription() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    subscription_ref = (
+        _get_async_db().collection("users").document(user_id).collection("payments").document("subscription")
+    )
+    snapshots = await _get_documents([subscription_ref])
+    subscription = sync_app._snapshot_data(snapshots, subscription_ref)
+    etag = sync_app._documents_etag([subscription_ref], snapshots, variant=sync_app._subscription_variant(subscription))
+    headers = sync_app._etag_headers(etag)
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, headers
+    return (
+        jsonify(
+            {
+                "ok": True,
+                "userId": user_id,
+                "subscription": sync_app._subscription_section(subscription),
+            }
+        ),
+        200,
+        headers,
+    )
+
+
+@app.get("/v1/sync")
+async def get_sync() -> tuple[Any, int, dict[str, str]]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    since, error = sync_app._sync_since(request.args.get("since", ""))
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = _get_async_db()
+    user_ref = db.collection("users").document(user_id)
+    refs = sync_app._sync_refs(user_ref)
+    read_time = sync_app._sync_read_time()
+
+    async def read_sections() -> dict[str, Any]:
+        return {snapshot.reference.path: snapshot async for snapshot in db.get_all(refs, read_time=read_time)}
+
+    async def read_progress() -> list[Any]:
+        query = sync_app._sync_progress_query(user_ref, since)
+        return [snapshot async for snapshot in query.stream(read_time=read_time)]
+
+    # Same read time for both, so they can run concurrently and still see one snapshot.
+    snapshots, progress_snapshots = await asyncio.gather(read_sections(), read_progress())
+    g.firestore_reads = g.get("firestore_reads", 0) + 2
+
+    response = sync_app._sync_response(user_id, refs, snapshots, progress_snapshots, since, read_time)
+    return jsonify(response), 200, {"X-Firestore-Rpc-Count": str(g.firestore_reads)}
+
+
+@app.post("/v1/payments/subscription/snapshot")
+async def upsert_subscription_snapshot() -> tuple[Any, int]:
+    user_id, err = await _user_id_from_request()
+    if err:
+        return err
+
+    snapshot = sync_app._subscription_snapshot_update(await _json_body(), user_id)
+    user_ref = _get_async_db().collection("users").document(user_id)
+    await _commit_user_writes(
+        user_ref, sync_app._subscription_writes(user_ref.collection("payments").document("subscription"), snapshot)
+    )
+    return jsonify({"ok": True, "userId": user_id}), 200
+
+
+@async_transactional
+async def _apply_revenuecat_event(
+    transaction: AsyncTransaction,
+    db: AsyncClient,
+    *,
+    app_user_id: str,
+    event_id: str,
+    event_doc: dict[str, Any],
+    subscription_update: dict[str, Any],
+) -> str:
+    """Async counterpart of `app._apply_revenuecat_event` (synchronous ingest only)."""
+    alias_ref = db.collection("user_uid_aliases").document(app_user_id)
+    event_ref = sync_app._revenuecat_event_ref(db, event_id)
+    subscription_ref = (
+        db.collection("users").document(app_user_id).collection("payments").document("subscription")
+    )
+    snapshots = {
+        snapshot.reference.path: snapshot
+        async for snapshot in db.get_all(
+            [alias_ref, event_ref, subscription_ref], transaction=transaction
+        )
+    }
+    if sync_app._revenuecat_event_already_applied(snapshots[event_ref.path], event_stored=False):
+        return "duplicate"
+
+    canonical_user_id = sync_app._canonical_user_id_from_alias(snapshots.get(alias_ref.path), app_user_id)
+    if canonical_user_id != app_user_id:
+        subscription_ref = (
+            db.collection("users")
+            .document(canonical_user_id)
+            .collection("payments")
+            .document("subscription")
+        )
+        subscription_snapshot = await subscription_ref.get(transaction=transaction)
+    else:
+        subscription_snapshot = snapshots[subscription_ref.path]
+
+    return sync_app._stage_revenuecat_event(
+        transaction,
+        event_ref=event_ref,
+        subscription_ref=subscription_ref,
+        subscription_snapshot=subscription_snapshot,
+        canonical_user_id=canonical_user_id,
+        event_doc=event_doc,
+        subscription_update=subscription_update,
+        event_stored=False,
+    )
+
+
+async def _webhook_canonical_user_id(app_user_id: str) -> str:
+    """Async counterpart of `app._webhook_canonical_user_id`; shares its cache."""
+    cached = sync_app._webhook_canonical_user_ids.get(app_user_id)
+    if cached is not None:
+        return cached
+    try:
+        alias_snapshot = await _get_async_db().collection("user_uid_aliases").document(app_user_id).get()
+    except google_exceptions.GoogleAPICallError:
+        return app_user_id
+    canonical_user_id = sync_app._canonical_user_id_from_alias(alias_snapshot, app_user_id)
+    sync_app._webhook_canonical_user_ids.set(app_user_id, canonical_user_id)
+    return canonical_user_id
+
+
+@app.post("/v1/payments/revenuecat/webhook")
+async def revenuecat_webhook() -> tuple[Any, int]:
+    if not sync_app._webhook_authorization_valid(request.headers.get("Authorization", "")):
+        return jsonify({"error": "Unauthorized webhook request."}), 401
+
+    parsed, error = sync_app._revenuecat_event_from_body(await _json_body())
+    if error:
+        return jsonify({"error": error}), 400
+    event_id = parsed.event_id
+
+    db = _get_async_db()
+    if sync_app._webhook_async_enabled():
+        # Same durable ack as the sync app; the sync worker pool applies the event. The shard's
+        # alias lookup runs alongside the insert, so it adds no latency to the ack.
+        store = sync_app._revenuecat_event_ref(db, event_id).create(
+            {
+                **parsed.event_doc,
+                "appUserId": parsed.app_user_id,
+                "status": "pending",
+                "leaseUntil": sync_app._revenuecat_event_lease(),
+            }
+        )
+        try:
+            _, canonical_user_id = await asyncio.gather(store, _webhook_canonical_user_id(parsed.app_user_id))
+        except google_exceptions.AlreadyExists:
+            return jsonify(sync_app._revenuecat_outcome_response("duplicate", event_id)), 200
+        sync_app._enqueue_revenuecat_event(parsed, canonical_user_id)
+        return jsonify(sync_app._revenuecat_outcome_response("queued", event_id)), 200
+
+    try:
+        outcome = await _apply_revenuecat_event(
+            db.transaction(),
+            db,
+            app_user_id=parsed.app_user_id,
+            event_id=event_id,
+            event_doc=parsed.event_doc,
+            subscription_update=parsed.subscription_update,
+        )
+    except google_exceptions.AlreadyExists:
+        # A concurrent delivery of the same event committed its insert first.
+        outcome = "duplicate"
+    return jsonify(sync_app._revenuecat_outcome_response(outcome, event_id)), 200